@@ -2,58 +2,178 @@
 API routes for chronology operations.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import base64
+import csv
+import io
+import json
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
+from app.chronology import buckets
+from app.chronology.classifier import get_classification_worker
 from app.chronology.engine import ChronologyEngine
-from app.models.chronology import ChronologyEra, EventType
+from app.models.chronology import ChronologyEvent, ChronologyEra, EventType
 from app.schemas.chronology import (
     ChronologyEventResponse,
     ChronologyEventCreate,
     TimelineSummaryResponse,
+    BulkInsertResponse,
+    ContemporaneityResponse,
+    DistanceMatrixRequest,
+    DistanceMatrixResponse,
+    DensityResponse,
+    ClassificationStatus,
 )
 
 router = APIRouter()
 
+# Response header carrying the keyset cursor for the next page of events
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Rows fetched per round trip when streaming the timeline
+STREAM_BATCH_SIZE = 1000
+
+
+def _encode_cursor(event: ChronologyEvent) -> str:
+    """Opaque keyset cursor pointing just past the given event."""
+    raw = json.dumps([event.year_start, event.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a cursor produced by _encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        year_start, event_id = json.loads(raw)
+        return int(year_start), int(event_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.get("/events", response_model=List[ChronologyEventResponse])
 async def get_events(
+    response: Response,
     year_start: Optional[int] = Query(None, description="Start year (negative for BC)"),
     year_end: Optional[int] = Query(None, description="End year (negative for BC)"),
     era: Optional[ChronologyEra] = Query(None, description="Filter by era"),
     event_type: Optional[EventType] = Query(None, description="Filter by event type"),
-    limit: int = Query(100, le=1000, description="Maximum number of events to return"),
+    include_uncertain: bool = Query(
+        True, description="Match events whose uncertainty bounds overlap the year range"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous X-Next-Cursor header"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of events to return"),
     db: Session = Depends(get_db),
 ):
     """
-    Retrieve events from the chronology.
+    Retrieve events from the chronology in chronological order.
 
-    Supports filtering by year range, era, and event type.
+    Supports filtering by year range, era, and event type. Results are paged
+    by keyset: when more events remain, the X-Next-Cursor response header holds
+    an opaque cursor to pass back as `cursor` for the next page.
     """
     engine = ChronologyEngine(db)
 
-    if year_start and year_end:
-        events = engine.get_events_in_range(year_start, year_end)
-    elif era:
-        events = engine.get_events_by_era(era)
-    else:
-        # Default: get recent historical events
-        events = engine.get_events_in_range(-4000, 2026)
+    events = engine.get_events_page(
+        year_start=year_start,
+        year_end=year_end,
+        era=era,
+        event_type=event_type,
+        after=_decode_cursor(cursor) if cursor else None,
+        limit=limit + 1,
+        include_uncertain=include_uncertain,
+    )
+
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(events[-1])
+
+    return events
+
 
-    # Apply type filter if specified
-    if event_type:
-        events = [e for e in events if e.event_type == event_type]
+@router.get("/events/stream")
+def stream_events(
+    year_start: Optional[int] = Query(None, description="Start year (negative for BC)"),
+    year_end: Optional[int] = Query(None, description="End year (negative for BC)"),
+    era: Optional[ChronologyEra] = Query(None, description="Filter by era"),
+    event_type: Optional[EventType] = Query(None, description="Filter by event type"),
+    include_uncertain: bool = Query(
+        True, description="Match events whose uncertainty bounds overlap the year range"
+    ),
+    export_format: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream the chronology (or a filtered slice of it) in chronological order.
 
-    return events[:limit]
+    Events are read from a server-side cursor in batches and written out as they
+    arrive, one JSON object per line (or one CSV row per event), so memory use and
+    time to first byte do not grow with the size of the timeline.
+    """
+    engine = ChronologyEngine(db)
+    events = engine.iter_events(
+        year_start=year_start,
+        year_end=year_end,
+        era=era,
+        event_type=event_type,
+        include_uncertain=include_uncertain,
+        batch_size=STREAM_BATCH_SIZE,
+    )
+
+    if export_format == "csv":
+        return StreamingResponse(
+            _closing(db, _csv_lines(events)),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=chronology.csv"},
+        )
+
+    return StreamingResponse(
+        _closing(db, _ndjson_lines(events)), media_type="application/x-ndjson"
+    )
+
+
+def _ndjson_lines(events: Iterable[ChronologyEvent]) -> Iterator[str]:
+    for event in events:
+        yield ChronologyEventResponse.model_validate(event).model_dump_json() + "\n"
+
+
+def _csv_lines(events: Iterable[ChronologyEvent]) -> Iterator[str]:
+    columns = list(ChronologyEventResponse.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    for event in events:
+        row = ChronologyEventResponse.model_validate(event).model_dump(mode="json")
+        if row["extra_data"] is not None:
+            row["extra_data"] = json.dumps(row["extra_data"])
+        writer.writerow([row[c] for c in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _closing(db: Session, lines: Iterator[str]) -> Iterator[str]:
+    """
+    Close the session once streaming finishes.
+
+    get_db closes the session when the endpoint returns, before the body is
+    sent; the generator transparently reopens it, so it must be closed here.
+    """
+    try:
+        yield from lines
+    finally:
+        db.close()
 
 
 @router.get("/events/{event_id}", response_model=ChronologyEventResponse)
 async def get_event_by_id(event_id: int, db: Session = Depends(get_db)):
     """Retrieve a specific event by ID."""
-    from app.models.chronology import ChronologyEvent
-
     event = db.query(ChronologyEvent).filter(ChronologyEvent.id == event_id).first()
 
     if not event:
@@ -80,14 +200,69 @@ async def create_event(event: ChronologyEventCreate, db: Session = Depends(get_d
         year_end=event.year_end,
         year_start_min=event.year_start_min,
         year_start_max=event.year_start_max,
+        year_end_min=event.year_end_min,
+        year_end_max=event.year_end_max,
         biblical_source=event.biblical_source,
         historical_source=event.historical_source,
-        metadata=event.metadata,
+        extra_data=event.extra_data,
     )
 
     return new_event
 
 
+@router.post("/events/bulk", response_model=BulkInsertResponse)
+async def create_events_bulk(request: Request, db: Session = Depends(get_db)):
+    """
+    Add many events to the chronology in one transaction.
+
+    The body is either a JSON array of events or newline-delimited JSON
+    (Content-Type: application/x-ndjson), each event shaped like POST /events.
+    Invalid rows are reported by index without aborting the rest of the batch.
+    """
+    body = await request.body()
+    is_ndjson = request.headers.get("content-type", "").startswith("application/x-ndjson")
+    positions, records, parse_errors = _parse_bulk_body(body, is_ndjson)
+
+    engine = ChronologyEngine(db)
+    result = engine.add_events_bulk(records)
+
+    # Engine indexes count only parsed records; report positions within the body
+    for error in result["errors"]:
+        error["index"] = positions[error["index"]]
+    result["errors"] = sorted(parse_errors + result["errors"], key=lambda e: e["index"])
+    result["failed"] = len(result["errors"])
+
+    return result
+
+
+def _parse_bulk_body(body: bytes, is_ndjson: bool) -> Tuple[List[int], List[Any], List[dict]]:
+    """
+    Split a bulk request body into records.
+
+    Returns the body position of each parsed record, the records themselves and
+    errors for NDJSON lines that are not valid JSON.
+    """
+    if not is_ndjson:
+        try:
+            records = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of events")
+        return list(range(len(records))), records, []
+
+    positions, records, errors = [], [], []
+    lines = [line for line in body.decode("utf-8", errors="replace").splitlines() if line.strip()]
+    for position, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+            positions.append(position)
+        except ValueError as e:
+            errors.append({"index": position, "error": f"Invalid JSON: {e}"})
+
+    return positions, records, errors
+
+
 @router.get("/events/{event_id}/contemporaneous", response_model=List[ChronologyEventResponse])
 async def get_contemporaneous_events(
     event_id: int,
@@ -105,8 +280,83 @@ async def get_contemporaneous_events(
     return events
 
 
+@router.get("/contemporaneity", response_model=ContemporaneityResponse)
+async def get_contemporaneity_matrix(
+    window_years: int = Query(10, ge=0, description="Maximum years between events"),
+    year_start: Optional[int] = Query(None, description="Start year (negative for BC)"),
+    year_end: Optional[int] = Query(None, description="End year (negative for BC)"),
+    era: Optional[ChronologyEra] = Query(None, description="Filter by era"),
+    event_type: Optional[EventType] = Query(None, description="Filter by event type"),
+    include_pairs: bool = Query(True, description="Return the sparse pair matrix"),
+    db: Session = Depends(get_db),
+):
+    """
+    Find every pair of events within `window_years` of each other.
+
+    Returns a sparse upper-triangular CSR matrix over the matching events in
+    chronological order, plus co-occurrence counts between event types.
+    Set include_pairs=false to get only the counts for wide windows.
+    """
+    engine = ChronologyEngine(db)
+
+    try:
+        return engine.contemporaneity_matrix(
+            window_years=window_years,
+            year_start=year_start,
+            year_end=year_end,
+            era=era,
+            event_type=event_type,
+            include_pairs=include_pairs,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/distances", response_model=DistanceMatrixResponse)
+async def get_distance_matrix(request: DistanceMatrixRequest, db: Session = Depends(get_db)):
+    """
+    Compute signed temporal distances between many events at once.
+
+    Each matrix entry is the target's start year minus the origin's. The min/max
+    matrices give the range the uncertain dates allow. With target_years, the
+    pairs whose range can match it (e.g. 483 years for Daniel 9) are listed.
+    """
+    engine = ChronologyEngine(db)
+
+    try:
+        return engine.temporal_distance_matrix(**request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/density", response_model=DensityResponse)
+async def get_timeline_density(
+    start: Optional[int] = Query(None, description="Start of visible range (negative for BC)"),
+    end: Optional[int] = Query(None, description="End of visible range (negative for BC)"),
+    resolution: Optional[str] = Query(
+        None, description="year, decade, century or millennium (default: chosen from range)"
+    ),
+    max_bins: int = Query(500, ge=1, le=10000, description="Bin budget for automatic resolution"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get event-count histograms for timeline zooming.
+
+    Bins come from a precomputed pyramid at year, decade, century and millennium
+    resolution. When raw_events is true the range holds few enough events to
+    fetch them from /events instead.
+    """
+    engine = ChronologyEngine(db)
+
+    try:
+        return engine.get_density(start, end, resolution, max_bins)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/summary", response_model=TimelineSummaryResponse)
 async def get_timeline_summary(
+    background_tasks: BackgroundTasks,
     start_year: Optional[int] = Query(None, description="Start year for summary"),
     end_year: Optional[int] = Query(None, description="End year for summary"),
     db: Session = Depends(get_db),
@@ -114,9 +364,28 @@ async def get_timeline_summary(
     """
     Get statistical summary of the timeline.
 
-    Returns event counts, distribution by era and type, and year range.
+    Returns event counts, distribution by era and type, and year range. If
+    events were written outside the API the summary is aggregated from the
+    events themselves and the century buckets are rebuilt after the response.
     """
     engine = ChronologyEngine(db)
-    summary = engine.get_timeline_summary(start_year, end_year)
+    current = engine.timeline_buckets_current()
+    if not current:
+        background_tasks.add_task(buckets.run_rebuild, SessionLocal)
 
-    return summary
+    return engine.get_timeline_summary(start_year, end_year, use_buckets=current)
+
+
+@router.get("/classification", response_model=ClassificationStatus)
+async def get_classification_status():
+    """
+    Status of the background worker that classifies newly inserted events.
+
+    New events are queued on commit, then linked to detected patterns and
+    matched against prophecies off the request path. lag_seconds is the age
+    of the oldest event still waiting.
+    """
+    worker = get_classification_worker()
+    if worker is None:
+        raise HTTPException(status_code=503, detail="Classification worker is not running")
+    return worker.status()
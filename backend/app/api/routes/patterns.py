@@ -2,17 +2,27 @@
 API routes for pattern recognition and analysis.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.patterns.library import PatternLibrary
+from app.patterns.recurrence import EMPTY_STATISTICS
 from app.models.chronology import Pattern
 
 router = APIRouter()
 
 
+class DetectBatchRequest(BaseModel):
+    """Events to run pattern detection over."""
+
+    event_ids: Optional[List[int]] = Field(
+        None, description="Event IDs to analyze (default: the whole chronology)"
+    )
+
+
 @router.get("/", response_model=List[Dict[str, Any]])
 def get_patterns(
     pattern_type: str = Query(None, description="Filter by pattern type"),
@@ -44,6 +54,59 @@ def get_patterns(
     ]
 
 
+@router.get("/recurrence")
+def get_recurrence_statistics(db: Session = Depends(get_db)):
+    """
+    Recurrence statistics for every pattern at once.
+    Instance counts, mean/median/stddev intervals, first/last occurrence and
+    era distribution, computed in SQL and cached until pattern links change.
+    """
+    library = PatternLibrary(db)
+    statistics = library.recurrence_statistics()
+
+    return {
+        "patterns": [
+            {
+                "pattern_id": p.id,
+                "pattern_name": p.name,
+                **statistics.get(p.id, EMPTY_STATISTICS),
+            }
+            for p in library.get_all_patterns()
+        ]
+    }
+
+
+@router.get("/sequences")
+def get_pattern_sequences(
+    window: int = Query(50, ge=1, le=5000, description="Maximum span of a sequence in years"),
+    min_count: int = Query(2, ge=1, description="Minimum number of occurrences"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum pairs and triples returned"),
+    db: Session = Depends(get_db),
+):
+    """
+    Frequent ordered pattern sequences (pairs and triples) within a sliding window.
+    Ranked by occurrence count, with support, confidence and lift.
+    """
+    library = PatternLibrary(db)
+    return library.pattern_sequences(window, min_count, limit)
+
+
+@router.get("/similarity")
+def get_pattern_similarity(
+    pattern_id: Optional[List[int]] = Query(None, description="Patterns to score (default: all)"),
+    limit: int = Query(10, ge=1, le=500, description="Events per pattern"),
+    min_score: float = Query(0.1, ge=0, le=1, description="Minimum cosine similarity"),
+    db: Session = Depends(get_db),
+):
+    """
+    Events most similar to each pattern by TF-IDF cosine similarity.
+    Event names, descriptions and extra_data are compared with the pattern's
+    preconditions, indicators and outcomes after stemming.
+    """
+    library = PatternLibrary(db)
+    return {"patterns": library.pattern_similarity(pattern_id, limit, min_score)}
+
+
 @router.get("/{pattern_id}")
 def get_pattern(pattern_id: int, db: Session = Depends(get_db)):
     """Get a specific pattern by ID."""
@@ -131,6 +194,38 @@ def detect_patterns_in_event(
     }
 
 
+@router.post("/detect-batch")
+def detect_patterns_in_events(request: DetectBatchRequest, db: Session = Depends(get_db)):
+    """
+    Detect patterns across many events in one pass.
+    Returns per-event pattern confidences and per-pattern detection counts.
+    """
+    library = PatternLibrary(db)
+
+    return library.detect_patterns_batch(request.event_ids)
+
+
+@router.post("/relink")
+def relink_chronology(
+    strength: int = Query(7, ge=1, le=10, description="Strength for extra_data pattern links"),
+    include_detected: bool = Query(False, description="Also link keyword-detected patterns"),
+    on_conflict: str = Query(
+        "update_strength", description="update_strength, max_strength or ignore"
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Re-link the whole chronology to patterns in one transaction.
+    Returns counts of inserted, updated, unchanged and skipped links.
+    """
+    library = PatternLibrary(db)
+
+    try:
+        return library.relink_chronology(strength, include_detected, on_conflict)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/seed")
 def seed_core_patterns(db: Session = Depends(get_db)):
     """
@@ -3,11 +3,12 @@ Prophecy API Endpoints
 Handles prophecy-fulfillment mapping operations.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
+from app.prophecy.candidates import run_refresh
 from app.prophecy.library import ProphecyLibrary
 from app.models.prophecy import ProphecyText, ProphecyFulfillment, FulfillmentType
 
@@ -71,9 +72,30 @@ class FulfillmentCandidateResponse(BaseModel):
     event_name: str
     event_year: Optional[int] = None
     confidence: float
+    score: float
+    element_scores: Dict[str, float]
     matched_keywords: List[str]
 
 
+class RankedCandidateResponse(BaseModel):
+    event_id: int
+    event_name: str
+    event_year: Optional[int] = None
+    score: float
+    element_scores: Dict[str, float]
+    matched_keywords: List[str]
+
+
+class StoredCandidateResponse(BaseModel):
+    prophecy_id: int
+    event_id: int
+    event_name: str
+    event_year: Optional[int] = None
+    score: float
+    matched_keywords: List[str]
+    element_scores: Dict[str, float]
+
+
 class SeedResultResponse(BaseModel):
     total_prophecies: int
     seeded: int
@@ -118,6 +140,64 @@ def list_prophecies(
     ]
 
 
+@router.get("/candidates", response_model=List[StoredCandidateResponse])
+def list_candidates(
+    prophecy_id: Optional[int] = Query(None, description="Only this prophecy's candidates"),
+    min_score: float = Query(0.0, ge=0.0, description="Minimum prophecy score"),
+    limit: int = Query(50, ge=1, le=1000, description="Page size"),
+    offset: int = Query(0, ge=0, description="Rows to skip"),
+    db: Session = Depends(get_db),
+):
+    """
+    Page through precomputed fulfillment candidates, highest score first.
+
+    Candidates are stored for every prophecy and event and kept current as
+    events and prophecies are added; element_scores shows which prophecy
+    elements each event matches.
+    """
+    library = ProphecyLibrary(db)
+    return [
+        StoredCandidateResponse(**candidate)
+        for candidate in library.get_candidates(prophecy_id, min_score, limit, offset)
+    ]
+
+
+@router.post("/candidates/refresh", status_code=202)
+def refresh_candidates(
+    background_tasks: BackgroundTasks,
+    prophecy_id: Optional[int] = Query(None, description="Only re-score this prophecy"),
+):
+    """
+    Recompute stored fulfillment candidates in the background.
+
+    Re-scores one prophecy, or the whole prophecy x event matrix (e.g. after a
+    bulk import while the classification queue was full).
+    """
+    background_tasks.add_task(
+        run_refresh, SessionLocal, [prophecy_id] if prophecy_id is not None else None
+    )
+    return {"status": "scheduled", "prophecy_id": prophecy_id}
+
+
+@router.get("/timelines", response_model=List[TimelineAnalysisResponse])
+def analyze_timelines(
+    prophecy_type: Optional[str] = Query(None, description="Filter by prophecy type"),
+    scope: Optional[str] = Query(None, description="Filter by scope"),
+    db: Session = Depends(get_db),
+):
+    """
+    Fulfillment timelines of all prophecies in one call.
+
+    Same analysis as /{prophecy_id}/timeline for every prophecy, computed from a
+    constant number of queries.
+    """
+    library = ProphecyLibrary(db)
+    return [
+        TimelineAnalysisResponse(**analysis)
+        for analysis in library.analyze_fulfillment_timelines(prophecy_type, scope)
+    ]
+
+
 @router.get("/{prophecy_id}", response_model=ProphecyResponse)
 def get_prophecy(prophecy_id: int, db: Session = Depends(get_db)):
     """Get a specific prophecy by ID."""
@@ -172,11 +252,9 @@ def get_fulfillments(
 
     fulfillments = library.get_fulfillments(prophecy_id, fulfillment_type=ft_enum)
 
-    from app.models.chronology import ChronologyEvent
-
     result = []
     for f in fulfillments:
-        event = db.query(ChronologyEvent).filter(ChronologyEvent.id == f.event_id).first()
+        event = f.event
 
         result.append(
             FulfillmentWithEventResponse(
@@ -227,12 +305,15 @@ def detect_candidates(
     confidence_threshold: float = Query(
         0.5, ge=0.0, le=1.0, description="Minimum confidence score (0.0-1.0)"
     ),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum candidates"),
     db: Session = Depends(get_db),
 ):
     """
     Detect potential events that might fulfill a prophecy based on keyword matching.
 
-    Returns candidates with confidence scores based on keyword overlap.
+    Keeps events matching at least confidence_threshold of the prophecy's
+    keywords and returns them with their per-element and prophecy scores
+    (as in /rank-candidates), best first.
     """
     library = ProphecyLibrary(db)
 
@@ -242,7 +323,7 @@ def detect_candidates(
         raise HTTPException(status_code=404, detail="Prophecy not found")
 
     candidates = library.detect_fulfillment_candidates(
-        prophecy_id, confidence_threshold=confidence_threshold
+        prophecy_id, confidence_threshold=confidence_threshold, limit=limit
     )
 
     return [
@@ -251,12 +332,45 @@ def detect_candidates(
             event_name=c["event"].name,
             event_year=c["event"].year_start,
             confidence=c["confidence"],
+            score=c["score"],
+            element_scores=c["element_scores"],
             matched_keywords=c["matched_keywords"],
         )
         for c in candidates
     ]
 
 
+@router.post("/rank-candidates/{prophecy_id}", response_model=List[RankedCandidateResponse])
+def rank_candidates(
+    prophecy_id: int,
+    limit: int = Query(50, ge=1, le=1000, description="Maximum candidates"),
+    db: Session = Depends(get_db),
+):
+    """
+    Rank potential fulfilling events by BM25 relevance to each prophecy element.
+
+    Returns a score per matched element (e.g. head_gold, legs_iron) and their
+    sum as the prophecy score, best first.
+    """
+    library = ProphecyLibrary(db)
+
+    prophecy = library.get_prophecy_by_id(prophecy_id)
+    if not prophecy:
+        raise HTTPException(status_code=404, detail="Prophecy not found")
+
+    return [
+        RankedCandidateResponse(
+            event_id=c["event"].id,
+            event_name=c["event"].name,
+            event_year=c["event"].year_start,
+            score=c["score"],
+            element_scores=c["element_scores"],
+            matched_keywords=c["matched_keywords"],
+        )
+        for c in library.rank_fulfillment_candidates(prophecy_id, limit=limit)
+    ]
+
+
 @router.post("/seed", response_model=SeedResultResponse)
 def seed_prophecies(db: Session = Depends(get_db)):
     """
@@ -3,15 +3,22 @@ Simulation API Endpoints
 Handles scenario modeling, forecasting, and risk assessment.
 """
 
+import json
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from pydantic import BaseModel, Field
 
 from app.database import get_db
 from app.simulation.engine import SimulationEngine
+from app.simulation.sweep import ScenarioSweep
 from app.models.simulation import WorldIndicator, SimulationScenario
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -29,6 +36,24 @@ class CreateScenarioRequest(BaseModel):
     assumptions: Optional[dict] = Field(None, description="Additional assumptions")
 
 
+class ScenarioGrid(BaseModel):
+    """Alternatives combined by a scenario sweep; empty lists add no alternatives."""
+    indicator_ids: List[List[int]] = Field(
+        default_factory=list, description="Alternative indicator ID sets"
+    )
+    pattern_ids: List[List[int]] = Field(
+        default_factory=list, description="Alternative pattern ID sets"
+    )
+    assumptions: List[dict] = Field(default_factory=list, description="Alternative assumptions")
+
+
+class ScenarioSweepRequest(BaseModel):
+    """Request model for a parameter-sweep scenario batch."""
+    name: str = Field(..., description="Name prefix for the scenarios")
+    description: str = Field(..., description="Description shared by the scenarios")
+    grid: ScenarioGrid
+
+
 class IndicatorResponse(BaseModel):
     id: int
     indicator_name: str
@@ -55,6 +80,7 @@ class PreconditionMatchResponse(BaseModel):
     total_preconditions: int
     matched_preconditions: List[str]
     missing_preconditions: List[str]
+    evidence: dict = {}
     match_score: float
     risk_level: str
     typical_duration_years: Optional[int] = None
@@ -76,6 +102,22 @@ class TrajectoryProjectionResponse(BaseModel):
     trajectory_phases: List[dict]
 
 
+class MonteCarloProjectionResponse(BaseModel):
+    pattern_id: int
+    pattern_name: str
+    pattern_type: str
+    distribution: str
+    parameters: dict
+    observed_intervals: int
+    last_occurrence: int
+    seed: int
+    samples: int
+    mean_next_occurrence: float
+    percentiles: dict
+    cumulative_probability: List[dict]
+    convergence: dict
+
+
 class ScenarioResponse(BaseModel):
     id: int
     name: str
@@ -90,6 +132,11 @@ class ScenarioResponse(BaseModel):
         from_attributes = True
 
 
+class SweepScenarioResponse(ScenarioResponse):
+    assumptions: dict
+    parameters: dict
+
+
 class RiskScoreResponse(BaseModel):
     overall_risk_score: float
     risk_level: str
@@ -172,6 +219,45 @@ def project_trajectory(
     return TrajectoryProjectionResponse(**projection)
 
 
+@router.get(
+    "/patterns/{pattern_id}/trajectory/monte-carlo", response_model=MonteCarloProjectionResponse
+)
+def simulate_trajectory(
+    pattern_id: int,
+    current_year: int = Query(2026, description="Starting year for projection"),
+    distribution: str = Query(
+        "empirical", description="Interval distribution: empirical, lognormal or gamma"
+    ),
+    samples: int = Query(100000, ge=1000, le=5000000, description="Simulated occurrences"),
+    horizon_years: int = Query(100, ge=1, le=1000, description="Years of cumulative probability"),
+    seed: Optional[int] = Query(None, ge=0, description="Random seed for reproducible runs"),
+    db: Session = Depends(get_db),
+):
+    """
+    Project the next occurrence of a pattern by Monte Carlo simulation.
+
+    Fits the pattern's historical intervals and samples next occurrences,
+    returning percentiles, the probability of recurrence by each future year
+    and whether the ensemble has converged.
+    """
+    engine = SimulationEngine(db)
+    try:
+        projection = engine.simulate_pattern_trajectory(
+            pattern_id, current_year, distribution, samples, horizon_years, seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if "error" in projection:
+        raise HTTPException(status_code=404, detail=projection["error"])
+
+    if "projection" in projection:
+        # Insufficient data case
+        raise HTTPException(status_code=400, detail=projection["projection"])
+
+    return MonteCarloProjectionResponse(**projection)
+
+
 @router.post("/historical-analogs")
 def find_analogs(
     keywords: List[str] = Query(..., description="Keywords describing current conditions"),
@@ -267,6 +353,50 @@ def create_scenario(
     )
 
 
+@router.post("/scenarios/sweep")
+def sweep_scenarios(
+    request: ScenarioSweepRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Create one scenario per combination of a parameter grid.
+
+    Every combination of the grid's indicator sets, pattern sets and assumptions
+    is evaluated against one snapshot of the indicators (in worker processes for
+    large sweeps) and bulk-inserted. Scenarios are streamed back as they are
+    inserted, one JSON object per line, in completion order; parameters.index
+    gives each one's position in the grid.
+
+    The last line reports the sweep: {"sweep_id", "completed", "total"} once
+    every scenario is stored, or the same with an "error" if the sweep failed,
+    in which case it is rolled back and none of the streamed scenarios are kept.
+    """
+    engine = SimulationEngine(db)
+    try:
+        sweep = engine.sweep_scenarios(
+            request.name, request.description, request.grid.model_dump()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(_sweep_lines(db, sweep), media_type="application/x-ndjson")
+
+
+def _sweep_lines(db: Session, sweep: ScenarioSweep) -> Iterator[str]:
+    # get_db closes the session before the body is sent; the sweep reopens it
+    try:
+        for scenario in sweep:
+            yield SweepScenarioResponse(
+                **{**scenario, "created_at": scenario["created_at"].isoformat()}
+            ).model_dump_json() + "\n"
+    except Exception as e:
+        logger.exception("Scenario sweep %s failed", sweep.sweep_id)
+        yield json.dumps({**sweep.status(), "error": str(e)}) + "\n"
+    else:
+        yield json.dumps(sweep.status()) + "\n"
+    finally:
+        db.close()
+
 
 @router.get("/risk-assessment", response_model=RiskScoreResponse)
 def assess_risk(db: Session = Depends(get_db)):
@@ -0,0 +1,172 @@
+"""
+Chronology Analytics: vectorised batch operations over event year columns.
+
+Events are fetched once as NumPy columns (sorted by start year) and whole-corpus
+questions such as "which events fall within N years of each other" are answered
+with array operations instead of one query per event.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from sqlalchemy.orm import Query
+
+from app.models.chronology import ChronologyEra, ChronologyEvent, EventType
+
+# Stable integer codes for enum columns
+ERAS = list(ChronologyEra)
+EVENT_TYPES = list(EventType)
+_ERA_CODES = {era: code for code, era in enumerate(ERAS)}
+_EVENT_TYPE_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+
+class EventColumns:
+    """
+    Columnar view of a set of events, ordered by (year_start, id).
+
+    Attributes:
+        ids: Event IDs
+        year_start, year_end: Nominal span (year_end defaults to year_start)
+        start_min, start_max, end_min, end_max: Uncertainty bounds, defaulting to
+            the nominal years when absent
+        era_codes, type_codes: Indexes into ERAS and EVENT_TYPES
+    """
+
+    def __init__(self, rows):
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [()] * 9
+        (ids, year_start, year_end, start_min, start_max, end_min, end_max, eras, types) = columns
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.year_start = np.array(year_start, dtype=np.int32)
+        self.year_end = _fill(year_end, self.year_start)
+        self.start_min = _fill(start_min, self.year_start)
+        self.start_max = _fill(start_max, self.year_start)
+        self.end_min = _fill(end_min, self.year_end)
+        self.end_max = _fill(end_max, self.year_end)
+        self.era_codes = np.array([_ERA_CODES[e] for e in eras], dtype=np.uint8)
+        self.type_codes = np.array([_EVENT_TYPE_CODES[t] for t in types], dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, positions: np.ndarray) -> "EventColumns":
+        """New EventColumns holding the rows at `positions`, in that order."""
+        subset = EventColumns.__new__(EventColumns)
+        for name, values in vars(self).items():
+            setattr(subset, name, values[positions])
+        return subset
+
+    @classmethod
+    def from_query(cls, query: Query) -> "EventColumns":
+        """Fetch the temporal and classification columns of a ChronologyEvent query."""
+        rows = (
+            query.with_entities(
+                ChronologyEvent.id,
+                ChronologyEvent.year_start,
+                ChronologyEvent.year_end,
+                ChronologyEvent.year_start_min,
+                ChronologyEvent.year_start_max,
+                ChronologyEvent.year_end_min,
+                ChronologyEvent.year_end_max,
+                ChronologyEvent.era,
+                ChronologyEvent.event_type,
+            )
+            .order_by(ChronologyEvent.year_start, ChronologyEvent.id)
+            .all()
+        )
+        return cls(rows)
+
+
+def _fill(values, default: np.ndarray) -> np.ndarray:
+    """Convert a column with NULLs to int32, substituting `default` where missing."""
+    result = default.copy()
+    for i, value in enumerate(values):
+        if value is not None:
+            result[i] = value
+    return result
+
+
+def window_ends(years: np.ndarray, window_years: int) -> np.ndarray:
+    """For sorted years, the exclusive end index of each event's forward window."""
+    return np.searchsorted(years, years.astype(np.int64) + window_years, side="right")
+
+
+def contemporaneous_pairs(years: np.ndarray, window_years: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    All pairs of events at most `window_years` apart, as an upper-triangular CSR.
+
+    A single sweep over the sorted years: for event i the partners are exactly
+    the events i+1 .. end_i-1, so only the window ends need to be located.
+
+    Args:
+        years: Start years sorted ascending
+
+    Returns:
+        (indptr, indices): partners of event i are indices[indptr[i]:indptr[i + 1]],
+        all greater than i, so each unordered pair appears once
+    """
+    n = len(years)
+    positions = np.arange(n, dtype=np.int64)
+    counts = window_ends(years, window_years) - positions - 1
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    rows = np.repeat(positions, counts)
+    indices = np.arange(indptr[-1], dtype=np.int64) - indptr[rows] + rows + 1
+    return indptr, indices
+
+
+def count_pairs(years: np.ndarray, window_years: int) -> int:
+    """Number of unordered pairs at most `window_years` apart, without listing them."""
+    n = len(years)
+    return int((window_ends(years, window_years) - np.arange(n) - 1).sum())
+
+
+def category_cooccurrence(
+    years: np.ndarray, codes: np.ndarray, n_codes: int, window_years: int
+) -> np.ndarray:
+    """
+    Co-occurrence counts between categories (e.g. event types) within a window.
+
+    Uses prefix sums of one-hot category columns, so the cost is O(n * n_codes)
+    however many pairs fall inside the window.
+
+    Returns:
+        Symmetric (n_codes, n_codes) matrix; entry [a, b] counts unordered event
+        pairs with one event of category a and the other of category b
+    """
+    n = len(years)
+    onehot = np.zeros((n + 1, n_codes), dtype=np.int64)
+    onehot[np.arange(1, n + 1), codes] = 1
+    prefix = np.cumsum(onehot, axis=0)
+
+    # Per event, how many later events of each category fall inside its window
+    later = prefix[window_ends(years, window_years)] - prefix[np.arange(1, n + 1)]
+
+    directed = np.zeros((n_codes, n_codes), dtype=np.int64)
+    np.add.at(directed, codes, later)
+
+    matrix = directed + directed.T
+    np.fill_diagonal(matrix, np.diag(directed))
+    return matrix
+
+
+def distance_intervals(
+    origins: EventColumns, targets: EventColumns
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Signed start-to-start distances between every origin and target event.
+
+    Interval arithmetic over the start-year uncertainty bounds: with origin
+    start in [a_min, a_max] and target start in [b_min, b_max] the distance
+    lies in [b_min - a_max, b_max - a_min].
+
+    Returns:
+        (nominal, minimum, maximum) matrices of shape (len(origins), len(targets))
+    """
+    nominal = targets.year_start[None, :].astype(np.int64) - origins.year_start[:, None]
+    minimum = targets.start_min[None, :].astype(np.int64) - origins.start_max[:, None]
+    maximum = targets.start_max[None, :].astype(np.int64) - origins.start_min[:, None]
+    return nominal, minimum, maximum
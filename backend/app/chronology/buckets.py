@@ -0,0 +1,253 @@
+"""
+Timeline Buckets: materialised century statistics for timeline summaries.
+
+Event counts and min/max start years are kept per (century, era, event_type)
+in the timeline_buckets table. A summary over [start_year, end_year] reads the
+whole centuries inside the range from that table and aggregates only the two
+partial centuries at the edges from chronology_events.
+
+Each bucket also records the highest event ID it counts, so the table carries
+the same (count, highest ID) fingerprint as chronology_events. Events written
+outside ChronologyEngine (import scripts, manual SQL) make the two disagree;
+readers then aggregate from chronology_events directly and leave the repair to
+rebuild(), which the summary endpoint schedules as a background task.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.chronology.index import chronology_version
+from app.models.chronology import ChronologyEra, ChronologyEvent, EventType, TimelineBucket
+
+logger = logging.getLogger(__name__)
+
+BUCKET_YEARS = 100
+
+# First year of the century containing year_start, using floor semantics for BC years
+# (truncating % in SQL is folded back into 0..99 so it is portable across dialects)
+_bucket_expr = ChronologyEvent.year_start - (
+    (ChronologyEvent.year_start % BUCKET_YEARS) + BUCKET_YEARS
+) % BUCKET_YEARS
+
+# (era, event_type) -> [count, min_year, max_year]
+Aggregates = Dict[Tuple[ChronologyEra, EventType], List[int]]
+
+
+def bucket_start(year: int) -> int:
+    """First year of the century bucket containing `year`."""
+    return year - year % BUCKET_YEARS
+
+
+def record_events(
+    db: Session, events: Iterable[Tuple[int, int, ChronologyEra, EventType]]
+) -> None:
+    """
+    Add newly inserted events to their buckets within the caller's transaction.
+
+    Counters are bumped with INSERT ... ON CONFLICT DO UPDATE SET
+    event_count = event_count + n, so concurrent writers neither lose
+    increments nor collide when creating the same bucket.
+
+    Args:
+        events: (id, year_start, era, event_type) of each inserted event
+
+    Raises:
+        NotImplementedError: If the database is neither PostgreSQL nor SQLite
+    """
+    deltas: Dict[Tuple[int, ChronologyEra, EventType], List[int]] = {}
+    for event_id, year, era, event_type in events:
+        key = (bucket_start(year), era, event_type)
+        delta = deltas.get(key)
+        if delta is None:
+            deltas[key] = [1, year, year, event_id]
+        else:
+            delta[0] += 1
+            delta[1] = min(delta[1], year)
+            delta[2] = max(delta[2], year)
+            delta[3] = max(delta[3], event_id)
+
+    if not deltas:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        upsert = postgresql.insert
+    elif dialect == "sqlite":
+        upsert = sqlite.insert
+    else:
+        raise NotImplementedError(f"Timeline buckets do not support the {dialect} dialect")
+
+    statement = upsert(TimelineBucket.__table__)
+    bucket = TimelineBucket.__table__.c
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=["century_start", "era", "event_type"],
+        set_={
+            "event_count": bucket.event_count + excluded.event_count,
+            "min_year": case(
+                (bucket.min_year > excluded.min_year, excluded.min_year),
+                else_=bucket.min_year,
+            ),
+            "max_year": case(
+                (bucket.max_year < excluded.max_year, excluded.max_year),
+                else_=bucket.max_year,
+            ),
+            "max_event_id": case(
+                (bucket.max_event_id < excluded.max_event_id, excluded.max_event_id),
+                else_=bucket.max_event_id,
+            ),
+        },
+    )
+    db.execute(
+        statement,
+        [
+            {
+                "century_start": century,
+                "era": era,
+                "event_type": event_type,
+                "event_count": count,
+                "min_year": min_year,
+                "max_year": max_year,
+                "max_event_id": max_event_id,
+            }
+            for (century, era, event_type), (count, min_year, max_year, max_event_id)
+            in deltas.items()
+        ],
+    )
+    db.flush()
+
+
+def rebuild(db: Session) -> None:
+    """Recompute every bucket from chronology_events with one GROUP BY and commit."""
+    db.execute(delete(TimelineBucket))
+    db.execute(
+        insert(TimelineBucket).from_select(
+            [
+                "century_start",
+                "era",
+                "event_type",
+                "event_count",
+                "min_year",
+                "max_year",
+                "max_event_id",
+            ],
+            select(
+                _bucket_expr,
+                ChronologyEvent.era,
+                ChronologyEvent.event_type,
+                func.count(ChronologyEvent.id),
+                func.min(ChronologyEvent.year_start),
+                func.max(ChronologyEvent.year_start),
+                func.max(ChronologyEvent.id),
+            ).group_by(_bucket_expr, ChronologyEvent.era, ChronologyEvent.event_type),
+        )
+    )
+    db.commit()
+
+
+def run_rebuild(session_factory: Callable[[], Session]) -> None:
+    """
+    Background-task entry point: rebuild the buckets in a session of its own.
+
+    Failures are logged, since there is no request left to report them to.
+    """
+    db = session_factory()
+    try:
+        rebuild(db)
+    except Exception:
+        logger.exception("Timeline bucket rebuild failed")
+    finally:
+        db.close()
+
+
+def bucket_version(db: Session) -> Tuple[int, int]:
+    """The (event count, highest event ID) the buckets account for."""
+    count, max_id = db.query(
+        func.coalesce(func.sum(TimelineBucket.event_count), 0),
+        func.max(TimelineBucket.max_event_id),
+    ).one()
+    return count, max_id or 0
+
+
+def is_current(db: Session) -> bool:
+    """Whether the buckets count exactly the events in chronology_events."""
+    return bucket_version(db) == chronology_version(db)
+
+
+def summarize(
+    db: Session,
+    start_year: Optional[int],
+    end_year: Optional[int],
+    use_buckets: bool = True,
+) -> Aggregates:
+    """
+    Aggregate counts and year bounds per (era, event_type) for start years in range.
+
+    Whole centuries come from timeline_buckets; the partial centuries at either
+    end of the range are aggregated directly from chronology_events. With
+    use_buckets False (stale buckets) the whole range is aggregated from
+    chronology_events.
+    """
+    first_full = None if start_year is None else -(-start_year // BUCKET_YEARS) * BUCKET_YEARS
+    last_full = None if end_year is None else bucket_start(end_year + 1) - BUCKET_YEARS
+
+    totals: Aggregates = defaultdict(lambda: [0, None, None])
+
+    if not use_buckets:
+        _merge(totals, _event_aggregates(db, start_year, end_year))
+        return totals
+
+    if first_full is not None and last_full is not None and first_full > last_full:
+        # Range lies within (at most) two partial centuries
+        _merge(totals, _event_aggregates(db, start_year, end_year))
+        return totals
+
+    query = db.query(
+        TimelineBucket.era,
+        TimelineBucket.event_type,
+        func.sum(TimelineBucket.event_count),
+        func.min(TimelineBucket.min_year),
+        func.max(TimelineBucket.max_year),
+    )
+    if first_full is not None:
+        query = query.filter(TimelineBucket.century_start >= first_full)
+    if last_full is not None:
+        query = query.filter(TimelineBucket.century_start <= last_full)
+    _merge(totals, query.group_by(TimelineBucket.era, TimelineBucket.event_type).all())
+
+    if first_full is not None and start_year < first_full:
+        _merge(totals, _event_aggregates(db, start_year, first_full - 1))
+    if last_full is not None and end_year >= last_full + BUCKET_YEARS:
+        _merge(totals, _event_aggregates(db, last_full + BUCKET_YEARS, end_year))
+
+    return totals
+
+
+def _event_aggregates(
+    db: Session, start_year: Optional[int], end_year: Optional[int]
+) -> List[Any]:
+    query = db.query(
+        ChronologyEvent.era,
+        ChronologyEvent.event_type,
+        func.count(ChronologyEvent.id),
+        func.min(ChronologyEvent.year_start),
+        func.max(ChronologyEvent.year_start),
+    )
+    if start_year is not None:
+        query = query.filter(ChronologyEvent.year_start >= start_year)
+    if end_year is not None:
+        query = query.filter(ChronologyEvent.year_start <= end_year)
+    return query.group_by(ChronologyEvent.era, ChronologyEvent.event_type).all()
+
+
+def _merge(totals: Aggregates, rows: Iterable[Any]) -> None:
+    for era, event_type, count, min_year, max_year in rows:
+        entry = totals[(era, event_type)]
+        entry[0] += count
+        entry[1] = min_year if entry[1] is None else min(entry[1], min_year)
+        entry[2] = max_year if entry[2] is None else max(entry[2], max_year)
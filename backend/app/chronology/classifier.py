@@ -0,0 +1,270 @@
+"""
+Chronology Classifier: background pattern detection and prophecy matching for new events.
+
+A single daemon thread consumes the IDs of newly committed events (delivered by
+chronology.hooks) from a bounded in-memory queue. Bursts are coalesced into
+batches; each batch gets one session that links detected patterns and stores
+the events' prophecy fulfillment candidates (see prophecy.candidates). Requests
+that insert events only pay for appending IDs to the queue. Newly created
+prophecies are queued the same way (enqueue_prophecies) and scored against
+every event on the worker thread.
+
+When the queue is full new IDs are dropped and counted; the relink endpoint
+(POST /patterns/relink with include_detected) and the candidate refresh
+(POST /prophecies/candidates/refresh) catch up on them.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.chronology import hooks
+from app.config import settings
+from app.patterns.library import PatternLibrary
+from app.prophecy.library import ProphecyLibrary
+
+logger = logging.getLogger(__name__)
+
+
+class ClassificationWorker:
+    """In-process queue and worker thread classifying newly inserted events."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_queue: int = settings.CLASSIFICATION_QUEUE_SIZE,
+        batch_size: int = settings.CLASSIFICATION_BATCH_SIZE,
+        batch_wait: float = 0.2,
+    ):
+        """
+        Create a stopped worker.
+
+        Args:
+            session_factory: Creates a database session per batch
+            max_queue: Maximum queued event IDs; further IDs are dropped
+            batch_size: Maximum events classified per batch
+            batch_wait: Seconds to wait for a burst to fill a batch
+        """
+        self.session_factory = session_factory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+
+        # (event_id, enqueued at) in arrival order
+        self._queue: Deque[Tuple[int, float]] = deque()
+        # Prophecies whose candidates are still to be scored, in arrival order
+        self._prophecies: List[int] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._busy = False
+
+        self._stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "processed": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "patterns_linked": 0,
+            "prophecy_candidates": 0,
+            "prophecies_scored": 0,
+        }
+        self._last_batch: Optional[Dict[str, Any]] = None
+        self._last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the worker thread and subscribe to new-event notifications."""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="chronology-classifier", daemon=True
+        )
+        self._thread.start()
+        hooks.subscribe(self.enqueue)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Unsubscribe and stop after the batch in progress; queued IDs are discarded."""
+        hooks.unsubscribe(self.enqueue)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, event_ids: List[int]) -> int:
+        """
+        Queue events for classification without blocking.
+
+        Returns:
+            Number of IDs accepted (the rest were dropped because the queue is full)
+        """
+        now = time.monotonic()
+        with self._condition:
+            accepted = max(0, min(len(event_ids), self.max_queue - len(self._queue)))
+            self._queue.extend((event_id, now) for event_id in event_ids[:accepted])
+            self._stats["enqueued"] += accepted
+            self._stats["dropped"] += len(event_ids) - accepted
+            if accepted:
+                self._condition.notify()
+        return accepted
+
+    def enqueue_prophecies(self, prophecy_ids: List[int]) -> None:
+        """Queue prophecies to have their fulfillment candidates scored against every event."""
+        with self._condition:
+            self._prophecies.extend(
+                prophecy_id for prophecy_id in prophecy_ids if prophecy_id not in self._prophecies
+            )
+            self._condition.notify()
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Block until the queue is empty and no batch is running (for tests and shutdown)."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._queue or self._prophecies or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depth, lag and throughput counters."""
+        now = time.monotonic()
+        with self._condition:
+            oldest = self._queue[0][1] if self._queue else None
+            return {
+                "running": self.running,
+                "queue_depth": len(self._queue),
+                "prophecies_queued": len(self._prophecies),
+                "max_queue": self.max_queue,
+                "lag_seconds": now - oldest if oldest is not None else 0.0,
+                **self._stats,
+                "last_batch": dict(self._last_batch) if self._last_batch else None,
+                "last_error": self._last_error,
+            }
+
+    def _next_batch(self) -> Tuple[List[Tuple[int, float]], List[int]]:
+        """Wait for work, then give a burst up to batch_wait to fill the batch."""
+        with self._condition:
+            while not self._queue and not self._prophecies and not self._stopping:
+                self._condition.wait()
+            if self._stopping:
+                return [], []
+            deadline = time.monotonic() + self.batch_wait
+            while self._queue and len(self._queue) < self.batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            prophecy_ids, self._prophecies = self._prophecies, []
+            self._busy = bool(batch or prophecy_ids)
+            return batch, prophecy_ids
+
+    def _run(self) -> None:
+        while True:
+            batch, prophecy_ids = self._next_batch()
+            if not batch and not prophecy_ids:
+                return
+            if prophecy_ids:
+                self._score_prophecies(prophecy_ids)
+            if batch:
+                self._classify_batch(batch)
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+    def _score_prophecies(self, prophecy_ids: List[int]) -> None:
+        try:
+            db = self.session_factory()
+            try:
+                ProphecyLibrary(db).refresh_candidates(prophecy_ids=prophecy_ids)
+            finally:
+                db.close()
+            error = None
+        except Exception as e:  # keep the worker alive; POST /candidates/refresh catches up
+            logger.exception("Prophecy candidate scoring failed")
+            error = str(e)
+
+        with self._condition:
+            if error is None:
+                self._stats["prophecies_scored"] += len(prophecy_ids)
+            else:
+                self._last_error = error
+
+    def _classify_batch(self, batch: List[Tuple[int, float]]) -> None:
+        started = time.monotonic()
+        try:
+            result = self.classify([event_id for event_id, _ in batch])
+            error = None
+        except Exception as e:  # keep the worker alive; the batch can be relinked later
+            logger.exception("Classification batch failed")
+            result, error = None, str(e)
+        finished = time.monotonic()
+
+        with self._condition:
+            self._stats["batches"] += 1
+            if result is None:
+                self._stats["failed_batches"] += 1
+                self._last_error = error
+            else:
+                self._stats["processed"] += len(batch)
+                self._stats["patterns_linked"] += result["patterns_linked"]
+                self._stats["prophecy_candidates"] += result["prophecy_candidates"]
+            self._last_batch = {
+                "events": len(batch),
+                "duration_seconds": finished - started,
+                "max_lag_seconds": finished - batch[0][1],
+            }
+
+    def classify(self, event_ids: List[int]) -> Dict[str, Any]:
+        """
+        Link detected patterns and store prophecy candidates for a batch of events.
+
+        Returns:
+            Dictionary with the number of new pattern links and candidate rows
+        """
+        db = self.session_factory()
+        try:
+            links = PatternLibrary(db).link_detected_patterns(event_ids)
+            candidates = ProphecyLibrary(db).refresh_candidates(event_ids=event_ids)
+        finally:
+            db.close()
+        return {
+            "patterns_linked": links["inserted"],
+            "prophecy_candidates": candidates["inserted"],
+        }
+
+
+_worker: Optional[ClassificationWorker] = None
+
+
+def get_classification_worker() -> Optional[ClassificationWorker]:
+    """The application's worker, or None if it has not been started."""
+    return _worker
+
+
+def start_classification_worker(session_factory: Callable[[], Session]) -> ClassificationWorker:
+    """Start the application's worker (once) and return it."""
+    global _worker
+    if _worker is None:
+        _worker = ClassificationWorker(session_factory)
+    _worker.start()
+    return _worker
+
+
+def stop_classification_worker() -> None:
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
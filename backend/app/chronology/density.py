@@ -0,0 +1,151 @@
+"""
+Timeline Density: multi-resolution event-count pyramid for timeline zooming.
+
+Event counts per era and per event type are precomputed at year, decade,
+century and millennium resolution from the chronology snapshot. A zoomed-out
+timeline fetches a few hundred bins from the matching level instead of every
+event; raw events are only worth fetching once the visible range is small.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.chronology.analytics import ERAS, EVENT_TYPES, EventColumns
+from app.chronology.snapshot import get_chronology_snapshot
+
+# Resolution name -> bin width in years, finest first
+RESOLUTIONS = {"year": 1, "decade": 10, "century": 100, "millennium": 1000}
+
+
+class DensityLevel:
+    """
+    Histogram at one resolution, holding only non-empty bins.
+
+    Attributes:
+        bin_years: Bin width in years
+        starts: First year of each non-empty bin, ascending
+        era_counts: (bins, len(ERAS)) event counts
+        type_counts: (bins, len(EVENT_TYPES)) event counts
+    """
+
+    def __init__(
+        self, bin_years: int, starts: np.ndarray, era_counts: np.ndarray, type_counts: np.ndarray
+    ):
+        self.bin_years = bin_years
+        self.starts = starts
+        self.era_counts = era_counts
+        self.type_counts = type_counts
+
+    @classmethod
+    def from_events(cls, columns: EventColumns) -> "DensityLevel":
+        """Year-resolution histogram of event start years."""
+        starts, bins = np.unique(columns.year_start.astype(np.int64), return_inverse=True)
+        era_counts = np.zeros((len(starts), len(ERAS)), dtype=np.int64)
+        type_counts = np.zeros((len(starts), len(EVENT_TYPES)), dtype=np.int64)
+        np.add.at(era_counts, (bins, columns.era_codes), 1)
+        np.add.at(type_counts, (bins, columns.type_codes), 1)
+        return cls(1, starts, era_counts, type_counts)
+
+    def coarsen(self, bin_years: int) -> "DensityLevel":
+        """Merge bins into wider ones; `bin_years` must be a multiple of this level's width."""
+        merged = self.starts - self.starts % bin_years
+        starts, first = np.unique(merged, return_index=True)
+        if len(starts) == 0:
+            return DensityLevel(bin_years, starts, self.era_counts, self.type_counts)
+        return DensityLevel(
+            bin_years,
+            starts,
+            np.add.reduceat(self.era_counts, first, axis=0),
+            np.add.reduceat(self.type_counts, first, axis=0),
+        )
+
+    def window(self, start: Optional[int], end: Optional[int]) -> slice:
+        """Slice of the bins overlapping [start, end]."""
+        lo = 0 if start is None else np.searchsorted(self.starts, start - start % self.bin_years)
+        hi = len(self.starts) if end is None else np.searchsorted(self.starts, end, side="right")
+        return slice(int(lo), int(hi))
+
+
+class DensityPyramid:
+    """Histograms of the whole chronology at every resolution in RESOLUTIONS."""
+
+    def __init__(self, columns: EventColumns, version: Tuple[int, int]):
+        self.version = version
+        self.years: Tuple[int, int] = (
+            (int(columns.year_start.min()), int(columns.year_start.max()))
+            if len(columns)
+            else (0, 0)
+        )
+        self.levels: Dict[str, DensityLevel] = {}
+
+        level = DensityLevel.from_events(columns)
+        for name, bin_years in RESOLUTIONS.items():
+            level = level if level.bin_years == bin_years else level.coarsen(bin_years)
+            self.levels[name] = level
+
+    def choose_resolution(self, start: Optional[int], end: Optional[int], max_bins: int) -> str:
+        """Finest resolution whose bins over [start, end] number at most max_bins."""
+        first = self.years[0] if start is None else start
+        last = self.years[1] if end is None else end
+        span = max(last - first + 1, 1)
+        for name, bin_years in RESOLUTIONS.items():
+            if -(-span // bin_years) <= max_bins:
+                return name
+        return list(RESOLUTIONS)[-1]
+
+    def query(self, start: Optional[int], end: Optional[int], resolution: str) -> Dict[str, Any]:
+        """
+        Non-empty bins overlapping [start, end] at one resolution.
+
+        Edge bins are whole bins, so they may count events just outside the range.
+        """
+        level = self.levels[resolution]
+        window = level.window(start, end)
+        era_counts = level.era_counts[window]
+        type_counts = level.type_counts[window]
+        totals = era_counts.sum(axis=1)
+
+        bins = [
+            {
+                "start": int(bin_start),
+                "end": int(bin_start) + level.bin_years - 1,
+                "count": int(total),
+                "eras": {ERAS[i].value: int(c) for i, c in enumerate(eras) if c},
+                "types": {EVENT_TYPES[i].value: int(c) for i, c in enumerate(types) if c},
+            }
+            for bin_start, total, eras, types in zip(
+                level.starts[window].tolist(), totals.tolist(), era_counts, type_counts
+            )
+        ]
+
+        return {
+            "resolution": resolution,
+            "bin_years": level.bin_years,
+            "total_events": int(totals.sum()),
+            "bins": bins,
+        }
+
+
+# Process-wide pyramid for the current snapshot
+_pyramids: Dict[str, DensityPyramid] = {}
+_lock = threading.Lock()
+
+
+def get_density_pyramid(db: Session, directory: Optional[Path] = None) -> DensityPyramid:
+    """Get the pyramid for the current dataset version, rebuilding it from the snapshot."""
+    snapshot = get_chronology_snapshot(db, directory)
+    key = str(snapshot.path.parent)
+    pyramid = _pyramids.get(key)
+
+    if pyramid is None or pyramid.version != snapshot.version:
+        with _lock:
+            pyramid = _pyramids.get(key)
+            if pyramid is None or pyramid.version != snapshot.version:
+                pyramid = DensityPyramid(snapshot.columns, snapshot.version)
+                _pyramids[key] = pyramid
+
+    return pyramid
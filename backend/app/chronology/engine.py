@@ -5,12 +5,82 @@ This engine maintains the authoritative Biblical-to-present timeline,
 handles uncertainty ranges, and provides temporal indexing operations.
 """
 
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import date
+import io
+import numpy as np
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, insert, or_, select, true, tuple_
+from sqlalchemy.exc import DBAPIError
 
+from app.config import settings
 from app.models.chronology import ChronologyEvent, ChronologyEra, EventType
+from app.chronology import analytics, buckets
+from app.chronology.density import RESOLUTIONS, get_density_pyramid
+from app.chronology.hooks import record_new_events
+from app.chronology.index import get_chronology_index, invalidate_chronology_index
+from app.schemas.chronology import ChronologyEventCreate
+
+# Rows per INSERT batch in add_events_bulk
+BULK_BATCH_SIZE = 1000
+
+# Largest pair list contemporaneity_matrix will materialise
+MAX_CONTEMPORANEOUS_PAIRS = 1_000_000
+
+# Largest row/column count temporal_distance_matrix will compute
+MAX_DISTANCE_MATRIX_EVENTS = 2000
+
+# Bin budget for automatic density resolution, and the event count below which
+# a timeline view should fetch raw events instead of bins
+DENSITY_MAX_BINS = 500
+RAW_EVENT_THRESHOLD = 500
+
+
+def overlap_filter(
+    year_start: Optional[int], year_end: Optional[int], include_uncertain: bool = True
+):
+    """
+    SQL predicate matching events whose span overlaps [year_start, year_end].
+
+    Mirrors the interval index: the nominal span is [year_start, year_end or
+    year_start]; with include_uncertain the test widens to the hull of the
+    span and the year_*_min/max bounds. A bound of None leaves that side open.
+    """
+    clauses = []
+
+    if year_end is not None:
+        if include_uncertain:
+            clauses.append(
+                or_(
+                    ChronologyEvent.year_start <= year_end,
+                    ChronologyEvent.year_start_min <= year_end,
+                    ChronologyEvent.year_end_min <= year_end,
+                )
+            )
+        else:
+            clauses.append(ChronologyEvent.year_start <= year_end)
+
+    if year_start is not None:
+        ends_after = [
+            ChronologyEvent.year_start >= year_start,
+            ChronologyEvent.year_end >= year_start,
+        ]
+        if include_uncertain:
+            ends_after += [
+                ChronologyEvent.year_start_max >= year_start,
+                ChronologyEvent.year_end_max >= year_start,
+            ]
+        clauses.append(or_(*ends_after))
+
+    return and_(true(), *clauses)
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into one readable line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
 
 
 class ChronologyEngine:
@@ -27,30 +97,35 @@ class ChronologyEngine:
     - Identify contemporaneous events across different regions
     """
 
-    def __init__(self, db: Session):
+    # Maximum number of IDs bound into a single IN (...) lookup
+    FETCH_CHUNK_SIZE = 500
+
+    def __init__(self, db: Session, use_index: Optional[bool] = None):
+        """
+        Args:
+            db: Database session
+            use_index: Answer range and year queries from the shared in-process
+                       interval index (defaults to settings.CHRONOLOGY_INDEX_ENABLED)
+        """
         self.db = db
+        self.use_index = settings.CHRONOLOGY_INDEX_ENABLED if use_index is None else use_index
 
-    def get_event_by_year(self, year: int, tolerance: int = 0) -> List[ChronologyEvent]:
+    def get_event_by_year(
+        self, year: int, tolerance: int = 0, include_uncertain: bool = False
+    ) -> List[ChronologyEvent]:
         """
         Retrieve all events occurring in a specific year.
 
         Args:
             year: Year in Ussher chronology (negative for BC, positive for AD)
             tolerance: Years of flexibility (e.g., tolerance=5 finds events within 5 years)
+            include_uncertain: Also match events whose uncertainty bounds reach the year
 
         Returns:
-            List of events occurring in or near the specified year
+            List of events whose span touches [year - tolerance, year + tolerance],
+            ordered by start year
         """
-        query = self.db.query(ChronologyEvent).filter(
-            and_(
-                ChronologyEvent.year_start >= year - tolerance,
-                or_(
-                    ChronologyEvent.year_end.is_(None),
-                    ChronologyEvent.year_end <= year + tolerance,
-                ),
-            )
-        )
-        return query.all()
+        return self._events_overlapping(year - tolerance, year + tolerance, include_uncertain)
 
     def get_events_in_range(
         self, year_start: int, year_end: int, include_uncertain: bool = True
@@ -58,6 +133,9 @@ class ChronologyEngine:
         """
         Retrieve all events within a year range.
 
+        An event matches when its span [year_start, year_end] overlaps the range;
+        events without a year_end are treated as single-year events.
+
         Args:
             year_start: Beginning of range (Ussher chronology)
             year_end: End of range (Ussher chronology)
@@ -65,61 +143,112 @@ class ChronologyEngine:
                              might fall within range
 
         Returns:
-            List of events in the specified range
+            List of events in the specified range, ordered by start year
         """
-        base_query = self.db.query(ChronologyEvent).filter(
-            or_(
-                # Event starts within range
-                and_(
-                    ChronologyEvent.year_start >= year_start,
-                    ChronologyEvent.year_start <= year_end,
-                ),
-                # Event ends within range
-                and_(
-                    ChronologyEvent.year_end.isnot(None),
-                    ChronologyEvent.year_end >= year_start,
-                    ChronologyEvent.year_end <= year_end,
-                ),
-                # Event spans entire range
-                and_(
-                    ChronologyEvent.year_start <= year_start,
-                    or_(
-                        ChronologyEvent.year_end.is_(None),
-                        ChronologyEvent.year_end >= year_end,
-                    ),
-                ),
-            )
+        return self._events_overlapping(year_start, year_end, include_uncertain)
+
+    def _events_overlapping(
+        self, year_start: int, year_end: int, include_uncertain: bool
+    ) -> List[ChronologyEvent]:
+        """Resolve an overlap query via the interval index or a single SQL statement."""
+        if self.use_index:
+            index = get_chronology_index(self.db)
+            return self._fetch_events(index.overlapping(year_start, year_end, include_uncertain))
+
+        return (
+            self.db.query(ChronologyEvent)
+            .filter(overlap_filter(year_start, year_end, include_uncertain))
+            .order_by(ChronologyEvent.year_start, ChronologyEvent.id)
+            .all()
         )
 
-        if include_uncertain:
-            # Also include events where uncertainty bounds overlap with range
-            # Use union_all and distinct() to avoid JSON equality issues
-            uncertain_query = self.db.query(ChronologyEvent).filter(
-                or_(
-                    and_(
-                        ChronologyEvent.year_start_min.isnot(None),
-                        ChronologyEvent.year_start_min <= year_end,
-                        ChronologyEvent.year_start_max >= year_start,
-                    ),
-                    and_(
-                        ChronologyEvent.year_end_min.isnot(None),
-                        ChronologyEvent.year_end_min <= year_end,
-                        ChronologyEvent.year_end_max >= year_start,
-                    ),
-                )
+    def _fetch_events(self, event_ids: List[int]) -> List[ChronologyEvent]:
+        """Load events by ID in chunks, ordered by start year."""
+        events: List[ChronologyEvent] = []
+        for i in range(0, len(event_ids), self.FETCH_CHUNK_SIZE):
+            chunk = event_ids[i : i + self.FETCH_CHUNK_SIZE]
+            events.extend(
+                self.db.query(ChronologyEvent).filter(ChronologyEvent.id.in_(chunk)).all()
             )
-            # Get IDs from both queries and fetch unique events
-            base_ids = {e.id for e in base_query.all()}
-            uncertain_ids = {e.id for e in uncertain_query.all()}
-            all_ids = base_ids | uncertain_ids
-            
-            if all_ids:
-                return self.db.query(ChronologyEvent).filter(
-                    ChronologyEvent.id.in_(all_ids)
-                ).order_by(ChronologyEvent.year_start).all()
-            return []
+        events.sort(key=lambda e: (e.year_start, e.id))
+        return events
+
+    def get_events_page(
+        self,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        era: Optional[ChronologyEra] = None,
+        event_type: Optional[EventType] = None,
+        after: Optional[Tuple[int, int]] = None,
+        limit: int = 100,
+        include_uncertain: bool = True,
+    ) -> List[ChronologyEvent]:
+        """
+        Retrieve one page of events in chronological order with a single query.
+
+        All filters, ordering and the limit are applied in SQL. Paging is keyset
+        based on (year_start, id), so every page costs the same as the first.
 
-        return base_query.all()
+        Args:
+            year_start: Optional start of year range (range semantics as get_events_in_range)
+            year_end: Optional end of year range
+            era: Optional era filter
+            event_type: Optional event type filter
+            after: (year_start, id) of the last event on the previous page
+            limit: Maximum number of events to return
+            include_uncertain: Whether uncertainty bounds count towards the year range
+
+        Returns:
+            Up to `limit` events ordered by (year_start, id)
+        """
+        query = self._filtered_query(year_start, year_end, era, event_type, include_uncertain)
+
+        if after is not None:
+            query = query.filter(
+                tuple_(ChronologyEvent.year_start, ChronologyEvent.id) > tuple_(*after)
+            )
+
+        return query.order_by(ChronologyEvent.year_start, ChronologyEvent.id).limit(limit).all()
+
+    def iter_events(
+        self,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        era: Optional[ChronologyEra] = None,
+        event_type: Optional[EventType] = None,
+        include_uncertain: bool = True,
+        batch_size: int = 1000,
+    ) -> Iterator[ChronologyEvent]:
+        """
+        Iterate over matching events in chronological order without loading them all.
+
+        Rows are pulled from a server-side cursor `batch_size` at a time, so memory
+        stays flat regardless of table size. Filters are the same as get_events_page.
+        """
+        query = self._filtered_query(year_start, year_end, era, event_type, include_uncertain)
+        yield from query.order_by(ChronologyEvent.year_start, ChronologyEvent.id).yield_per(
+            batch_size
+        )
+
+    def _filtered_query(
+        self,
+        year_start: Optional[int],
+        year_end: Optional[int],
+        era: Optional[ChronologyEra],
+        event_type: Optional[EventType],
+        include_uncertain: bool,
+    ):
+        """Build an event query with the standard range, era and type filters."""
+        query = self.db.query(ChronologyEvent)
+
+        if year_start is not None or year_end is not None:
+            query = query.filter(overlap_filter(year_start, year_end, include_uncertain))
+        if era is not None:
+            query = query.filter(ChronologyEvent.era == era)
+        if event_type is not None:
+            query = query.filter(ChronologyEvent.event_type == event_type)
+
+        return query
 
     def get_events_by_era(self, era: ChronologyEra) -> List[ChronologyEvent]:
         """Retrieve all events within a specific chronological era."""
@@ -133,13 +262,105 @@ class ChronologyEngine:
             Number of years between events (negative if event1 is later than event2)
             None if either event doesn't exist
         """
-        event1 = self.db.query(ChronologyEvent).filter(ChronologyEvent.id == event1_id).first()
-        event2 = self.db.query(ChronologyEvent).filter(ChronologyEvent.id == event2_id).first()
+        years = dict(
+            self.db.query(ChronologyEvent.id, ChronologyEvent.year_start)
+            .filter(ChronologyEvent.id.in_([event1_id, event2_id]))
+            .all()
+        )
 
-        if not event1 or not event2:
+        if event1_id not in years or event2_id not in years:
             return None
 
-        return event2.year_start - event1.year_start
+        return years[event2_id] - years[event1_id]
+
+    def temporal_distance_matrix(
+        self,
+        event_ids: Optional[List[int]] = None,
+        to_event_ids: Optional[List[int]] = None,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        era: Optional[ChronologyEra] = None,
+        event_type: Optional[EventType] = None,
+        target_years: Optional[int] = None,
+        tolerance: int = 0,
+        max_events: int = MAX_DISTANCE_MATRIX_EVENTS,
+    ) -> Dict[str, Any]:
+        """
+        Signed start-to-start distances between many events, with uncertainty.
+
+        Events are fetched once as year columns and the matrices are computed by
+        NumPy broadcasting. Besides the nominal distance, interval arithmetic over
+        the year_start_min/max bounds gives the smallest and largest distance the
+        uncertain dates allow.
+
+        Args:
+            event_ids: Row events, in the order given; if omitted the filters select
+                       the events (in chronological order)
+            to_event_ids: Column events; defaults to the row events (square matrix)
+            year_start, year_end, era, event_type: Filters used when event_ids is omitted
+            target_years: Report the pairs whose distance can equal this value
+                          (e.g. 483 for Daniel 9's sixty-nine weeks)
+            tolerance: Extra years of slack when matching target_years
+            max_events: Refuse matrices with more rows or columns than this
+
+        Returns:
+            Dictionary with row/column event IDs, nominal/min/max matrices,
+            IDs that were not found, and the target matches when requested
+
+        Raises:
+            ValueError: If the matrix would exceed max_events in either dimension
+        """
+        requested = set(event_ids or []) | set(to_event_ids or [])
+        by_id = self.db.query(ChronologyEvent).filter(ChronologyEvent.id.in_(requested))
+        columns = analytics.EventColumns.from_query(by_id)
+        position = {event_id: i for i, event_id in enumerate(columns.ids.tolist())}
+
+        def select(ids: List[int]) -> analytics.EventColumns:
+            found = [position[event_id] for event_id in ids if event_id in position]
+            return columns.take(np.array(found, dtype=np.int64))
+
+        if event_ids is None:
+            origins = analytics.EventColumns.from_query(
+                self._filtered_query(year_start, year_end, era, event_type, True)
+            )
+        else:
+            origins = select(event_ids)
+        targets = select(to_event_ids) if to_event_ids is not None else origins
+
+        if max(len(origins), len(targets)) > max_events:
+            raise ValueError(
+                f"Distance matrix of {len(origins)} x {len(targets)} events exceeds the "
+                f"limit of {max_events}; narrow the selection"
+            )
+
+        nominal, minimum, maximum = analytics.distance_intervals(origins, targets)
+
+        result = {
+            "event_ids": origins.ids.tolist(),
+            "to_event_ids": targets.ids.tolist(),
+            "missing_ids": sorted(requested - set(position)),
+            "nominal": nominal.tolist(),
+            "min": minimum.tolist(),
+            "max": maximum.tolist(),
+            "target_matches": None,
+        }
+
+        if target_years is not None:
+            rows, cols = np.nonzero(
+                (minimum - tolerance <= target_years) & (maximum + tolerance >= target_years)
+            )
+            result["target_matches"] = [
+                {
+                    "from_event_id": int(origins.ids[i]),
+                    "to_event_id": int(targets.ids[j]),
+                    "nominal": int(nominal[i, j]),
+                    "min": int(minimum[i, j]),
+                    "max": int(maximum[i, j]),
+                }
+                for i, j in zip(rows.tolist(), cols.tolist())
+            ]
+
+        return result
 
     def find_contemporaneous_events(
         self, event_id: int, window_years: int = 10
@@ -174,6 +395,78 @@ class ChronologyEngine:
             .all()
         )
 
+    def contemporaneity_matrix(
+        self,
+        window_years: int = 10,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        era: Optional[ChronologyEra] = None,
+        event_type: Optional[EventType] = None,
+        include_pairs: bool = True,
+        max_pairs: int = MAX_CONTEMPORANEOUS_PAIRS,
+    ) -> Dict[str, Any]:
+        """
+        Find every pair of events within `window_years` of each other in one pass.
+
+        The batch counterpart of find_contemporaneous_events: matching events are
+        fetched once as year columns and swept in sorted order, producing a sparse
+        co-occurrence matrix plus co-occurrence counts between event types
+        (e.g. religious x political).
+
+        Args:
+            window_years: Maximum distance in years between start years
+            year_start, year_end, era, event_type: Filters as in get_events_page
+            include_pairs: Whether to return the pair matrix (counts are always returned)
+            max_pairs: Refuse to materialise more pairs than this
+
+        Returns:
+            Dictionary with event_ids in chronological order, the upper-triangular
+            CSR matrix (indptr, indices) over those positions, total_pairs and
+            type_cooccurrence counts
+
+        Raises:
+            ValueError: If the pair matrix would exceed max_pairs
+        """
+        columns = analytics.EventColumns.from_query(
+            self._filtered_query(year_start, year_end, era, event_type, include_uncertain=True)
+        )
+        years = columns.year_start
+
+        total_pairs = analytics.count_pairs(years, window_years)
+        if include_pairs and total_pairs > max_pairs:
+            raise ValueError(
+                f"{total_pairs} contemporaneous pairs exceed the limit of {max_pairs}; "
+                "narrow the window or filters, or request counts only"
+            )
+
+        types = analytics.EVENT_TYPES
+        matrix = analytics.category_cooccurrence(
+            years, columns.type_codes, len(types), window_years
+        )
+        type_cooccurrence = {
+            types[a].value: {
+                types[b].value: int(matrix[a, b]) for b in range(len(types)) if matrix[a, b]
+            }
+            for a in range(len(types))
+            if matrix[a].any()
+        }
+
+        result = {
+            "window_years": window_years,
+            "total_events": len(columns),
+            "total_pairs": total_pairs,
+            "event_ids": columns.ids.tolist(),
+            "type_cooccurrence": type_cooccurrence,
+            "indptr": None,
+            "indices": None,
+        }
+        if include_pairs:
+            indptr, indices = analytics.contemporaneous_pairs(years, window_years)
+            result["indptr"] = indptr.tolist()
+            result["indices"] = indices.tolist()
+
+        return result
+
     def add_event(
         self,
         name: str,
@@ -186,12 +479,16 @@ class ChronologyEngine:
         year_start_max: Optional[int] = None,
         biblical_source: Optional[str] = None,
         historical_source: Optional[str] = None,
+        extra_data: Optional[dict] = None,
+        year_end_min: Optional[int] = None,
+        year_end_max: Optional[int] = None,
         metadata: Optional[dict] = None,
     ) -> ChronologyEvent:
         """
         Add a new event to the chronology.
 
         This is the primary method for building and extending the timeline.
+        `metadata` is accepted as a legacy alias for `extra_data`.
         """
         event = ChronologyEvent(
             name=name,
@@ -200,54 +497,248 @@ class ChronologyEngine:
             year_end=year_end,
             year_start_min=year_start_min,
             year_start_max=year_start_max,
+            year_end_min=year_end_min,
+            year_end_max=year_end_max,
             era=era,
             event_type=event_type,
             biblical_source=biblical_source,
             historical_source=historical_source,
-            metadata=metadata,
+            extra_data=extra_data if extra_data is not None else metadata,
         )
 
         self.db.add(event)
+        self.db.flush()
+        buckets.record_events(
+            self.db, [(event.id, event.year_start, event.era, event.event_type)]
+        )
         self.db.commit()
         self.db.refresh(event)
+        invalidate_chronology_index(self.db)
 
         return event
 
+    def add_events_bulk(
+        self,
+        records: Iterable[Union[ChronologyEventCreate, Dict[str, Any]]],
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Add many events to the chronology in a single transaction.
+
+        All records are validated up front in one pass. Valid rows are written
+        in batches, each inside a savepoint: with COPY FROM STDIN on PostgreSQL
+        (see _copy_rows) and batched multi-row INSERT ... RETURNING statements
+        (executemany) elsewhere. If a batch is rejected by the database its rows
+        are retried one by one, so a bad row is reported without aborting the rest.
+
+        Args:
+            records: ChronologyEventCreate instances or raw dictionaries
+            batch_size: Rows per INSERT batch
+
+        Returns:
+            Dictionary with inserted/failed counts, new event IDs (in input order,
+            skipping failures) and per-row errors keyed by input index
+        """
+        errors: List[Dict[str, Any]] = []
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+
+        for index, record in enumerate(records):
+            try:
+                if not isinstance(record, ChronologyEventCreate):
+                    record = ChronologyEventCreate.model_validate(record)
+            except ValidationError as e:
+                errors.append({"index": index, "error": _format_validation_error(e)})
+                continue
+            rows.append((index, record.model_dump()))
+
+        table = ChronologyEvent.__table__
+        statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        copy = self.db.get_bind().dialect.name == "postgresql"
+        inserted: List[Tuple[int, int]] = []
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            try:
+                with self.db.begin_nested():
+                    if copy:
+                        ids = self._copy_rows([row for _, row in batch])
+                    else:
+                        ids = self.db.execute(statement, [row for _, row in batch]).scalars().all()
+                inserted.extend(zip([index for index, _ in batch], ids))
+            except DBAPIError:
+                # Isolate the offending rows
+                for index, row in batch:
+                    try:
+                        with self.db.begin_nested():
+                            event_id = self.db.execute(statement, row).scalar_one()
+                        inserted.append((index, event_id))
+                    except DBAPIError as e:
+                        errors.append({"index": index, "error": str(e.orig)})
+
+        validated = dict(rows)
+        buckets.record_events(
+            self.db,
+            (
+                (event_id, row["year_start"], row["era"], row["event_type"])
+                for event_id, row in ((event_id, validated[index]) for index, event_id in inserted)
+            ),
+        )
+        record_new_events(self.db, (event_id for _, event_id in inserted))
+        self.db.commit()
+        if inserted:
+            invalidate_chronology_index(self.db)
+
+        errors.sort(key=lambda e: e["index"])
+        return {
+            "inserted": len(inserted),
+            "failed": len(errors),
+            "event_ids": [event_id for _, event_id in sorted(inserted)],
+            "errors": errors,
+        }
+
+    def _copy_rows(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        PostgreSQL: write validated rows with one COPY FROM STDIN (CSV).
+
+        COPY returns nothing, so IDs are drawn from the table's sequence first
+        and copied with the rows, which keeps them in input order. Values go
+        through the column types' bind processors (enum names, JSON text).
+
+        Raises:
+            DBAPIError: If the server rejects the data
+        """
+        table = ChronologyEvent.__table__
+        sequence = func.pg_get_serial_sequence(table.name, table.c.id.name)
+        ids = (
+            self.db.execute(
+                select(func.nextval(sequence)).select_from(func.generate_series(1, len(rows)))
+            )
+            .scalars()
+            .all()
+        )
+
+        dialect = self.db.get_bind().dialect
+        columns = [table.c.id] + [column for column in table.columns if column.name in rows[0]]
+        processors = [column.type.bind_processor(dialect) for column in columns]
+        data = io.StringIO()
+        for event_id, row in zip(ids, rows):
+            values = [event_id] + [row[column.name] for column in columns[1:]]
+            fields = []
+            for value, process in zip(values, processors):
+                if process is not None:
+                    value = process(value)
+                if value is None:
+                    fields.append("")  # An unquoted empty field is NULL
+                elif isinstance(value, str):
+                    fields.append('"' + value.replace('"', '""') + '"')
+                else:
+                    fields.append(str(value))
+            data.write(",".join(fields) + "\n")
+        data.seek(0)
+
+        copy_sql = (
+            f"COPY {table.name} ({', '.join(column.name for column in columns)}) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(copy_sql, data)
+        except dialect.dbapi.Error as e:
+            raise DBAPIError(copy_sql, None, e) from e
+        finally:
+            cursor.close()
+        return ids
+
     def get_timeline_summary(
-        self, start_year: Optional[int] = None, end_year: Optional[int] = None
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        use_buckets: Optional[bool] = None,
     ) -> dict:
         """
         Generate a summary of the timeline, optionally bounded by years.
 
+        Counts come from the materialised century buckets plus SQL aggregates
+        over the partial centuries at the range edges; no events are loaded.
+        Stale buckets are bypassed, not repaired: see rebuild_timeline_buckets.
+
+        Args:
+            start_year: Start of the range (None for the beginning)
+            end_year: End of the range (None for the end)
+            use_buckets: Whether the buckets are current, if the caller has
+                         already checked (None checks here)
+
         Returns:
             Dictionary containing timeline statistics and key events
         """
-        query = self.db.query(ChronologyEvent)
-
-        if start_year is not None:
-            query = query.filter(ChronologyEvent.year_start >= start_year)
-        if end_year is not None:
-            query = query.filter(ChronologyEvent.year_start <= end_year)
+        if use_buckets is None:
+            use_buckets = self.timeline_buckets_current()
+        totals = buckets.summarize(self.db, start_year, end_year, use_buckets)
 
-        events = query.all()
+        era_distribution: Dict[str, int] = {}
+        type_distribution: Dict[str, int] = {}
+        min_year: Optional[int] = None
+        max_year: Optional[int] = None
 
-        # Calculate statistics
-        event_count = len(events)
-        era_distribution = {}
-        type_distribution = {}
-
-        for event in events:
-            era_distribution[event.era.value] = era_distribution.get(event.era.value, 0) + 1
-            type_distribution[event.event_type.value] = (
-                type_distribution.get(event.event_type.value, 0) + 1
-            )
+        for (era, event_type), (count, lo, hi) in totals.items():
+            era_distribution[era.value] = era_distribution.get(era.value, 0) + count
+            type_distribution[event_type.value] = type_distribution.get(event_type.value, 0) + count
+            min_year = lo if min_year is None else min(min_year, lo)
+            max_year = hi if max_year is None else max(max_year, hi)
 
         return {
-            "total_events": event_count,
+            "total_events": sum(era_distribution.values()),
             "era_distribution": era_distribution,
             "type_distribution": type_distribution,
             "year_range": {
-                "start": start_year or (min([e.year_start for e in events]) if events else None),
-                "end": end_year or (max([e.year_start for e in events]) if events else None),
+                "start": start_year if start_year is not None else min_year,
+                "end": end_year if end_year is not None else max_year,
             },
         }
+
+    def get_density(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        resolution: Optional[str] = None,
+        max_bins: int = DENSITY_MAX_BINS,
+    ) -> Dict[str, Any]:
+        """
+        Event-count histogram for a timeline view, from the precomputed density pyramid.
+
+        Args:
+            start_year: Start of the visible range (None for the beginning)
+            end_year: End of the visible range (None for the end)
+            resolution: "year", "decade", "century" or "millennium"; None picks the
+                        finest one that fits in max_bins
+            max_bins: Bin budget when choosing the resolution automatically
+
+        Returns:
+            Dictionary with resolution, bin width, non-empty bins (count plus
+            era/type breakdown) and whether the range is small enough for raw events
+
+        Raises:
+            ValueError: If resolution is not one of RESOLUTIONS
+        """
+        if resolution is not None and resolution not in RESOLUTIONS:
+            raise ValueError(
+                f"Unknown resolution '{resolution}'; expected one of {', '.join(RESOLUTIONS)}"
+            )
+
+        pyramid = get_density_pyramid(self.db)
+        if resolution is None:
+            resolution = pyramid.choose_resolution(start_year, end_year, max_bins)
+
+        density = pyramid.query(start_year, end_year, resolution)
+        density["start_year"] = start_year
+        density["end_year"] = end_year
+        density["raw_events"] = density["total_events"] <= RAW_EVENT_THRESHOLD
+        return density
+
+    def timeline_buckets_current(self) -> bool:
+        """Whether the materialised timeline statistics count every event."""
+        return buckets.is_current(self.db)
+
+    def rebuild_timeline_buckets(self) -> None:
+        """Recompute the materialised timeline statistics from scratch."""
+        buckets.rebuild(self.db)
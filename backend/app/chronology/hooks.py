@@ -0,0 +1,58 @@
+"""
+Chronology Hooks: notify subscribers of newly committed events.
+
+Sessions collect the IDs of ChronologyEvent rows they insert (ORM objects are
+picked up in after_flush; bulk Core inserts call record_new_events) and hand
+them to every subscriber once the transaction commits. Rolled-back inserts are
+discarded, so subscribers only ever see durable events.
+"""
+
+from typing import Callable, Iterable, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.chronology import ChronologyEvent
+
+# Session.info key holding the IDs inserted in the current transaction
+_PENDING_KEY = "new_chronology_event_ids"
+
+_subscribers: List[Callable[[List[int]], None]] = []
+
+
+def subscribe(callback: Callable[[List[int]], None]) -> None:
+    """Call `callback` with the new event IDs after every commit that inserts events."""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback: Callable[[List[int]], None]) -> None:
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def record_new_events(session: Session, event_ids: Iterable[int]) -> None:
+    """Register events inserted outside the ORM unit of work (e.g. bulk INSERTs)."""
+    if _subscribers:
+        session.info.setdefault(_PENDING_KEY, []).extend(event_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_events(session: Session, flush_context) -> None:
+    if _subscribers:
+        record_new_events(
+            session, (obj.id for obj in session.new if isinstance(obj, ChronologyEvent))
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_new_events(session: Session) -> None:
+    event_ids = session.info.pop(_PENDING_KEY, None)
+    if event_ids:
+        for callback in list(_subscribers):
+            callback(event_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_events(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,220 @@
+"""
+Chronology Index: in-process temporal index over the authoritative timeline.
+
+Every event is held twice in an augmented interval tree: once by its nominal
+span [year_start, year_end] and once by its uncertainty envelope (the hull of
+the nominal span and the year_*_min/max bounds). Range and year lookups are
+answered from memory in O(log n + k) and only the matching rows are fetched
+from the database.
+"""
+
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.chronology import ChronologyEvent
+
+
+class IntervalTree:
+    """
+    Static augmented interval tree over closed integer intervals.
+
+    Intervals are kept in arrays sorted by start. The sorted array doubles as an
+    implicit binary tree (node i at level k has children i - 2^(k-1) and
+    i + 2^(k-1)) where each node records the largest end in its subtree, so
+    whole subtrees that end before the query window are skipped.
+    """
+
+    # Subtrees at or below this level are scanned linearly
+    LEAF_SCAN_LEVEL = 3
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, int]]):
+        """
+        Build the tree.
+
+        Args:
+            intervals: (start, end, payload) tuples; payload is typically an event ID
+        """
+        items = sorted(intervals)
+        self._starts = [start for start, _, _ in items]
+        self._ends = [end for _, end, _ in items]
+        self._payloads = [payload for _, _, payload in items]
+        self._max_ends = list(self._ends)
+        self._max_level = self._build()
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _build(self) -> int:
+        """Fill in subtree max-end values bottom-up; returns the root level."""
+        n = len(self._starts)
+        if n == 0:
+            return -1
+
+        max_ends = self._max_ends
+        last_i = 0
+        last = max_ends[0]
+        for i in range(0, n, 2):
+            last_i, last = i, max_ends[i]
+
+        k = 1
+        while 1 << k <= n:
+            x = 1 << (k - 1)
+            for i in range((x << 1) - 1, n, x << 2):
+                right = max_ends[i + x] if i + x < n else last
+                max_ends[i] = max(self._ends[i], max_ends[i - x], right)
+            # Move last_i to its parent so the right-most partial subtree stays covered
+            last_i = last_i - x if (last_i >> k) & 1 else last_i + x
+            if last_i < n and max_ends[last_i] > last:
+                last = max_ends[last_i]
+            k += 1
+
+        return k - 1
+
+    def overlap(self, start: int, end: int) -> List[int]:
+        """Return payloads of all intervals overlapping the closed range [start, end]."""
+        n = len(self._starts)
+        if n == 0 or start > end:
+            return []
+
+        starts, ends, max_ends = self._starts, self._ends, self._max_ends
+        hits: List[int] = []
+        k0 = self._max_level
+        stack = [(k0, (1 << k0) - 1, False)]
+
+        while stack:
+            k, x, left_done = stack.pop()
+            if k <= self.LEAF_SCAN_LEVEL:
+                i0 = x >> k << k
+                i1 = min(i0 + (1 << (k + 1)) - 1, n)
+                for i in range(i0, i1):
+                    if starts[i] > end:
+                        break
+                    if ends[i] >= start:
+                        hits.append(self._payloads[i])
+            elif not left_done:
+                y = x - (1 << (k - 1))
+                stack.append((k, x, True))
+                if y >= n or max_ends[y] >= start:
+                    stack.append((k - 1, y, False))
+            elif x < n and starts[x] <= end:
+                if ends[x] >= start:
+                    hits.append(self._payloads[x])
+                stack.append((k - 1, x + (1 << (k - 1)), False))
+
+        return hits
+
+    def stab(self, point: int) -> List[int]:
+        """Return payloads of all intervals containing a single point."""
+        return self.overlap(point, point)
+
+
+def nominal_span(event: ChronologyEvent) -> Tuple[int, int]:
+    """Nominal [start, end] of an event; events without year_end are single-year."""
+    end = event.year_end if event.year_end is not None else event.year_start
+    return event.year_start, max(event.year_start, end)
+
+
+def uncertainty_envelope(event: ChronologyEvent) -> Tuple[int, int]:
+    """Widest [start, end] an event could occupy given its uncertainty bounds."""
+    lows = [event.year_start, event.year_start_min, event.year_end_min]
+    highs = [event.year_start, event.year_end, event.year_start_max, event.year_end_max]
+    return (
+        min(y for y in lows if y is not None),
+        max(y for y in highs if y is not None),
+    )
+
+
+class ChronologyIndex:
+    """
+    Interval trees for the nominal spans and uncertainty envelopes of all events.
+
+    The index holds only IDs and years, never ORM objects, so it can be shared
+    safely between sessions and requests.
+    """
+
+    def __init__(self, events: Iterable[ChronologyEvent], version: Tuple[int, int]):
+        events = list(events)
+        self.version = version
+        self.nominal = IntervalTree((*nominal_span(e), e.id) for e in events)
+        self.envelope = IntervalTree((*uncertainty_envelope(e), e.id) for e in events)
+
+    @classmethod
+    def build(cls, db: Session, version: Optional[Tuple[int, int]] = None) -> "ChronologyIndex":
+        """Load the temporal columns of every event and build the index."""
+        rows = db.query(
+            ChronologyEvent.id,
+            ChronologyEvent.year_start,
+            ChronologyEvent.year_end,
+            ChronologyEvent.year_start_min,
+            ChronologyEvent.year_start_max,
+            ChronologyEvent.year_end_min,
+            ChronologyEvent.year_end_max,
+        ).all()
+        return cls(rows, version if version is not None else chronology_version(db))
+
+    def overlapping(self, start: int, end: int, include_uncertain: bool = True) -> List[int]:
+        """
+        IDs of events overlapping [start, end].
+
+        With include_uncertain the uncertainty envelope is tested; since the
+        envelope contains the nominal span this is a superset of the nominal hits.
+        """
+        tree = self.envelope if include_uncertain else self.nominal
+        return tree.overlap(start, end)
+
+
+def chronology_version(db: Session) -> Tuple[int, int]:
+    """
+    Cheap fingerprint of the chronology table: (row count, highest ID).
+
+    Events are append-only, so the fingerprint changes whenever another
+    session or process inserts rows.
+    """
+    count, max_id = db.query(func.count(ChronologyEvent.id), func.max(ChronologyEvent.id)).one()
+    return count, max_id or 0
+
+
+def database_identity(db: Session) -> str:
+    """
+    Short stable hash of the session's database URL.
+
+    Keys files that outlive the process (snapshots, term matrices), so two
+    databases sharing a directory never read each other's data.
+    """
+    url = db.get_bind().url.render_as_string(hide_password=True)
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+# Process-wide indexes, one per database URL
+_indexes: Dict[str, ChronologyIndex] = {}
+_lock = threading.Lock()
+
+
+def _index_key(db: Session) -> str:
+    return str(db.get_bind().url)
+
+
+def get_chronology_index(db: Session) -> ChronologyIndex:
+    """Get the shared index for this database, rebuilding it if the data changed."""
+    key = _index_key(db)
+    version = chronology_version(db)
+    index = _indexes.get(key)
+
+    if index is None or index.version != version:
+        with _lock:
+            index = _indexes.get(key)
+            if index is None or index.version != version:
+                index = ChronologyIndex.build(db, version)
+                _indexes[key] = index
+
+    return index
+
+
+def invalidate_chronology_index(db: Session) -> None:
+    """Drop the shared index for this database; it is rebuilt on next use."""
+    with _lock:
+        _indexes.pop(_index_key(db), None)
@@ -0,0 +1,494 @@
+"""
+Chronology Search: ranked full-text search over event names, sources and descriptions.
+
+SearchIndex is the single entry point. On PostgreSQL it queries the weighted
+search_vector column (GIN-indexed, see migration 004); on other databases it
+uses an in-process inverted index with the same field weights. Both support:
+
+    babylon persia        any term (ranked), or all terms with match_all
+    "fall of jerusalem"   phrase
+    assyr*                prefix
+"""
+
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Collection, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from sqlalchemy import Boolean, case, func
+from sqlalchemy.orm import Session
+
+from app.chronology.index import chronology_version
+from app.models.chronology import ChronologyEvent
+
+# Indexed fields in order, with PostgreSQL ts_rank default weights for A, B and C
+FIELDS = ("name", "biblical_source", "description")
+FIELD_WEIGHTS = (1.0, 0.4, 0.2)
+
+# Okapi BM25 term frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Token positions of each field are offset by this much so phrases never span fields
+FIELD_GAP = 1 << 20
+
+STOPWORDS = frozenset(
+    """
+    a about an and are as at be but by did do does for from had has have he her
+    his how i in into is it its of on or she so than that the their them then
+    there these they this to was were what when where which who whom why will
+    with would you
+    """.split()
+)
+
+_TOKEN = re.compile(r"\w+")
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+# A search term: ((offset, token), ...) with offsets relative to the first token,
+# whether the last token is a prefix, and the text it was parsed from
+Term = Tuple[Tuple[Tuple[int, str], ...], bool, str]
+
+
+def _rank(hit: Dict[str, Any]) -> Tuple[float, int]:
+    """Sort key for search hits: best score first, then event ID."""
+    return -hit["score"], hit["event_id"]
+
+
+def tokenize(text: Optional[str]) -> List[Tuple[int, str]]:
+    """Lowercase word tokens with their positions, skipping (but counting) stopwords."""
+    tokens = _TOKEN.findall((text or "").lower())
+    return [(position, token) for position, token in enumerate(tokens) if token not in STOPWORDS]
+
+
+def _make_term(text: str, prefix: bool, label: str) -> Optional[Term]:
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    first = tokens[0][0]
+    return tuple((position - first, token) for position, token in tokens), prefix, label
+
+
+def parse_query(query: Union[str, Sequence[str]], prefix: bool = False) -> List[Term]:
+    """
+    Parse a query into search terms.
+
+    Args:
+        query: Query string (words, "quoted phrases", trailing * for prefixes) or a
+               list of keywords, each taken as one term (a phrase if it has several words)
+        prefix: Treat the last word of every term as a prefix
+
+    Returns:
+        Terms in query order; stopword-only parts are dropped
+    """
+    terms = []
+    if isinstance(query, str):
+        for phrase, word in _QUERY_PART.findall(query):
+            if phrase:
+                term = _make_term(phrase, prefix, phrase)
+            else:
+                is_prefix = prefix or word.endswith("*")
+                term = _make_term(word.rstrip("*"), is_prefix, word)
+            if term is not None:
+                terms.append(term)
+    else:
+        for keyword in query:
+            term = _make_term(keyword, prefix, keyword)
+            if term is not None:
+                terms.append(term)
+    return terms
+
+
+class InvertedIndex:
+    """
+    Positional inverted index over the searchable text of every event.
+
+    Postings map token -> {event_id: [positions]}, where a position encodes its
+    field as position // FIELD_GAP. Field-weighted document lengths are kept for
+    BM25 scoring.
+    """
+
+    def __init__(self, rows: Sequence[Tuple[Any, ...]], version: Tuple[int, int]):
+        """
+        Build the index.
+
+        Args:
+            rows: (id, name, biblical_source, description) tuples
+            version: Dataset version the rows were read at
+        """
+        self.version = version
+        self.total = 0
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.lengths: Dict[int, float] = {}
+        self.total_length = 0.0
+        self._add(rows, set())
+        self.vocabulary = sorted(self.postings)
+        self._idf: Dict[Tuple[Tuple[Tuple[int, str], ...], bool], float] = {}
+
+    def _add(self, rows: Sequence[Tuple[Any, ...]], borrowed: Set[str]) -> None:
+        """Index more rows; posting lists of `borrowed` tokens are copied before changing."""
+        self.total += len(rows)
+        for event_id, *texts in rows:
+            length = 0.0
+            for field, text in enumerate(texts):
+                base = field * FIELD_GAP
+                tokens = tokenize(text)
+                length += FIELD_WEIGHTS[field] * len(tokens)
+                for position, token in tokens:
+                    if token in borrowed:
+                        self.postings[token] = dict(self.postings[token])
+                        borrowed.discard(token)
+                    self.postings.setdefault(token, {}).setdefault(event_id, []).append(
+                        base + position
+                    )
+            self.lengths[event_id] = length
+            self.total_length += length
+
+    def extended(
+        self, rows: Sequence[Tuple[Any, ...]], version: Tuple[int, int]
+    ) -> "InvertedIndex":
+        """
+        A copy of the index with newly inserted events added.
+
+        Only the posting lists of tokens occurring in the new rows are copied, so
+        adding a few events is cheap and requests still using this index are
+        unaffected.
+        """
+        index = InvertedIndex.__new__(InvertedIndex)
+        index.version = version
+        index.total = self.total
+        index.postings = dict(self.postings)
+        index.lengths = dict(self.lengths)
+        index.total_length = self.total_length
+        index._add(rows, set(self.postings))
+        new_tokens = sorted(token for token in index.postings if token not in self.postings)
+        index.vocabulary = list(heapq.merge(self.vocabulary, new_tokens))
+        index._idf = {}
+        return index
+
+    @classmethod
+    def build(cls, db: Session, version: Optional[Tuple[int, int]] = None) -> "InvertedIndex":
+        rows = _indexed_rows(db).all()
+        return cls(rows, version if version is not None else chronology_version(db))
+
+    def refreshed(self, db: Session, version: Tuple[int, int]) -> "InvertedIndex":
+        """
+        The index brought up to `version`: extended with the events inserted
+        since, or rebuilt if events were also deleted.
+        """
+        rows = _indexed_rows(db).filter(ChronologyEvent.id > self.version[1]).all()
+        if self.total + len(rows) != version[0]:
+            return InvertedIndex.build(db, version)
+        return self.extended(rows, version)
+
+    def _occurrences(self, token: str, prefix: bool) -> Dict[int, set]:
+        """Positions of a token (or of every token starting with it) per event."""
+        if not prefix:
+            return {event_id: set(p) for event_id, p in self.postings.get(token, {}).items()}
+
+        found: Dict[int, set] = {}
+        i = bisect_left(self.vocabulary, token)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+            for event_id, positions in self.postings[self.vocabulary[i]].items():
+                found.setdefault(event_id, set()).update(positions)
+            i += 1
+        return found
+
+    def match(self, term: Term) -> Dict[int, List[int]]:
+        """Start positions of every occurrence of a term, per event."""
+        tokens, prefix, _ = term
+        last = len(tokens) - 1
+        occurrences = [
+            self._occurrences(token, prefix and i == last) for i, (_, token) in enumerate(tokens)
+        ]
+
+        matches = {}
+        for event_id, starts in occurrences[0].items():
+            if any(event_id not in other for other in occurrences[1:]):
+                continue
+            hits = sorted(
+                start
+                for start in starts
+                if all(
+                    start + offset in occurrences[i][event_id]
+                    for i, (offset, _) in enumerate(tokens)
+                    if i
+                )
+            )
+            if hits:
+                matches[event_id] = hits
+        return matches
+
+    def idf(self, term: Term, matches: Dict[int, List[int]]) -> float:
+        """BM25 inverse document frequency of a term (for search and bm25), memoised."""
+        key = term[:2]
+        idf = self._idf.get(key)
+        if idf is None:
+            df = len(matches)
+            idf = self._idf[key] = math.log(1 + (self.total - df + 0.5) / (df + 0.5))
+        return idf
+
+    def bm25(
+        self, terms: List[Term], event_ids: Optional[Collection[int]] = None
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Okapi BM25 contribution of each term to each matching event.
+
+        Term frequency counts occurrences weighted by field (as in search), and
+        is normalised by the event's field-weighted length. IDF is always taken
+        over the whole index, so scores do not depend on `event_ids`.
+
+        Args:
+            terms: Parsed query terms
+            event_ids: Only score these events (default: all)
+
+        Returns:
+            event_id -> {term text: score}; an event's BM25 score is the sum
+        """
+        average_length = self.total_length / self.total if self.total else 0.0
+        scores: Dict[int, Dict[str, float]] = {}
+        if event_ids is not None:
+            event_ids = set(event_ids)
+
+        for term in terms:
+            matches = self.match(term)
+            if not matches:
+                continue
+            idf = self.idf(term, matches)
+            for event_id, starts in matches.items():
+                if event_ids is not None and event_id not in event_ids:
+                    continue
+                tf = sum(FIELD_WEIGHTS[start // FIELD_GAP] for start in starts)
+                norm = 1 - BM25_B + BM25_B * self.lengths[event_id] / (average_length or 1.0)
+                scores.setdefault(event_id, {})[term[2]] = (
+                    idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+                )
+
+        return scores
+
+    def search(
+        self, terms: List[Term], limit: Optional[int], match_all: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank events by field-weighted term frequency times inverse document frequency.
+        """
+        scores: Dict[int, float] = {}
+        matched: Dict[int, List[str]] = {}
+
+        for term in terms:
+            matches = self.match(term)
+            if not matches:
+                continue
+            idf = self.idf(term, matches)
+            for event_id, starts in matches.items():
+                weight = sum(FIELD_WEIGHTS[start // FIELD_GAP] for start in starts)
+                scores[event_id] = scores.get(event_id, 0.0) + idf * weight
+                matched.setdefault(event_id, []).append(term[2])
+
+        hits = [
+            {"event_id": event_id, "score": score, "matched_terms": matched[event_id]}
+            for event_id, score in scores.items()
+            if not match_all or len(matched[event_id]) == len(terms)
+        ]
+        if limit is not None:
+            return heapq.nsmallest(limit, hits, key=_rank)
+        return sorted(hits, key=_rank)
+
+
+def _indexed_rows(db: Session):
+    return db.query(
+        ChronologyEvent.id,
+        ChronologyEvent.name,
+        ChronologyEvent.biblical_source,
+        ChronologyEvent.description,
+    )
+
+
+# Process-wide inverted indexes, one per database URL
+_indexes: Dict[str, InvertedIndex] = {}
+_lock = threading.Lock()
+
+
+def get_inverted_index(db: Session) -> InvertedIndex:
+    """Get the shared inverted index for this database, updated if the data changed."""
+    key = str(db.get_bind().url)
+    version = chronology_version(db)
+    index = _indexes.get(key)
+
+    if index is None or index.version != version:
+        with _lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = InvertedIndex.build(db, version)
+            elif index.version != version:
+                index = index.refreshed(db, version)
+            _indexes[key] = index
+
+    return index
+
+
+def _tsquery_text(term: Term) -> str:
+    """PostgreSQL tsquery syntax for a term, e.g. 'fall' <2> 'jerusalem':*."""
+    tokens, prefix, _ = term
+    parts = []
+    previous = 0
+    for i, (offset, token) in enumerate(tokens):
+        lexeme = f"'{token}'" + (":*" if prefix and i == len(tokens) - 1 else "")
+        if i:
+            parts.append(f"<{offset - previous}>")
+        parts.append(lexeme)
+        previous = offset
+    return " ".join(parts)
+
+
+def _combined_tsquery(terms: List[Term], match_all: bool):
+    """to_tsquery matching all (match_all) or any of the terms."""
+    return func.to_tsquery(
+        "english",
+        (" & " if match_all else " | ").join(f"({_tsquery_text(term)})" for term in terms),
+    )
+
+
+class SearchIndex:
+    """
+    Ranked full-text search over chronology events.
+
+    Results are dictionaries with event_id, score (higher is better) and the
+    query terms each event matched.
+    """
+
+    def __init__(self, db: Session, backend: Optional[str] = None):
+        """
+        Initialize search.
+
+        Args:
+            db: SQLAlchemy database session
+            backend: "postgresql" or "memory"; defaults to PostgreSQL full-text
+                     search when connected to PostgreSQL
+        """
+        self.db = db
+        if backend is None:
+            backend = "postgresql" if db.get_bind().dialect.name == "postgresql" else "memory"
+        self.backend = backend
+
+    def search(
+        self,
+        query: Union[str, Sequence[str]],
+        limit: Optional[int] = None,
+        match_all: bool = False,
+        prefix: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find events matching a query, best first.
+
+        Args:
+            query: Query string or list of keywords (see parse_query)
+            limit: Maximum number of results
+            match_all: Require every term to match instead of any
+            prefix: Treat the last word of every term as a prefix
+
+        Returns:
+            List of {"event_id", "score", "matched_terms"} dictionaries
+        """
+        terms = parse_query(query, prefix)
+        if not terms:
+            return []
+        if self.backend == "postgresql":
+            return self._search_postgresql(terms, limit, match_all)
+        return get_inverted_index(self.db).search(terms, limit, match_all)
+
+    def term_scores(
+        self,
+        query: Union[str, Sequence[str]],
+        prefix: bool = False,
+        event_ids: Optional[Collection[int]] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Relevance of each query term to each event matching any of them.
+
+        Okapi BM25 over the in-process index; on PostgreSQL, ts_rank of each
+        term over search_vector, which weights fields the same way.
+
+        Args:
+            query: Query string or list of keywords (see parse_query)
+            prefix: Treat the last word of every term as a prefix
+            event_ids: Only score these events (default: all)
+
+        Returns:
+            event_id -> {term text: score} for the terms the event matches
+        """
+        terms = parse_query(query, prefix)
+        if not terms:
+            return {}
+        if self.backend != "postgresql":
+            return get_inverted_index(self.db).bm25(terms, event_ids)
+
+        vector = ChronologyEvent.search_vector
+        term_queries = [func.to_tsquery("english", _tsquery_text(term)) for term in terms]
+        query = self.db.query(
+            ChronologyEvent.id,
+            *[
+                case((vector.op("@@", return_type=Boolean)(q), func.ts_rank(vector, q)))
+                for q in term_queries
+            ],
+        ).filter(vector.op("@@", return_type=Boolean)(_combined_tsquery(terms, False)))
+        if event_ids is not None:
+            query = query.filter(ChronologyEvent.id.in_(list(event_ids)))
+
+        return {
+            event_id: {
+                term[2]: float(score) for term, score in zip(terms, scores) if score is not None
+            }
+            for event_id, *scores in query.all()
+        }
+
+    def _search_postgresql(
+        self, terms: List[Term], limit: Optional[int], match_all: bool
+    ) -> List[Dict[str, Any]]:
+        vector = ChronologyEvent.search_vector
+        term_queries = [func.to_tsquery("english", _tsquery_text(term)) for term in terms]
+        combined = _combined_tsquery(terms, match_all)
+
+        rank = func.ts_rank(vector, combined).label("rank")
+        query = (
+            self.db.query(
+                ChronologyEvent.id,
+                rank,
+                *[vector.op("@@", return_type=Boolean)(q) for q in term_queries],
+            )
+            .filter(vector.op("@@", return_type=Boolean)(combined))
+            .order_by(rank.desc(), ChronologyEvent.id)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [
+            {
+                "event_id": event_id,
+                "score": float(score),
+                "matched_terms": [term[2] for term, hit in zip(terms, flags) if hit],
+            }
+            for event_id, score, *flags in query.all()
+        ]
+
+    def fetch_events(self, hits: List[Dict[str, Any]]) -> List[ChronologyEvent]:
+        """Load the events for search hits with one query, in hit order."""
+        if not hits:
+            return []
+        ids = [hit["event_id"] for hit in hits]
+        events = {
+            event.id: event
+            for event in self.db.query(ChronologyEvent).filter(ChronologyEvent.id.in_(ids))
+        }
+        return [events[event_id] for event_id in ids if event_id in events]
+
+    def search_events(
+        self,
+        query: Union[str, Sequence[str]],
+        limit: Optional[int] = None,
+        match_all: bool = False,
+        prefix: bool = False,
+    ) -> List[ChronologyEvent]:
+        """Like search(), but returns the matching events themselves, best first."""
+        return self.fetch_events(self.search(query, limit, match_all, prefix))
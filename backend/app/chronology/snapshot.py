@@ -0,0 +1,242 @@
+"""
+Chronology Snapshot: memory-mapped columnar copy of the chronology for analytics.
+
+The chronology_events table is exported to a directory of .npy files: int32
+year columns, uint8 era/type codes, and UTF-8 blobs with int64 offsets for
+names and descriptions. Every API worker maps the same files read-only, so
+scans (the density pyramid build, historical analog lookups) run over shared
+pages instead of loading ORM objects from PostgreSQL.
+
+Snapshots of each database live under their own subdirectory, named after the
+database identity, in a directory named after the dataset version they were
+built from. A new snapshot is written to a temporary directory, renamed into
+place and only then published by atomically replacing the CURRENT pointer
+file, so readers never observe a partially written snapshot; every version the
+pointer no longer names is then removed.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.chronology.analytics import EventColumns
+from app.chronology.index import chronology_version, database_identity
+from app.config import settings
+from app.models.chronology import ChronologyEvent
+
+POINTER_FILE = "CURRENT"
+
+# EventColumns attributes, saved as one .npy file each
+_COLUMNS = [
+    "ids",
+    "year_start",
+    "year_end",
+    "start_min",
+    "start_max",
+    "end_min",
+    "end_max",
+    "era_codes",
+    "type_codes",
+]
+# Text columns, saved as <name>_offsets.npy and <name>_blob.npy
+_TEXT_COLUMNS = ["name", "description"]
+
+
+def _version_name(version: Tuple[int, int]) -> str:
+    count, max_id = version
+    return f"v{count}-{max_id}"
+
+
+def _encode_strings(values: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack strings into (offsets, blob); string i is blob[offsets[i]:offsets[i + 1]]."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+class ChronologySnapshot:
+    """
+    Read-only columnar view of every event, ordered by (year_start, id).
+
+    Numeric columns are the same as analytics.EventColumns; text is stored as
+    blobs with offsets and decoded per row on access.
+    """
+
+    def __init__(self, path: Path, version: Tuple[int, int]):
+        self.path = path
+        self.version = version
+        self.columns = EventColumns.__new__(EventColumns)
+        for name in _COLUMNS:
+            setattr(self.columns, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+        self._text = {
+            name: (
+                np.load(path / f"{name}_offsets.npy", mmap_mode="r"),
+                np.load(path / f"{name}_blob.npy", mmap_mode="r"),
+            )
+            for name in _TEXT_COLUMNS
+        }
+        self._id_order: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def _string(self, column: str, position: int) -> str:
+        offsets, blob = self._text[column]
+        return blob[offsets[position] : offsets[position + 1]].tobytes().decode("utf-8")
+
+    def name(self, position: int) -> str:
+        return self._string("name", position)
+
+    def description(self, position: int) -> Optional[str]:
+        return self._string("description", position) or None
+
+    def positions_of(self, event_ids: List[int]) -> Dict[int, int]:
+        """Map each event ID that is in the snapshot to its row position."""
+        if self._id_order is None:
+            self._id_order = np.argsort(self.columns.ids)
+        sorted_ids = self.columns.ids[self._id_order]
+        wanted = np.asarray(event_ids, dtype=np.int64)
+        index = np.searchsorted(sorted_ids, wanted)
+        found = index < len(sorted_ids)
+        found[found] = sorted_ids[index[found]] == wanted[found]
+        return dict(zip(wanted[found].tolist(), self._id_order[index[found]].tolist()))
+
+
+def write_snapshot(db: Session, directory: Path, version: Tuple[int, int]) -> Path:
+    """
+    Export the chronology to `directory`/<version> and publish it as CURRENT.
+
+    `version` is the one just read from the database, so it replaces whatever
+    CURRENT named before, and every other version in `directory` is removed.
+
+    Returns:
+        Path of the published snapshot directory
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / _version_name(version)
+
+    if not target.exists():
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=directory))
+        try:
+            rows = (
+                db.query(
+                    ChronologyEvent.id,
+                    ChronologyEvent.year_start,
+                    ChronologyEvent.year_end,
+                    ChronologyEvent.year_start_min,
+                    ChronologyEvent.year_start_max,
+                    ChronologyEvent.year_end_min,
+                    ChronologyEvent.year_end_max,
+                    ChronologyEvent.era,
+                    ChronologyEvent.event_type,
+                    ChronologyEvent.name,
+                    ChronologyEvent.description,
+                )
+                .order_by(ChronologyEvent.year_start, ChronologyEvent.id)
+                .all()
+            )
+            columns = EventColumns(row[:9] for row in rows)
+            for name in _COLUMNS:
+                np.save(staging / f"{name}.npy", getattr(columns, name))
+
+            strings = {
+                "name": [row.name for row in rows],
+                "description": [row.description or "" for row in rows],
+            }
+            for name in _TEXT_COLUMNS:
+                offsets, blob = _encode_strings(strings[name])
+                np.save(staging / f"{name}_offsets.npy", offsets)
+                np.save(staging / f"{name}_blob.npy", blob)
+
+            try:
+                staging.rename(target)
+            except OSError:
+                # Another worker published the same version first
+                if not target.exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    pointer = directory / f".{POINTER_FILE}.{os.getpid()}"
+    pointer.write_text(target.name)
+    os.replace(pointer, directory / POINTER_FILE)
+    _prune(directory)
+
+    return target
+
+
+def _parse_version(name: str) -> Optional[Tuple[int, int]]:
+    try:
+        count, max_id = name[1:].split("-")
+        return int(count), int(max_id)
+    except ValueError:
+        return None
+
+
+def _published_version(directory: Path) -> Optional[Tuple[int, int]]:
+    try:
+        return _parse_version((directory / POINTER_FILE).read_text().strip())
+    except OSError:
+        return None
+
+
+def _prune(directory: Path) -> None:
+    """Remove every snapshot CURRENT does not name; open memory maps keep their pages."""
+    try:
+        current = (directory / POINTER_FILE).read_text().strip()
+    except OSError:
+        return
+    for path in directory.glob("v*-*"):
+        if path.is_dir() and path.name != current and _parse_version(path.name) is not None:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_snapshot(directory: Path) -> Optional[ChronologySnapshot]:
+    """Map the snapshot CURRENT points at, or None if none has been published."""
+    version = _published_version(directory)
+    if version is None:
+        return None
+    try:
+        return ChronologySnapshot(directory / _version_name(version), version)
+    except OSError:
+        return None
+
+
+# Process-wide mapped snapshot, keyed by snapshot directory and database
+_snapshots: Dict[str, ChronologySnapshot] = {}
+_lock = threading.Lock()
+
+
+def get_chronology_snapshot(db: Session, directory: Optional[Path] = None) -> ChronologySnapshot:
+    """
+    Get the memory-mapped snapshot for the current dataset version.
+
+    Reuses the mapping this process already holds, else maps the published
+    snapshot if another worker built it, else builds and publishes a new one.
+    Each database gets its own subdirectory of `directory`.
+    """
+    directory = Path(directory or settings.CHRONOLOGY_SNAPSHOT_DIR) / database_identity(db)
+    key = str(directory.resolve())
+    version = chronology_version(db)
+
+    snapshot = _snapshots.get(key)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None or snapshot.version != version:
+            snapshot = load_snapshot(directory)
+            if snapshot is None or snapshot.version != version:
+                snapshot = ChronologySnapshot(write_snapshot(db, directory, version), version)
+            _snapshots[key] = snapshot
+
+    return snapshot
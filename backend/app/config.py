@@ -39,6 +39,22 @@ class Settings(BaseSettings):
         "http://localhost:8000",
     ]
 
+    # Chronology
+    CHRONOLOGY_INDEX_ENABLED: bool = True  # Serve range/year queries from in-process index
+    CHRONOLOGY_SNAPSHOT_DIR: str = "./data/snapshots"  # Memory-mapped columnar snapshots
+    CLASSIFICATION_WORKER_ENABLED: bool = True  # Classify new events in the background
+    CLASSIFICATION_QUEUE_SIZE: int = 10000  # Queued event IDs before new ones are dropped
+    CLASSIFICATION_BATCH_SIZE: int = 200  # Events classified per batch
+
+    # Patterns
+    PATTERN_SIMILARITY_PATH: str = "./data/similarity/tfidf.npz"  # Event term matrix
+
+    # Simulation
+    SIMULATION_POOL_WORKERS: int = 4  # Shared processes for sweeps and Monte Carlo ensembles
+    MONTE_CARLO_POOL_MIN_SAMPLES: int = 500000  # Smaller ensembles run in-process
+    SCENARIO_SWEEP_POOL_MIN_SCENARIOS: int = 100  # Smaller sweeps run in-process
+    SCENARIO_SWEEP_MAX_SCENARIOS: int = 5000  # Largest grid a sweep may expand to
+
     # Application
     PROJECT_NAME: str = "Sigandwa"
     VERSION: str = "0.1.0"
@@ -63,8 +63,7 @@ class ChronologyQuestionRequest(BaseModel):
 async def chat(request: ChatRequest, db: Optional[Session] = Depends(get_db)):
     """General chat interface with Biblical knowledge + RAG"""
     try:
-        from ..models.chronology import ChronologyEvent
-        from sqlalchemy import or_, func
+        from ..chronology.search import SearchIndex
         
         manager = get_model_manager()
         
@@ -72,21 +71,8 @@ async def chat(request: ChatRequest, db: Optional[Session] = Depends(get_db)):
         relevant_context = ""
         if db:
             try:
-                keywords = request.message.lower().split()
-                
-                # Search for relevant events
-                query = db.query(ChronologyEvent)
-                for keyword in keywords[:5]:
-                    if len(keyword) > 3:  # Skip short words
-                        query = query.filter(
-                            or_(
-                                func.lower(ChronologyEvent.name).contains(keyword),
-                                func.lower(ChronologyEvent.description).contains(keyword),
-                                func.lower(ChronologyEvent.biblical_source).contains(keyword)
-                            )
-                        )
-                
-                relevant_events = query.limit(5).all()
+                # Search for relevant events (ranked full-text search)
+                relevant_events = SearchIndex(db).search_events(request.message, limit=5)
                 
                 # Build context from relevant events
                 if relevant_events:
@@ -180,23 +166,10 @@ async def interpret_prophecy(request: ProphecyInterpretationRequest):
 @router.post("/ask-chronology")
 async def ask_chronology(request: ChronologyQuestionRequest, db: Session = Depends(get_db)):
     """Ask a question about Biblical chronology"""
-    from ..models.chronology import ChronologyEvent
-    from sqlalchemy import or_, func
-    
-    # Search for relevant events (simple keyword matching)
-    keywords = request.question.lower().split()
-    query = db.query(ChronologyEvent)
-    
-    # Build filter for keywords
-    filters = []
-    for keyword in keywords[:5]:  # Limit to 5 keywords
-        filters.append(func.lower(ChronologyEvent.name).contains(keyword))
-        filters.append(func.lower(ChronologyEvent.description).contains(keyword))
-    
-    if filters:
-        query = query.filter(or_(*filters))
+    from ..chronology.search import SearchIndex
     
-    relevant_events = query.limit(request.max_events).all()
+    # Search for relevant events (ranked full-text search)
+    relevant_events = SearchIndex(db).search_events(request.question, limit=request.max_events)
     
     events_data = [{
         "name": e.name,
@@ -8,6 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
+from app.database import SessionLocal
+from app.chronology.classifier import start_classification_worker, stop_classification_worker
+from app.simulation.pool import start_simulation_pool, stop_simulation_pool
 from app.api.routes import chronology, events, patterns, prophecies, simulation, graph
 from app.llm.api import router as llm_router
 
@@ -17,9 +20,14 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     print(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
+    if settings.CLASSIFICATION_WORKER_ENABLED:
+        start_classification_worker(SessionLocal)
+    start_simulation_pool()
     yield
     # Shutdown
     print("Shutting down...")
+    stop_simulation_pool()
+    stop_classification_worker()
 
 
 app = FastAPI(
@@ -36,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[chronology.NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -3,8 +3,10 @@ SQLAlchemy models for chronology and events.
 These define the authoritative timeline from Creation to Present.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Date, Enum, ForeignKey, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Date, Enum, ForeignKey, JSON, Boolean, Index
+from sqlalchemy import FetchedValue
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import date
 from typing import Optional
 import enum
@@ -89,10 +91,46 @@ class ChronologyEvent(Base):
     # Additional structured data
     extra_data = Column(JSON, nullable=True)  # Flexible schema for extra attributes
 
+    # Weighted full-text vector generated by PostgreSQL (migration 004); deferred,
+    # and never written by the application. Unused (always NULL) on SQLite.
+    search_vector = deferred(
+        Column(
+            TSVECTOR().with_variant(Text(), "sqlite"),
+            server_default=FetchedValue(),
+            server_onupdate=FetchedValue(),
+        )
+    )
+
     # Relationships
     actors = relationship("Actor", secondary="event_actors", back_populates="events")
     patterns = relationship("Pattern", secondary="event_patterns", back_populates="events")
 
+    __table_args__ = (
+        # Keyset pagination in chronological order
+        Index("ix_chronology_events_year_start_id", "year_start", "id"),
+    )
+
+
+class TimelineBucket(Base):
+    """
+    Pre-aggregated event counts per century, era and event type.
+
+    Maintained alongside chronology_events so timeline summaries can be
+    answered from a few hundred rows instead of scanning every event.
+    """
+
+    __tablename__ = "timeline_buckets"
+
+    # First year of the century bucket (e.g. -600 covers -600..-501)
+    century_start = Column(Integer, primary_key=True)
+    era = Column(Enum(ChronologyEra), primary_key=True)
+    event_type = Column(Enum(EventType), primary_key=True)
+
+    event_count = Column(Integer, nullable=False, default=0)
+    min_year = Column(Integer, nullable=False)  # Earliest year_start in bucket
+    max_year = Column(Integer, nullable=False)  # Latest year_start in bucket
+    max_event_id = Column(Integer, nullable=False)  # Highest event ID counted in bucket
+
 
 class Actor(Base):
     """
@@ -3,8 +3,20 @@ Models for prophecy-fulfillment mapping.
 Tracks how prophetic texts relate to historical outcomes.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Enum, ForeignKey, JSON, Float
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    Enum,
+    ForeignKey,
+    JSON,
+    Float,
+    DateTime,
+    Index,
+)
 from sqlalchemy.orm import relationship
+from datetime import datetime
 import enum
 
 from app.database import Base
@@ -85,6 +97,30 @@ class ProphecyFulfillment(Base):
     event = relationship("ChronologyEvent")
 
 
+class ProphecyCandidate(Base):
+    """
+    Precomputed keyword match between a prophecy and a chronology event.
+
+    One row per (prophecy, event) with at least one matched keyword, maintained
+    incrementally as events and prophecies are added, so candidates for every
+    prophecy can be ranked and paged without re-running the search.
+    """
+
+    __tablename__ = "prophecy_candidates"
+
+    prophecy_id = Column(Integer, ForeignKey("prophecy_texts.id"), primary_key=True)
+    event_id = Column(
+        Integer, ForeignKey("chronology_events.id"), primary_key=True, index=True
+    )
+
+    score = Column(Float, nullable=False)  # Prophecy score: sum of the element scores
+    matched_keywords = Column(JSON, nullable=False)
+    element_scores = Column(JSON, nullable=False)  # element id -> BM25 score of its keywords
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("ix_prophecy_candidates_prophecy_score", "prophecy_id", "score"),)
+
+
 class PropheticalPattern(Base):
     """
     Recurring prophetic patterns that repeat across history.
@@ -4,12 +4,24 @@ Pattern Recognition Library for Biblical Cliodynamic Analysis.
 Identifies recurring patterns across historical events and eras.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
 from app.models.chronology import ChronologyEvent, Pattern, EventPattern, ChronologyEra
 from app.models.prophecy import PropheticalPattern
-import json
+from app.patterns.matcher import get_pattern_matcher
+from app.patterns.recurrence import get_recurrence_statistics, pattern_statistics
+from app.patterns.sequences import get_sequence_counts
+from app.patterns.similarity import get_similarity_index, pattern_keywords
+
+
+# Rows per statement in bulk_link
+LINK_BATCH_SIZE = 500
+
+# How bulk_link treats links that already exist
+LINK_CONFLICT_MODES = ("update_strength", "max_strength", "ignore")
 
 
 class PatternLibrary:
@@ -79,6 +91,11 @@ class PatternLibrary:
         },
     }
 
+    # extra_data["pattern"] values recognised by relink_chronology (besides CORE_PATTERNS keys)
+    PATTERN_KEY_ALIASES = {
+        "pride_humbling": "pride_fall",
+    }
+
     def get_all_patterns(self) -> List[Pattern]:
         """Retrieve all defined patterns from database."""
         return self.db.query(Pattern).all()
@@ -131,16 +148,179 @@ class PatternLibrary:
         self.db.commit()
         return event_pattern
 
+    def bulk_link(
+        self,
+        links: Iterable[Dict[str, int]],
+        on_conflict: str = "update_strength",
+        batch_size: int = LINK_BATCH_SIZE,
+    ) -> Dict[str, int]:
+        """
+        Link many events to patterns in one transaction.
+
+        Rows are written with set-based INSERT ... ON CONFLICT statements on
+        event_patterns instead of one commit per link.
+
+        Args:
+            links: {"event_id", "pattern_id", "strength"} dictionaries; for a
+                   repeated (event, pattern) pair the last one wins
+            on_conflict: For links that already exist, "update_strength" overwrites
+                         the strength, "max_strength" keeps the larger one and
+                         "ignore" leaves them untouched
+            batch_size: Rows per statement
+
+        Returns:
+            Counts of inserted, updated, unchanged and skipped links (skipped
+            links reference an event or pattern that does not exist)
+
+        Raises:
+            ValueError: On an unknown on_conflict mode or a strength outside 1-10
+        """
+        if on_conflict not in LINK_CONFLICT_MODES:
+            raise ValueError(
+                f"Unknown on_conflict '{on_conflict}'; expected one of "
+                f"{', '.join(LINK_CONFLICT_MODES)}"
+            )
+
+        wanted: Dict[Tuple[int, int], int] = {}
+        for link in links:
+            strength = link["strength"]
+            if not 1 <= strength <= 10:
+                raise ValueError(f"Strength must be between 1 and 10, got {strength}")
+            wanted[(link["event_id"], link["pattern_id"])] = strength
+
+        event_ids = sorted({event_id for event_id, _ in wanted})
+        pattern_ids = {pattern_id for _, pattern_id in wanted}
+        known_patterns = {
+            pattern_id
+            for (pattern_id,) in self.db.query(Pattern.id).filter(Pattern.id.in_(pattern_ids))
+        }
+        known_events = set()
+        existing: Dict[Tuple[int, int], Optional[int]] = {}
+        for start in range(0, len(event_ids), batch_size):
+            chunk = event_ids[start : start + batch_size]
+            known_events.update(
+                event_id
+                for (event_id,) in self.db.query(ChronologyEvent.id).filter(
+                    ChronologyEvent.id.in_(chunk)
+                )
+            )
+            existing.update(
+                ((event_id, pattern_id), strength)
+                for event_id, pattern_id, strength in self.db.query(
+                    EventPattern.event_id, EventPattern.pattern_id, EventPattern.strength
+                ).filter(EventPattern.event_id.in_(chunk))
+            )
+
+        summary = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        rows = []
+        for (event_id, pattern_id), strength in wanted.items():
+            if event_id not in known_events or pattern_id not in known_patterns:
+                summary["skipped"] += 1
+                continue
+
+            if (event_id, pattern_id) not in existing:
+                summary["inserted"] += 1
+            else:
+                current = existing[(event_id, pattern_id)]
+                if on_conflict == "ignore" or current == strength or (
+                    on_conflict == "max_strength" and current is not None and current >= strength
+                ):
+                    summary["unchanged"] += 1
+                    continue
+                summary["updated"] += 1
+            rows.append({"event_id": event_id, "pattern_id": pattern_id, "strength": strength})
+
+        statement = self._link_upsert(on_conflict)
+        try:
+            for start in range(0, len(rows), batch_size):
+                self.db.execute(statement, rows[start : start + batch_size])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return summary
+
+    def _link_upsert(self, on_conflict: str):
+        """INSERT ... ON CONFLICT statement on event_patterns for the session's dialect."""
+        dialect = self.db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(EventPattern.__table__)
+        keys = ["event_id", "pattern_id"]
+
+        if on_conflict == "ignore":
+            return statement.on_conflict_do_nothing(index_elements=keys)
+        if on_conflict == "max_strength":
+            strength = case(
+                (
+                    (EventPattern.strength.is_(None))
+                    | (statement.excluded.strength > EventPattern.strength),
+                    statement.excluded.strength,
+                ),
+                else_=EventPattern.strength,
+            )
+        else:
+            strength = statement.excluded.strength
+        return statement.on_conflict_do_update(index_elements=keys, set_={"strength": strength})
+
+    def relink_chronology(
+        self,
+        strength: int = 7,
+        include_detected: bool = False,
+        on_conflict: str = "update_strength",
+    ) -> Dict[str, int]:
+        """
+        Re-link the whole chronology to patterns in one transaction.
+
+        Events are linked to the pattern named by their extra_data["pattern"]
+        key (a CORE_PATTERNS key or alias) with the given strength. With
+        include_detected, patterns found by keyword detection are linked too,
+        with strength derived from the detection confidence.
+
+        Returns:
+            bulk_link summary plus the number of candidate links considered
+        """
+        patterns_by_key = {}
+        for key, data in self.CORE_PATTERNS.items():
+            pattern = self.get_pattern_by_name(data["name"])
+            if pattern:
+                patterns_by_key[key] = pattern.id
+        for alias, key in self.PATTERN_KEY_ALIASES.items():
+            if key in patterns_by_key:
+                patterns_by_key[alias] = patterns_by_key[key]
+
+        links: Dict[Tuple[int, int], int] = {}
+        if include_detected:
+            for result in self.detect_patterns_batch()["results"]:
+                for match in result["detected_patterns"]:
+                    links[(result["event_id"], match["pattern_id"])] = max(
+                        1, round(match["confidence_score"] * 10)
+                    )
+
+        for event_id, extra_data in self.db.query(
+            ChronologyEvent.id, ChronologyEvent.extra_data
+        ).yield_per(1000):
+            key = extra_data.get("pattern") if isinstance(extra_data, dict) else None
+            pattern_id = patterns_by_key.get(key) if isinstance(key, str) else None
+            if pattern_id is not None:
+                links[(event_id, pattern_id)] = strength
+
+        summary = self.bulk_link(
+            (
+                {"event_id": event_id, "pattern_id": pattern_id, "strength": link_strength}
+                for (event_id, pattern_id), link_strength in links.items()
+            ),
+            on_conflict=on_conflict,
+        )
+        summary["candidates"] = len(links)
+        return summary
+
     def find_pattern_instances(self, pattern_id: int) -> List[Dict[str, Any]]:
         """
         Find all historical instances of a given pattern.
         Returns events with their era and temporal context.
         """
-        pattern = self.get_pattern_by_id(pattern_id)
-        if not pattern:
-            return []
-
-        # Get events linked to this pattern
+        # Get events linked to this pattern (none if the pattern does not exist)
         instances = (
             self.db.query(ChronologyEvent, EventPattern.strength)
             .join(EventPattern, ChronologyEvent.id == EventPattern.event_id)
@@ -167,13 +347,26 @@ class PatternLibrary:
 
         return result
 
+    def recurrence_statistics(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Recurrence statistics for every pattern with linked events.
+
+        Computed with SQL window functions in one pass over event_patterns and
+        cached until the links change.
+
+        Returns:
+            pattern_id -> total_instances, era_distribution, average/median/stddev
+            interval in years, first_occurrence and most_recent_occurrence
+        """
+        return get_recurrence_statistics(self.db)
+
     def analyze_pattern_recurrence(self, pattern_id: int) -> Dict[str, Any]:
         """
         Analyze how often and across which eras a pattern recurs.
         """
-        instances = self.find_pattern_instances(pattern_id)
+        statistics = pattern_statistics(self.db, pattern_id)
 
-        if not instances:
+        if statistics["total_instances"] == 0:
             return {
                 "pattern_id": pattern_id,
                 "total_instances": 0,
@@ -181,25 +374,44 @@ class PatternLibrary:
                 "average_interval_years": None,
             }
 
-        # Calculate era distribution
-        era_counts = {}
-        for instance in instances:
-            era = instance["era"]
-            era_counts[era] = era_counts.get(era, 0) + 1
+        return {
+            "pattern_id": pattern_id,
+            **statistics,
+            "instances": self.find_pattern_instances(pattern_id),
+        }
+
+    def pattern_sequences(
+        self, window_years: int = 50, min_count: int = 2, limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Frequent ordered pattern pairs and triples across the chronology.
 
-        # Calculate average interval between instances
-        years = sorted([i["year_start"] for i in instances])
-        intervals = [years[i + 1] - years[i] for i in range(len(years) - 1)]
-        avg_interval = sum(intervals) / len(intervals) if intervals else None
+        A sequence such as Pride → Fall then Unity → Fragmentation is counted at
+        each instance of its first pattern that is followed by the others, in
+        order, on later events within `window_years`. Counts are cached per
+        window until pattern links change.
+
+        Args:
+            window_years: Maximum span from the first to the last pattern
+            min_count: Minimum number of occurrences
+            limit: Maximum pairs and triples returned
+
+        Returns:
+            Dictionary with the window, total pattern instances and ranked pairs
+            and triples, each with count, support, confidence and lift
+        """
+        counts = get_sequence_counts(self.db, window_years)
+        names = dict(self.db.query(Pattern.id, Pattern.name))
+        ranked = counts.ranked(min_count, limit)
+
+        for sequences in ranked.values():
+            for sequence in sequences:
+                sequence["pattern_names"] = [names.get(i) for i in sequence["pattern_ids"]]
 
         return {
-            "pattern_id": pattern_id,
-            "total_instances": len(instances),
-            "era_distribution": era_counts,
-            "average_interval_years": avg_interval,
-            "first_occurrence": years[0],
-            "most_recent_occurrence": years[-1],
-            "instances": instances,
+            "window_years": window_years,
+            "total_instances": counts.total,
+            **ranked,
         }
 
     def detect_pattern_in_event(self, event_id: int) -> List[Dict[str, Any]]:
@@ -211,49 +423,132 @@ class PatternLibrary:
         if not event:
             return []
 
-        detected_patterns = []
-
-        # Get all patterns
-        all_patterns = self.get_all_patterns()
-
-        # Analyze event text
-        event_text = f"{event.name} {event.description or ''}"
-        extra_data = event.extra_data or {}
-        extra_data_str = json.dumps(extra_data).lower()
-
-        for pattern in all_patterns:
-            score = 0
-
-            # Check if pattern keywords appear in event
-            preconditions = pattern.preconditions or {}
-            indicators = pattern.indicators or {}
-            outcomes = pattern.outcomes or {}
-
-            # Simple keyword matching (can be enhanced with NLP)
-            for condition in preconditions:
-                if isinstance(condition, str) and condition.lower() in extra_data_str:
-                    score += 2
-
-            for indicator in indicators:
-                if isinstance(indicator, str) and indicator.lower() in event_text.lower():
-                    score += 3
-
-            for outcome in outcomes:
-                if isinstance(outcome, str) and outcome.lower() in event_text.lower():
-                    score += 2
-
-            # If score exceeds threshold, add to detected patterns
-            if score >= 3:
-                detected_patterns.append(
-                    {
-                        "pattern_id": pattern.id,
-                        "pattern_name": pattern.name,
-                        "confidence_score": min(score / 10.0, 1.0),  # Normalize to 0-1
-                        "matched_indicators": score,
-                    }
-                )
+        matcher = get_pattern_matcher(self.db)
+        return matcher.score(f"{event.name} {event.description or ''}", event.extra_data)
+
+    def detect_patterns_batch(
+        self, event_ids: Optional[List[int]] = None, batch_size: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Detect patterns across many events in one pass.
+
+        Events are streamed in batches and each is scanned once by the compiled
+        pattern matcher, however many patterns are defined.
+
+        Args:
+            event_ids: Events to analyze (default: the whole chronology)
+            batch_size: Rows fetched per round trip
 
-        return sorted(detected_patterns, key=lambda x: x["confidence_score"], reverse=True)
+        Returns:
+            Dictionary with events scanned, per-pattern detection counts and, for
+            each event with detections, its patterns and confidences
+        """
+        matcher = get_pattern_matcher(self.db)
+        query = self.db.query(
+            ChronologyEvent.id,
+            ChronologyEvent.name,
+            ChronologyEvent.description,
+            ChronologyEvent.extra_data,
+        )
+        if event_ids is not None:
+            query = query.filter(ChronologyEvent.id.in_(event_ids))
+
+        scanned = 0
+        pattern_counts: Dict[int, int] = {}
+        results = []
+        for event_id, name, description, extra_data in query.order_by(
+            ChronologyEvent.id
+        ).yield_per(batch_size):
+            scanned += 1
+            detected = matcher.score(f"{name} {description or ''}", extra_data)
+            if detected:
+                results.append({"event_id": event_id, "detected_patterns": detected})
+                for match in detected:
+                    pattern_counts[match["pattern_id"]] = (
+                        pattern_counts.get(match["pattern_id"], 0) + 1
+                    )
+
+        return {
+            "events_scanned": scanned,
+            "events_matched": len(results),
+            "pattern_counts": pattern_counts,
+            "results": results,
+        }
+
+    def pattern_similarity(
+        self,
+        pattern_ids: Optional[List[int]] = None,
+        limit: int = 10,
+        min_score: float = 0.1,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank events by TF-IDF cosine similarity to each pattern's keywords.
+
+        Unlike detect_pattern_in_event, this matches stemmed terms ("oppressed the
+        poor" is similar to oppression_of_poor) and scores the whole chronology
+        against every pattern at once from the persisted term matrix.
+
+        Args:
+            pattern_ids: Patterns to score (default: all)
+            limit: Events returned per pattern
+            min_score: Minimum cosine similarity (0-1)
+
+        Returns:
+            For each pattern, its most similar events with their scores
+        """
+        query = self.db.query(Pattern)
+        if pattern_ids is not None:
+            query = query.filter(Pattern.id.in_(pattern_ids))
+        patterns = query.order_by(Pattern.id).all()
+
+        index = get_similarity_index(self.db)
+        scores = index.score([pattern_keywords(pattern) for pattern in patterns])
+
+        results = []
+        for column, pattern in enumerate(patterns):
+            column_scores = scores[:, column]
+            top = np.flatnonzero(column_scores >= min_score)
+            if len(top) > limit:
+                top = top[np.argpartition(-column_scores[top], limit - 1)[:limit]]
+            top = top[np.lexsort((index.event_ids[top], -column_scores[top]))]
+            results.append(
+                {
+                    "pattern_id": pattern.id,
+                    "pattern_name": pattern.name,
+                    "events": [
+                        {"event_id": int(index.event_ids[i]), "score": float(column_scores[i])}
+                        for i in top
+                    ],
+                }
+            )
+
+        return results
+
+    def link_detected_patterns(
+        self, event_ids: List[int], on_conflict: str = "ignore"
+    ) -> Dict[str, Any]:
+        """
+        Detect patterns in the given events and link them.
+
+        Link strength is the detection confidence on a 1-10 scale; by default
+        existing (e.g. manually curated) links are left untouched.
+
+        Returns:
+            bulk_link summary plus the number of detections
+        """
+        detected = self.detect_patterns_batch(event_ids)["results"]
+        links = [
+            {
+                "event_id": result["event_id"],
+                "pattern_id": match["pattern_id"],
+                "strength": max(1, round(match["confidence_score"] * 10)),
+            }
+            for result in detected
+            for match in result["detected_patterns"]
+        ]
+        summary = self.bulk_link(links, on_conflict=on_conflict)
+        summary["detections"] = len(links)
+        return summary
 
     def seed_core_patterns(self) -> List[Pattern]:
         """
@@ -0,0 +1,199 @@
+"""
+Pattern Matcher: compiled multi-keyword matching for pattern detection.
+
+All pattern preconditions, indicators and outcomes are compiled into one
+Aho-Corasick automaton, so an event's text is scanned once regardless of how
+many patterns and keywords exist. Text and keywords are normalised to lowercase
+words separated by single spaces (so "oppression_of_poor" matches "oppression
+of poor"), and matches must start and end on word boundaries.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.chronology import Pattern
+
+# Keyword role -> (score weight, text it is matched against)
+ROLES = {
+    "preconditions": (2, "extra_data"),
+    "indicators": (3, "text"),
+    "outcomes": (2, "text"),
+}
+
+# Minimum score for a pattern to count as detected
+DETECTION_THRESHOLD = 3
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase words separated by single spaces."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over normalised keywords, reporting whole-word matches."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                state = self._goto[state].setdefault(char, len(self._goto))
+                if state == len(self._goto):
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+            self._out[state].append(keyword)
+
+        # Breadth-first failure links; each state inherits its failure state's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> Set[str]:
+        """Keywords occurring in normalised `text` as whole words."""
+        found: Set[str] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        last = len(text) - 1
+
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in out[state]:
+                start = i - len(keyword) + 1
+                if (start == 0 or text[start - 1] == " ") and (i == last or text[i + 1] == " "):
+                    found.add(keyword)
+
+        return found
+
+
+class PatternMatcher:
+    """
+    Detects patterns in events from one compiled automaton over all pattern keywords.
+
+    Scoring matches PatternLibrary's original heuristic: +2 per precondition in
+    the event's extra_data, +3 per indicator and +2 per outcome in its name or
+    description; a pattern is detected at DETECTION_THRESHOLD and its confidence
+    is score / 10, capped at 1.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[int, str, Dict[str, Any]]], signature: str):
+        """
+        Compile the matcher.
+
+        Args:
+            patterns: (id, name, {role: keywords}) for each pattern
+            signature: Fingerprint of the pattern keywords the matcher was built from
+        """
+        self.signature = signature
+        self.names: Dict[int, str] = {}
+        # normalised keyword -> [(pattern_id, role, original keyword)]
+        self._keywords: Dict[str, List[Tuple[int, str, str]]] = {}
+
+        for pattern_id, name, roles in patterns:
+            self.names[pattern_id] = name
+            for role, keywords in roles.items():
+                for keyword in keywords or []:
+                    if isinstance(keyword, str) and normalize(keyword):
+                        self._keywords.setdefault(normalize(keyword), []).append(
+                            (pattern_id, role, keyword)
+                        )
+
+        self._automaton = AhoCorasick(self._keywords)
+
+    def score(self, text: str, extra_data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Detected patterns for one event, highest confidence first.
+
+        Args:
+            text: Event name and description
+            extra_data: Event extra_data (preconditions are matched against it)
+        """
+        sources = {
+            "text": self._automaton.find(normalize(text)),
+            "extra_data": self._automaton.find(normalize(json.dumps(extra_data or {}))),
+        }
+
+        scores: Dict[int, int] = {}
+        matched: Dict[int, List[str]] = {}
+        for source, found in sources.items():
+            for keyword in found:
+                for pattern_id, role, original in self._keywords[keyword]:
+                    weight, role_source = ROLES[role]
+                    if role_source != source:
+                        continue
+                    scores[pattern_id] = scores.get(pattern_id, 0) + weight
+                    matched.setdefault(pattern_id, []).append(original)
+
+        detected = [
+            {
+                "pattern_id": pattern_id,
+                "pattern_name": self.names[pattern_id],
+                "confidence_score": min(score / 10.0, 1.0),
+                "matched_indicators": score,
+                "matched_keywords": sorted(matched[pattern_id]),
+            }
+            for pattern_id, score in scores.items()
+            if score >= DETECTION_THRESHOLD
+        ]
+        return sorted(detected, key=lambda d: (-d["confidence_score"], d["pattern_id"]))
+
+
+def _load_patterns(db: Session) -> Tuple[List[Tuple[int, str, Dict[str, Any]]], str]:
+    rows = db.query(
+        Pattern.id, Pattern.name, Pattern.preconditions, Pattern.indicators, Pattern.outcomes
+    ).order_by(Pattern.id)
+    patterns = [
+        (pattern_id, name, dict(zip(ROLES, (preconditions, indicators, outcomes))))
+        for pattern_id, name, preconditions, indicators, outcomes in rows
+    ]
+    signature = hashlib.sha1(
+        json.dumps(patterns, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return patterns, signature
+
+
+# Process-wide matchers, one per database URL
+_matchers: Dict[str, PatternMatcher] = {}
+_lock = threading.Lock()
+
+
+def get_pattern_matcher(db: Session) -> PatternMatcher:
+    """
+    Get the compiled matcher for the current pattern definitions.
+
+    Pattern keywords are few, so they are re-read on each call and the automaton
+    is only recompiled when their fingerprint changes.
+    """
+    key = str(db.get_bind().url)
+    patterns, signature = _load_patterns(db)
+    matcher = _matchers.get(key)
+
+    if matcher is None or matcher.signature != signature:
+        with _lock:
+            matcher = _matchers.get(key)
+            if matcher is None or matcher.signature != signature:
+                matcher = PatternMatcher(patterns, signature)
+                _matchers[key] = matcher
+
+    return matcher
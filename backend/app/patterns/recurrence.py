@@ -0,0 +1,160 @@
+"""
+Pattern Recurrence: set-based recurrence statistics for every pattern at once.
+
+Intervals between successive instances are computed in SQL with
+LAG(year_start) OVER (PARTITION BY pattern_id ORDER BY year_start), and the
+median interval is picked with ROW_NUMBER() over the same partitions, so one
+statement returns count, mean/median/stddev interval and first/last occurrence
+for the whole library. Results are cached until event_patterns (or the
+chronology) changes.
+"""
+
+import copy
+import math
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.chronology.index import chronology_version
+from app.models.chronology import ChronologyEvent, EventPattern
+
+# Statistics for one pattern with no linked events
+EMPTY_STATISTICS = {
+    "total_instances": 0,
+    "era_distribution": {},
+    "average_interval_years": None,
+    "median_interval_years": None,
+    "stddev_interval_years": None,
+    "first_occurrence": None,
+    "most_recent_occurrence": None,
+}
+
+
+def links_version(db: Session) -> Tuple[Any, ...]:
+    """Cheap fingerprint of event_patterns plus the chronology version."""
+    links = db.query(
+        func.count(),
+        func.coalesce(func.sum(EventPattern.event_id), 0),
+        func.coalesce(func.sum(EventPattern.event_id * EventPattern.pattern_id), 0),
+    ).one()
+    return (*links, *chronology_version(db))
+
+
+def compute_recurrence(db: Session) -> Dict[int, Dict[str, Any]]:
+    """
+    Recurrence statistics for every pattern with at least one linked event.
+
+    Returns:
+        pattern_id -> statistics dictionary (see EMPTY_STATISTICS for the keys)
+    """
+    year = ChronologyEvent.year_start
+    gaps = (
+        select(
+            EventPattern.pattern_id,
+            year.label("year_start"),
+            (
+                year
+                - func.lag(year).over(
+                    partition_by=EventPattern.pattern_id, order_by=(year, ChronologyEvent.id)
+                )
+            ).label("interval"),
+        )
+        .join(ChronologyEvent, ChronologyEvent.id == EventPattern.event_id)
+        .subquery()
+    )
+
+    # Rank intervals within each pattern (the first instance has none and is
+    # partitioned apart) to find the middle one or two
+    ranked = select(
+        gaps,
+        func.row_number()
+        .over(
+            partition_by=(gaps.c.pattern_id, gaps.c.interval.is_(None)),
+            order_by=gaps.c.interval,
+        )
+        .label("rank"),
+        func.count(gaps.c.interval).over(partition_by=gaps.c.pattern_id).label("intervals"),
+    ).subquery()
+
+    is_median = and_(
+        ranked.c.interval.isnot(None),
+        ranked.c.rank.in_([(ranked.c.intervals + 1) // 2, (ranked.c.intervals + 2) // 2]),
+    )
+    rows = db.execute(
+        select(
+            ranked.c.pattern_id,
+            func.count(),
+            func.count(ranked.c.interval),
+            func.avg(ranked.c.interval),
+            func.sum(ranked.c.interval * ranked.c.interval),
+            func.avg(case((is_median, ranked.c.interval))),
+            func.min(ranked.c.year_start),
+            func.max(ranked.c.year_start),
+        ).group_by(ranked.c.pattern_id)
+    )
+
+    statistics: Dict[int, Dict[str, Any]] = {}
+    for pattern_id, count, intervals, mean, squares, median, first, last in rows:
+        stddev = None
+        if intervals > 1:
+            mean = float(mean)
+            variance = (float(squares) - intervals * mean * mean) / (intervals - 1)
+            stddev = math.sqrt(max(variance, 0.0))
+        statistics[pattern_id] = {
+            "total_instances": count,
+            "era_distribution": {},
+            "average_interval_years": float(mean) if mean is not None else None,
+            "median_interval_years": float(median) if median is not None else None,
+            "stddev_interval_years": stddev,
+            "first_occurrence": first,
+            "most_recent_occurrence": last,
+        }
+
+    era_counts = (
+        db.query(EventPattern.pattern_id, ChronologyEvent.era, func.count())
+        .join(ChronologyEvent, ChronologyEvent.id == EventPattern.event_id)
+        .group_by(EventPattern.pattern_id, ChronologyEvent.era)
+    )
+    for pattern_id, era, count in era_counts:
+        statistics[pattern_id]["era_distribution"][era.value] = count
+
+    return statistics
+
+
+# Process-wide cache: database URL -> (links version, statistics)
+_cache: Dict[str, Tuple[Tuple[Any, ...], Dict[int, Dict[str, Any]]]] = {}
+_lock = threading.Lock()
+
+
+def get_recurrence_statistics(db: Session) -> Dict[int, Dict[str, Any]]:
+    """
+    Recurrence statistics for all patterns, recomputed only when links change.
+
+    Returns a copy, so callers may modify it without corrupting the cache.
+    """
+    return copy.deepcopy(_cached_statistics(db))
+
+
+def _cached_statistics(db: Session) -> Dict[int, Dict[str, Any]]:
+    key = str(db.get_bind().url)
+    version = links_version(db)
+    cached = _cache.get(key)
+
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _cache.get(key)
+            if cached is None or cached[0] != version:
+                cached = (version, compute_recurrence(db))
+                _cache[key] = cached
+
+    return cached[1]
+
+
+def pattern_statistics(db: Session, pattern_id: int) -> Dict[str, Any]:
+    """Recurrence statistics for one pattern (EMPTY_STATISTICS if it has no instances)."""
+    statistics: Optional[Dict[str, Any]] = _cached_statistics(db).get(pattern_id)
+    if statistics is None:
+        return dict(EMPTY_STATISTICS, era_distribution={})
+    return copy.deepcopy(statistics)
@@ -0,0 +1,156 @@
+"""
+Pattern Sequences: frequent ordered pattern pairs and triples in the event stream.
+
+Every event-pattern link is an occurrence at its event's year_start. Sorted by
+(year, event), the occurrences form a stream; a sequence A -> B (-> C) occurs
+at an occurrence of A when B, and then C, are linked to later events within
+`window` years of it. For each sequence:
+
+    count       occurrences of A followed by the rest of the sequence
+    support     count / all occurrences
+    confidence  count / occurrences of A
+    lift        confidence / (share of all occurrences followed by the rest)
+
+so lift > 1 means the rest of the sequence follows A more often than it
+follows an arbitrary pattern. Counting is vectorised over the stream with
+per-pattern prefix sums, and results are cached per window until links change.
+"""
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.chronology import ChronologyEvent, EventPattern
+from app.patterns.recurrence import links_version
+
+
+class SequenceCounts:
+    """Pair and triple counts over the link stream for one window size."""
+
+    def __init__(
+        self,
+        pattern_ids: np.ndarray,
+        codes: np.ndarray,
+        event_ids: np.ndarray,
+        years: np.ndarray,
+        window: int,
+    ):
+        """
+        Count sequences.
+
+        Args:
+            pattern_ids: Distinct pattern IDs; codes index into this array
+            codes: Pattern code of each occurrence, in stream order
+            event_ids: Event of each occurrence
+            years: Year of each occurrence (non-decreasing)
+            window: Maximum years from the first to the last pattern of a sequence
+        """
+        self.pattern_ids = pattern_ids
+        self.window = window
+        self.total = len(codes)
+        patterns = len(pattern_ids)
+        positions = np.arange(self.total)
+
+        # Followers of occurrence i are [after[i], end[i]): later events within the window
+        group_end = np.r_[np.flatnonzero(np.diff(event_ids) != 0) + 1, self.total]
+        after = group_end[np.searchsorted(group_end, positions, side="right")]
+        end = np.searchsorted(years, years + window, side="right")
+
+        # prefix[p, k]: occurrences of pattern p before position k
+        # (onehot is float so the count products below use BLAS; integer matmul is far slower)
+        onehot = np.zeros((patterns, self.total))
+        onehot[codes, positions] = 1
+        prefix = np.zeros((patterns, self.total + 1), dtype=np.int32)
+        np.cumsum(onehot, axis=1, dtype=np.int32, out=prefix[:, 1:])
+
+        self.occurrences = np.bincount(codes, minlength=patterns)
+
+        # pairs[a, b]: occurrences of a followed by b; followed_by[b]: any occurrence followed by b
+        follows = prefix[:, end] > prefix[:, after]
+        self.pairs = np.rint(onehot @ follows.T).astype(np.int64)
+        self.followed_by = follows.sum(axis=1)
+
+        # triples[a, b, c]: b follows a, then c follows the first such b, all within a's window
+        self.triples = np.zeros((patterns, patterns, patterns), dtype=np.int64)
+        self.followed_by_pair = np.zeros((patterns, patterns), dtype=np.int64)
+        for b in range(patterns):
+            b_positions = np.flatnonzero(codes == b)
+            if not len(b_positions):
+                continue
+            slot = np.searchsorted(b_positions, after)
+            has_b = follows[b]
+            first_b = b_positions[np.minimum(slot, len(b_positions) - 1)]
+            then = np.where(has_b, after[first_b], end)
+            follows_bc = (prefix[:, end] > prefix[:, then]) & has_b
+            self.triples[:, b, :] = np.rint(onehot @ follows_bc.T)
+            self.followed_by_pair[b] = follows_bc.sum(axis=1)
+
+    def ranked(self, min_count: int, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Sequences occurring at least `min_count` times, most frequent first.
+
+        Returns:
+            {"pairs": [...], "triples": [...]}, each entry with pattern_ids, count,
+            support, confidence and lift
+        """
+        return {
+            "pairs": self._rank(self.pairs, self.followed_by, min_count, limit),
+            "triples": self._rank(self.triples, self.followed_by_pair, min_count, limit),
+        }
+
+    def _rank(
+        self, counts: np.ndarray, baseline: np.ndarray, min_count: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        keys = np.argwhere(counts >= max(min_count, 1))
+        results = []
+        for key in keys:
+            count = int(counts[tuple(key)])
+            confidence = count / self.occurrences[key[0]]
+            expected = baseline[tuple(key[1:])] / self.total
+            results.append(
+                {
+                    "pattern_ids": [int(self.pattern_ids[code]) for code in key],
+                    "count": count,
+                    "support": count / self.total,
+                    "confidence": confidence,
+                    "lift": confidence / expected,
+                }
+            )
+        results.sort(key=lambda s: (-s["count"], -s["lift"], s["pattern_ids"]))
+        return results[:limit]
+
+
+def mine_sequences(db: Session, window: int) -> SequenceCounts:
+    """Count pattern sequences over every event-pattern link for one window size."""
+    rows = np.array(
+        db.query(EventPattern.pattern_id, EventPattern.event_id, ChronologyEvent.year_start)
+        .join(ChronologyEvent, ChronologyEvent.id == EventPattern.event_id)
+        .order_by(ChronologyEvent.year_start, EventPattern.event_id, EventPattern.pattern_id)
+        .all(),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    pattern_ids, codes = np.unique(rows[:, 0], return_inverse=True)
+    return SequenceCounts(pattern_ids, codes, rows[:, 1], rows[:, 2], window)
+
+
+# Process-wide cache: (database URL, window) -> (links version, counts)
+_cache: Dict[Tuple[str, int], Tuple[Tuple[Any, ...], SequenceCounts]] = {}
+_lock = threading.Lock()
+
+
+def get_sequence_counts(db: Session, window: int) -> SequenceCounts:
+    """Sequence counts for a window size, recomputed only when links change."""
+    key = (str(db.get_bind().url), window)
+    version = links_version(db)
+    cached = _cache.get(key)
+
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _cache.get(key)
+            if cached is None or cached[0] != version:
+                cached = (version, mine_sequences(db, window))
+                _cache[key] = cached
+
+    return cached[1]
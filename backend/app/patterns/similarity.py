@@ -0,0 +1,281 @@
+"""
+Pattern Similarity: TF-IDF cosine similarity between every event and every pattern.
+
+Event names, descriptions and extra_data are reduced to stemmed terms (see
+patterns.text) and stored as a sparse event x term count matrix in CSR form
+(indptr, indices, data NumPy arrays). Patterns become term vectors built from
+their preconditions, indicators and outcomes. Scoring weights the counts with
+sublinear TF and smoothed IDF, L2-normalises rows and scores the whole corpus
+against all patterns with one sparse-dense product.
+
+The count matrix is persisted to a single .npz file, tagged with the identity
+of the database it was built from, and, when events are added, extended with
+only the new rows; IDF is derived from it at scoring time, so appending never
+invalidates earlier rows.
+"""
+
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.chronology.index import chronology_version, database_identity
+from app.config import settings
+from app.models.chronology import ChronologyEvent, Pattern
+from app.patterns.text import analyze, json_text
+
+# Pattern keyword fields that make up a pattern's term vector
+PATTERN_FIELDS = ("preconditions", "indicators", "outcomes")
+
+
+def event_terms(name: str, description: Optional[str], extra_data: Any) -> List[str]:
+    """Stemmed terms of an event's name, description and extra_data."""
+    return analyze(f"{name} {description or ''} {json_text(extra_data)}")
+
+
+class SimilarityIndex:
+    """
+    Sparse term counts for every event, appended to as the chronology grows.
+
+    Row i holds the counts of event_ids[i]; its terms are
+    indices[indptr[i]:indptr[i + 1]] with counts data[indptr[i]:indptr[i + 1]].
+    """
+
+    def __init__(
+        self,
+        event_ids: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        vocabulary: Sequence[str],
+        version: Tuple[int, int],
+    ):
+        self.event_ids = event_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.vocabulary = list(vocabulary)
+        self.term_ids = {term: i for i, term in enumerate(self.vocabulary)}
+        self.version = version
+        self._weights: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def empty(cls) -> "SimilarityIndex":
+        return cls(
+            np.zeros(0, dtype=np.int64),
+            np.zeros(1, dtype=np.int64),
+            np.zeros(0, dtype=np.int32),
+            np.zeros(0, dtype=np.float32),
+            [],
+            (0, 0),
+        )
+
+    @property
+    def max_event_id(self) -> int:
+        return int(self.event_ids.max()) if len(self.event_ids) else 0
+
+    def append(self, rows: Iterable[Tuple[int, List[str]]]) -> int:
+        """
+        Add rows of (event_id, terms), growing the vocabulary as needed.
+
+        Returns:
+            Number of rows added
+        """
+        ids, lengths, indices, counts = [], [], [], []
+        for event_id, terms in rows:
+            tally = Counter(terms)
+            ids.append(event_id)
+            lengths.append(len(tally))
+            for term, count in tally.items():
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    term_id = self.term_ids[term] = len(self.vocabulary)
+                    self.vocabulary.append(term)
+                indices.append(term_id)
+                counts.append(count)
+
+        if ids:
+            self.event_ids = np.concatenate([self.event_ids, np.array(ids, dtype=np.int64)])
+            self.indptr = np.concatenate(
+                [self.indptr, self.indptr[-1] + np.cumsum(lengths, dtype=np.int64)]
+            )
+            self.indices = np.concatenate([self.indices, np.array(indices, dtype=np.int32)])
+            self.data = np.concatenate([self.data, np.array(counts, dtype=np.float32)])
+            self._weights = None
+        return len(ids)
+
+    def idf(self) -> np.ndarray:
+        """Smoothed inverse document frequency of every vocabulary term."""
+        df = np.bincount(self.indices, minlength=len(self.vocabulary))
+        return np.log((1.0 + len(self.event_ids)) / (1.0 + df)) + 1.0
+
+    def weights(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        L2-normalised TF-IDF weights of the stored counts.
+
+        Returns:
+            (row of each stored value, its weight, idf of every term)
+        """
+        if self._weights is None:
+            rows = np.repeat(np.arange(len(self.event_ids)), np.diff(self.indptr))
+            idf = self.idf()
+            weights = (1.0 + np.log(self.data, dtype=np.float64)) * idf[self.indices]
+            norms = np.sqrt(np.bincount(rows, weights * weights, minlength=len(self.event_ids)))
+            weights /= np.where(norms > 0, norms, 1.0)[rows]
+            self._weights = (rows, weights, idf)
+        return self._weights
+
+    def pattern_matrix(self, patterns: Sequence[Sequence[str]], idf: np.ndarray) -> np.ndarray:
+        """
+        Dense term x pattern matrix of L2-normalised TF-IDF pattern vectors.
+
+        Args:
+            patterns: Keywords of each pattern
+            idf: Term IDF, as returned by weights()
+        """
+        matrix = np.zeros((len(self.vocabulary), len(patterns)))
+        for column, keywords in enumerate(patterns):
+            tally = Counter(term for keyword in keywords for term in analyze(keyword))
+            for term, count in tally.items():
+                term_id = self.term_ids.get(term)
+                if term_id is not None:
+                    matrix[term_id, column] = (1.0 + np.log(count)) * idf[term_id]
+            norm = np.linalg.norm(matrix[:, column])
+            if norm > 0:
+                matrix[:, column] /= norm
+        return matrix
+
+    def score(self, patterns: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Cosine similarity of every event to every pattern.
+
+        Args:
+            patterns: Keywords of each pattern
+
+        Returns:
+            Array of shape (events, patterns), rows in event_ids order
+        """
+        rows, weights, idf = self.weights()
+        matrix = self.pattern_matrix(patterns, idf)
+        scores = np.zeros((len(self.event_ids), len(patterns)))
+        if not len(patterns) or not len(weights):
+            return scores
+
+        # Only stored values whose term occurs in some pattern contribute
+        relevant = matrix.any(axis=1)[self.indices]
+        rows, weights, indices = rows[relevant], weights[relevant], self.indices[relevant]
+        contributions = weights[:, None] * matrix[indices]
+        for column in range(len(patterns)):
+            scores[:, column] = np.bincount(
+                rows, contributions[:, column], minlength=len(self.event_ids)
+            )
+        return scores
+
+    def save(self, path: Path, database: str) -> None:
+        """Write the index of `database` to `path`, replacing any previous file atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.with_name(f".{path.stem}.{os.getpid()}.npz")
+        np.savez(
+            staging,
+            event_ids=self.event_ids,
+            indptr=self.indptr,
+            indices=self.indices,
+            data=self.data,
+            vocabulary=np.array(self.vocabulary, dtype=str),
+            version=np.array(self.version, dtype=np.int64),
+            database=np.array(database),
+        )
+        os.replace(staging, path)
+
+    @classmethod
+    def load(cls, path: Path, database: str) -> Optional["SimilarityIndex"]:
+        """Read an index written by save() for `database`, or None if there is none."""
+        try:
+            with np.load(path) as stored:
+                if str(stored["database"]) != database:
+                    return None
+                return cls(
+                    stored["event_ids"],
+                    stored["indptr"],
+                    stored["indices"],
+                    stored["data"],
+                    stored["vocabulary"].tolist(),
+                    tuple(int(v) for v in stored["version"]),
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def refresh(self, db: Session, version: Tuple[int, int]) -> "SimilarityIndex":
+        """
+        Bring the index up to `version`.
+
+        Events newer than the last indexed one are appended; if that does not
+        account for the whole chronology (events were deleted), a fresh index
+        is built instead.
+        """
+        rows = db.query(
+            ChronologyEvent.id,
+            ChronologyEvent.name,
+            ChronologyEvent.description,
+            ChronologyEvent.extra_data,
+        )
+        # Extend a copy, so requests still scoring against this index are unaffected
+        index = SimilarityIndex(
+            self.event_ids, self.indptr, self.indices, self.data, self.vocabulary, self.version
+        )
+        if len(self.event_ids) + rows.filter(ChronologyEvent.id > self.max_event_id).count() != (
+            version[0]
+        ):
+            index = SimilarityIndex.empty()
+
+        index.append(
+            (event_id, event_terms(name, description, extra_data))
+            for event_id, name, description, extra_data in rows.filter(
+                ChronologyEvent.id > index.max_event_id
+            ).order_by(ChronologyEvent.id)
+        )
+        index.version = version
+        return index
+
+
+# Process-wide indexes, keyed by index file and database
+_indexes: Dict[str, SimilarityIndex] = {}
+_lock = threading.Lock()
+
+
+def get_similarity_index(db: Session, path: Optional[Path] = None) -> SimilarityIndex:
+    """
+    Get the similarity index for the current dataset version.
+
+    Reuses this process's index, else loads the persisted one, then appends any
+    events added since and writes the result back.
+    """
+    path = Path(path or settings.PATTERN_SIMILARITY_PATH)
+    database = database_identity(db)
+    key = f"{path.resolve()}#{database}"
+    version = chronology_version(db)
+
+    index = _indexes.get(key)
+    if index is not None and index.version == version:
+        return index
+
+    with _lock:
+        index = _indexes.get(key)
+        if index is None or index.version != version:
+            if index is None:
+                index = SimilarityIndex.load(path, database) or SimilarityIndex.empty()
+            if index.version != version:
+                index = index.refresh(db, version)
+                index.save(path, database)
+            _indexes[key] = index
+
+    return index
+
+
+def pattern_keywords(pattern: Pattern) -> List[str]:
+    """Text of a pattern's preconditions, indicators and outcomes, one entry per field."""
+    return [json_text(getattr(pattern, field)) for field in PATTERN_FIELDS]
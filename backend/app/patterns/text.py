@@ -0,0 +1,119 @@
+"""
+Text analysis shared by pattern scoring: tokenising, stopwords and light stemming.
+
+Pattern keywords are snake_case phrases ("oppression_of_poor") while event text
+is prose ("oppressed the poor"); both are reduced to the same stemmed terms
+("oppress", "poor") so they can be compared. canonical_terms additionally folds
+synonyms ("regime", "governments" -> "state") for matching short phrases such as
+pattern preconditions against indicator text. Synonyms are looked up by whole
+word (or its plural) before stemming, so words that merely share a stem with a
+synonym ("statement", "arm") are not folded into its group.
+"""
+
+import json
+import re
+from typing import Any, Iterator, List
+
+from app.chronology.search import STOPWORDS
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Suffixes are tried longest first; one is only removed if MIN_STEM letters remain
+_SUFFIXES = sorted(
+    """
+    izations ization ational fulness ousness iveness ations ation ments ment ness
+    ings ing ions ion ities ity ies ied ating ated ates ate ers er ed es ly s
+    """.split(),
+    key=len,
+    reverse=True,
+)
+MIN_STEM = 3
+
+# Words treated as the same term by canonical_terms; the first word of each
+# group is the canonical one. Plurals are matched too, other inflections must be
+# listed.
+SYNONYM_GROUPS = [
+    ["state", "government", "regime"],
+    [
+        "hostility",
+        "hostile",
+        "persecution",
+        "persecuted",
+        "repression",
+        "repressive",
+        "crackdown",
+    ],
+    ["military", "army", "armies", "armed", "troops"],
+    ["defeat", "rout", "surrender"],
+    ["prosperity", "wealth", "affluence", "boom"],
+    ["economic", "economy", "financial", "fiscal"],
+    ["religious", "religion", "faith", "church"],
+    ["injustice", "inequity", "corruption"],
+    ["unfaithfulness", "apostasy", "idolatry"],
+    ["relativism", "nihilism"],
+    ["deification", "divinization"],
+]
+
+
+def stem(word: str) -> str:
+    """
+    Strip one common English suffix ("oppression" and "oppressed" -> "oppress").
+
+    Deliberately conservative: it only needs to map inflections of the same
+    word together, not produce dictionary roots.
+    """
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            word = word[: -len(suffix)]
+            if suffix in ("ies", "ied"):
+                word += "y"
+            break
+    # Drop a final "e" so "exile"/"exiled" and "displacement"/"displaced" agree,
+    # and a doubled final consonant so "planned" agrees with "plan"
+    if len(word) > MIN_STEM and word.endswith("e"):
+        word = word[:-1]
+    if len(word) > MIN_STEM and word[-1] == word[-2] and word[-1] not in "aeiouls":
+        word = word[:-1]
+    return word
+
+
+def analyze(text: str) -> List[str]:
+    """Lowercase, split on non-letters (including underscores), drop stopwords, stem."""
+    return [stem(word) for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def canonical_terms(text: str) -> List[str]:
+    """analyze(), with each synonym replaced by its group's canonical word."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        canonical = _SYNONYMS.get(word)
+        if canonical is None and word.endswith("s"):
+            canonical = _SYNONYMS.get(word[:-1]) or (
+                _SYNONYMS.get(word[:-2]) if word.endswith("es") else None
+            )
+        terms.append(canonical or stem(word))
+    return terms
+
+
+def json_text(value: Any) -> str:
+    """Keys and string values of a JSON document as plain text."""
+    return " ".join(_json_strings(value))
+
+
+def _json_strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _json_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _json_strings(item)
+    elif value is not None and not isinstance(value, (int, float, bool)):
+        yield json.dumps(value, default=str)
+
+
+_SYNONYMS = {word: group[0] for group in SYNONYM_GROUPS for word in group}
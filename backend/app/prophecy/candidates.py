@@ -0,0 +1,203 @@
+"""
+Prophecy Candidates: BM25 element scores and the persisted prophecy x event candidates.
+
+score_prophecy scores events against a prophecy one element at a time: each
+element's keywords are a query to SearchIndex.term_scores (BM25 over the shared
+in-process index, ts_rank over search_vector on PostgreSQL), an element's score
+is the sum of its terms' scores and the prophecy score is the sum over
+elements. Live detection, ranking and the stored candidates all use it.
+
+Every (prophecy, event) pair with at least one matched keyword is stored in
+prophecy_candidates with those scores and the matched keywords. Refreshes are
+scoped: re-scoring one prophecy touches only its rows, and new events are
+scored against every prophecy by restricting the search to those events, so
+the table stays current without recomputing the whole matrix. Scores use the
+index statistics (IDF, average length) at the time a row was refreshed.
+Prophecy- and event-scoped refreshes can overlap on the same pair, so rows are
+upserted rather than inserted.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.chronology.search import SearchIndex
+from app.models.prophecy import ProphecyCandidate, ProphecyText
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement
+CANDIDATE_BATCH_SIZE = 1000
+
+
+def prophecy_keywords(
+    elements: Optional[List[Dict[str, Any]]],
+) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Keywords of a prophecy's elements.
+
+    Returns:
+        (all distinct keywords sorted, element id -> its keywords); elements
+        without an id are keyed by their position
+    """
+    keywords = set()
+    by_element = {}
+    for position, element in enumerate(elements or []):
+        element_keywords = element.get("keywords", [])
+        keywords.update(element_keywords)
+        element_id = element.get("id")
+        by_element[str(position if element_id is None else element_id)] = element_keywords
+    return sorted(keywords), by_element
+
+
+def score_prophecy(
+    search: SearchIndex,
+    elements: Optional[List[Dict[str, Any]]],
+    event_ids: Optional[Collection[int]] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Score events against a prophecy, element by element.
+
+    Args:
+        search: Search over the chronology
+        elements: The prophecy's elements
+        event_ids: Only score these events (default: all)
+
+    Returns:
+        event_id -> {"score", "element_scores", "matched_keywords", "confidence"}
+        for every event matching at least one keyword; confidence is the share
+        of the prophecy's distinct keywords matched
+    """
+    keywords, by_element = prophecy_keywords(elements)
+    element_scores: Dict[int, Dict[str, float]] = {}
+    matched: Dict[int, set] = {}
+    for element_id, element_keywords in by_element.items():
+        if not element_keywords:
+            continue
+        found = search.term_scores(element_keywords, prefix=True, event_ids=event_ids)
+        for event_id, term_scores in found.items():
+            element_scores.setdefault(event_id, {})[element_id] = sum(term_scores.values())
+            matched.setdefault(event_id, set()).update(term_scores)
+
+    return {
+        event_id: {
+            "score": sum(scores.values()),
+            "element_scores": scores,
+            "matched_keywords": sorted(matched[event_id]),
+            "confidence": min(len(matched[event_id]) / len(keywords), 1.0),
+        }
+        for event_id, scores in element_scores.items()
+    }
+
+
+def candidate_rows(prophecy_id: int, scored: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """prophecy_candidates rows for one prophecy from score_prophecy output."""
+    now = datetime.utcnow()
+    return [
+        {
+            "prophecy_id": prophecy_id,
+            "event_id": event_id,
+            "score": candidate["score"],
+            "matched_keywords": candidate["matched_keywords"],
+            "element_scores": candidate["element_scores"],
+            "updated_at": now,
+        }
+        for event_id, candidate in scored.items()
+    ]
+
+
+def score_candidates(
+    db: Session,
+    prophecy_ids: Optional[List[int]] = None,
+    event_ids: Optional[List[int]] = None,
+) -> List[Dict[str, Any]]:
+    """Compute candidate rows for the given prophecies and events (default: all)."""
+    prophecies = db.query(ProphecyText.id, ProphecyText.elements)
+    if prophecy_ids is not None:
+        prophecies = prophecies.filter(ProphecyText.id.in_(prophecy_ids))
+
+    search = SearchIndex(db)
+    rows = []
+    for prophecy_id, elements in prophecies:
+        rows.extend(candidate_rows(prophecy_id, score_prophecy(search, elements, event_ids)))
+    return rows
+
+
+def refresh_candidates(
+    db: Session,
+    prophecy_ids: Optional[List[int]] = None,
+    event_ids: Optional[List[int]] = None,
+) -> Dict[str, int]:
+    """
+    Replace the stored candidates of the given prophecies and/or events in one transaction.
+
+    Args:
+        db: Database session
+        prophecy_ids: Prophecies to re-score (default: all)
+        event_ids: Events to re-score (default: all)
+
+    Returns:
+        Counts of deleted and inserted rows
+    """
+    try:
+        stale = db.query(ProphecyCandidate)
+        if prophecy_ids is not None:
+            stale = stale.filter(ProphecyCandidate.prophecy_id.in_(prophecy_ids))
+        if event_ids is not None:
+            stale = stale.filter(ProphecyCandidate.event_id.in_(event_ids))
+        deleted = stale.delete(synchronize_session=False)
+
+        rows = score_candidates(db, prophecy_ids, event_ids)
+        statement = _candidate_upsert(db)
+        for start in range(0, len(rows), CANDIDATE_BATCH_SIZE):
+            db.execute(statement, rows[start : start + CANDIDATE_BATCH_SIZE])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"deleted": deleted, "inserted": len(rows)}
+
+
+def _candidate_upsert(db: Session):
+    """
+    INSERT ... ON CONFLICT statement on prophecy_candidates for the session's dialect.
+
+    A concurrent refresh of another scope may already have written the pair;
+    the newer scores replace its row.
+    """
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(ProphecyCandidate.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=["prophecy_id", "event_id"],
+        set_={
+            "score": statement.excluded.score,
+            "matched_keywords": statement.excluded.matched_keywords,
+            "element_scores": statement.excluded.element_scores,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+
+
+def run_refresh(
+    session_factory: Callable[[], Session],
+    prophecy_ids: Optional[List[int]] = None,
+    event_ids: Optional[List[int]] = None,
+) -> None:
+    """
+    Background-task entry point: refresh candidates in a session of its own.
+
+    Failures are logged, since there is no request left to report them to.
+    """
+    db = session_factory()
+    try:
+        result = refresh_candidates(db, prophecy_ids, event_ids)
+        logger.info("Refreshed prophecy candidates: %s", result)
+    except Exception:
+        logger.exception("Prophecy candidate refresh failed")
+    finally:
+        db.close()
@@ -3,10 +3,21 @@ Prophecy Library - Core prophecy-fulfillment mapping logic.
 Manages Biblical prophecies and tracks their historical fulfillments.
 """
 
-from sqlalchemy.orm import Session
+import heapq
+import math
+
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Dict, Optional, Any
-from app.models.prophecy import ProphecyText, ProphecyFulfillment, FulfillmentType
+from app.models.prophecy import (
+    ProphecyCandidate,
+    ProphecyText,
+    ProphecyFulfillment,
+    FulfillmentType,
+)
 from app.models.chronology import ChronologyEvent
+from app.chronology.search import SearchIndex
+from app.prophecy.candidates import prophecy_keywords, refresh_candidates, score_prophecy
+from app.prophecy.status import get_prophetic_status, invalidate_prophetic_status
 
 
 class ProphecyLibrary:
@@ -224,7 +235,10 @@ class ProphecyLibrary:
         self.db = db
 
     def get_all_prophecies(
-        self, prophecy_type: Optional[str] = None, scope: Optional[str] = None
+        self,
+        prophecy_type: Optional[str] = None,
+        scope: Optional[str] = None,
+        with_fulfillments: bool = False,
     ) -> List[ProphecyText]:
         """
         Retrieve all prophecies, optionally filtered.
@@ -232,12 +246,19 @@ class ProphecyLibrary:
         Args:
             prophecy_type: Filter by type (messianic, judgment, restoration, etc.)
             scope: Filter by scope (local, national, international, eschatological)
+            with_fulfillments: Eagerly load every prophecy's fulfillments and their
+                               events (two extra statements in total, not per prophecy)
 
         Returns:
             List of prophecy texts
         """
         query = self.db.query(ProphecyText)
 
+        if with_fulfillments:
+            query = query.options(
+                selectinload(ProphecyText.fulfillments).selectinload(ProphecyFulfillment.event)
+            )
+
         if prophecy_type:
             query = query.filter(ProphecyText.prophecy_type == prophecy_type)
 
@@ -258,16 +279,30 @@ class ProphecyLibrary:
         """
         Create a new prophecy entry.
 
+        Its fulfillment candidates are scored against every event by the
+        classification worker when it is running (the API server), and before
+        returning otherwise (scripts, tests).
+
         Args:
             prophecy_data: Dictionary with prophecy details
 
         Returns:
             Created ProphecyText instance
         """
+        # Imported here: the classifier imports this module
+        from app.chronology.classifier import get_classification_worker
+
         prophecy = ProphecyText(**prophecy_data)
         self.db.add(prophecy)
         self.db.commit()
         self.db.refresh(prophecy)
+        invalidate_prophetic_status(self.db)
+
+        worker = get_classification_worker()
+        if worker is not None and worker.running:
+            worker.enqueue_prophecies([prophecy.id])
+        else:
+            self.refresh_candidates(prophecy_ids=[prophecy.id])
         return prophecy
 
     def link_fulfillment(
@@ -305,6 +340,7 @@ class ProphecyLibrary:
         self.db.add(fulfillment)
         self.db.commit()
         self.db.refresh(fulfillment)
+        invalidate_prophetic_status(self.db)
         return fulfillment
 
     def get_fulfillments(
@@ -318,10 +354,12 @@ class ProphecyLibrary:
             fulfillment_type: Optional filter by fulfillment type
 
         Returns:
-            List of fulfillments with related events
+            List of fulfillments, with their events loaded in one extra query
         """
-        query = self.db.query(ProphecyFulfillment).filter(
-            ProphecyFulfillment.prophecy_id == prophecy_id
+        query = (
+            self.db.query(ProphecyFulfillment)
+            .options(selectinload(ProphecyFulfillment.event))
+            .filter(ProphecyFulfillment.prophecy_id == prophecy_id)
         )
 
         if fulfillment_type:
@@ -329,6 +367,19 @@ class ProphecyLibrary:
 
         return query.all()
 
+    def prophetic_status(self) -> Dict[str, Any]:
+        """
+        Complete/partial/pending classification of all prophecies.
+
+        Computed with one GROUP BY over prophecy_fulfillments and cached until a
+        prophecy or fulfillment is added through this library.
+
+        Returns:
+            Dictionary with total/complete/partial/pending counts and the pending
+            and partial prophecies
+        """
+        return get_prophetic_status(self.db)
+
     def analyze_fulfillment_timeline(self, prophecy_id: int) -> Dict[str, Any]:
         """
         Analyze the timeline of fulfillments for a prophecy.
@@ -343,11 +394,35 @@ class ProphecyLibrary:
         if not prophecy:
             return {}
 
-        fulfillments = self.get_fulfillments(prophecy_id)
+        return self._timeline(prophecy, self.get_fulfillments(prophecy_id))
 
+    def analyze_fulfillment_timelines(
+        self, prophecy_type: Optional[str] = None, scope: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze the fulfillment timelines of all prophecies at once.
+
+        Prophecies, fulfillments and events are loaded with three statements
+        regardless of how many prophecies there are.
+
+        Args:
+            prophecy_type: Filter by type
+            scope: Filter by scope
+
+        Returns:
+            List of timeline analyses, as from analyze_fulfillment_timeline
+        """
+        prophecies = self.get_all_prophecies(prophecy_type, scope, with_fulfillments=True)
+        return [self._timeline(prophecy, prophecy.fulfillments) for prophecy in prophecies]
+
+    @staticmethod
+    def _timeline(
+        prophecy: ProphecyText, fulfillments: List[ProphecyFulfillment]
+    ) -> Dict[str, Any]:
+        """Timeline analysis from a prophecy and its fulfillments (with events loaded)."""
         if not fulfillments:
             return {
-                "prophecy_id": prophecy_id,
+                "prophecy_id": prophecy.id,
                 "reference": prophecy.reference,
                 "year_declared": prophecy.year_declared,
                 "total_fulfillments": 0,
@@ -360,11 +435,7 @@ class ProphecyLibrary:
         fulfillment_types = {}
 
         for fulfillment in fulfillments:
-            event = (
-                self.db.query(ChronologyEvent)
-                .filter(ChronologyEvent.id == fulfillment.event_id)
-                .first()
-            )
+            event = fulfillment.event
 
             if event:
                 events.append(
@@ -393,7 +464,7 @@ class ProphecyLibrary:
                 years_to_fulfillment = first_fulfillment_year - prophecy.year_declared
 
         return {
-            "prophecy_id": prophecy_id,
+            "prophecy_id": prophecy.id,
             "reference": prophecy.reference,
             "year_declared": prophecy.year_declared,
             "total_fulfillments": len(events),
@@ -403,54 +474,157 @@ class ProphecyLibrary:
         }
 
     def detect_fulfillment_candidates(
-        self, prophecy_id: int, confidence_threshold: float = 0.5
-    ) -> List[ChronologyEvent]:
+        self, prophecy_id: int, confidence_threshold: float = 0.5, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Detect potential events that might fulfill a prophecy based on keywords.
 
+        Events are scored per prophecy element like rank_fulfillment_candidates,
+        keeping those that match at least `confidence_threshold` of the
+        prophecy's distinct keywords. No events are loaded except the returned
+        candidates.
+
         Args:
             prophecy_id: Prophecy ID
-            confidence_threshold: Minimum confidence score (0.0-1.0)
+            confidence_threshold: Minimum share of keywords matched (0.0-1.0)
+            limit: Maximum number of candidates (default: all)
 
         Returns:
-            List of candidate events
+            List of {"event", "confidence", "score", "element_scores",
+            "matched_keywords"} dictionaries, highest score first
         """
         prophecy = self.get_prophecy_by_id(prophecy_id)
         if not prophecy or not prophecy.elements:
             return []
 
-        # Extract keywords from all prophecy elements
-        keywords = set()
-        for element in prophecy.elements:
-            keywords.update(element.get("keywords", []))
+        keywords, _ = prophecy_keywords(prophecy.elements)
+        required = math.ceil(confidence_threshold * len(keywords) - 1e-9)
+        scored = {
+            event_id: candidate
+            for event_id, candidate in score_prophecy(
+                SearchIndex(self.db), prophecy.elements
+            ).items()
+            if len(candidate["matched_keywords"]) >= required
+        }
+        return self._best_candidates(scored, limit)
 
-        # Search for events matching keywords in name or description
-        candidates = []
-        events = self.db.query(ChronologyEvent).all()
+    def rank_fulfillment_candidates(
+        self, prophecy_id: int, limit: Optional[int] = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank events against a prophecy by BM25, scored per prophecy element.
 
-        for event in events:
-            search_text = f"{event.name} {event.description or ''}".lower()
-            matches = sum(1 for kw in keywords if kw.lower() in search_text)
+        Each element's keywords are a query over the chronology search (BM25
+        with document lengths and IDF precomputed in the shared index, or
+        ts_rank over search_vector on PostgreSQL), so long descriptions are not
+        favoured and every element is scored separately. The prophecy score is
+        the sum of the element scores.
 
-            if matches > 0:
-                # Simple confidence: ratio of matched keywords
-                confidence = min(matches / len(keywords), 1.0)
+        Args:
+            prophecy_id: Prophecy ID
+            limit: Maximum number of candidates (default: 50; None for all)
+
+        Returns:
+            List of {"event", "score", "element_scores", "matched_keywords",
+            "confidence"} dictionaries, best first
+        """
+        prophecy = self.get_prophecy_by_id(prophecy_id)
+        if not prophecy or not prophecy.elements:
+            return []
+
+        return self._best_candidates(
+            score_prophecy(SearchIndex(self.db), prophecy.elements), limit
+        )
+
+    def _best_candidates(
+        self, scored: Dict[int, Dict[str, Any]], limit: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """The best `limit` of score_prophecy's candidates with their events loaded."""
+
+        def rank(event_id):
+            # Highest score first, then lowest event ID
+            return scored[event_id]["score"], -event_id
+
+        if limit is not None:
+            event_ids = heapq.nlargest(limit, scored, key=rank)
+        else:
+            event_ids = sorted(scored, key=rank, reverse=True)
+
+        events = {
+            event.id: event
+            for event in self.db.query(ChronologyEvent)
+            .filter(ChronologyEvent.id.in_(event_ids))
+            .all()
+        }
+        return [
+            {"event": events[event_id], **scored[event_id]}
+            for event_id in event_ids
+            if event_id in events
+        ]
+
+    def refresh_candidates(
+        self, prophecy_ids: Optional[List[int]] = None, event_ids: Optional[List[int]] = None
+    ) -> Dict[str, int]:
+        """
+        Re-score the stored fulfillment candidates of some prophecies and/or events.
+
+        Args:
+            prophecy_ids: Prophecies to re-score (default: all)
+            event_ids: Events to re-score (default: all)
 
-                if confidence >= confidence_threshold:
-                    candidates.append(
-                        {
-                            "event": event,
-                            "confidence": confidence,
-                            "matched_keywords": [
-                                kw for kw in keywords if kw.lower() in search_text
-                            ],
-                        }
-                    )
+        Returns:
+            Counts of deleted and inserted candidate rows
+        """
+        return refresh_candidates(self.db, prophecy_ids, event_ids)
 
-        # Sort by confidence descending
-        candidates.sort(key=lambda c: c["confidence"], reverse=True)
+    def get_candidates(
+        self,
+        prophecy_id: Optional[int] = None,
+        min_score: float = 0.0,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Page through stored fulfillment candidates, highest score first.
+
+        Args:
+            prophecy_id: Only this prophecy's candidates (default: all prophecies)
+            min_score: Minimum prophecy score (sum of the element scores)
+            limit: Page size
+            offset: Rows to skip
 
-        return candidates
+        Returns:
+            List of candidate dictionaries with their event's name and year
+        """
+        query = (
+            self.db.query(ProphecyCandidate, ChronologyEvent.name, ChronologyEvent.year_start)
+            .join(ChronologyEvent, ChronologyEvent.id == ProphecyCandidate.event_id)
+            .filter(ProphecyCandidate.score >= min_score)
+        )
+        if prophecy_id is not None:
+            query = query.filter(ProphecyCandidate.prophecy_id == prophecy_id)
+
+        rows = (
+            query.order_by(
+                ProphecyCandidate.score.desc(),
+                ProphecyCandidate.prophecy_id,
+                ProphecyCandidate.event_id,
+            )
+            .offset(offset)
+            .limit(limit)
+        )
+        return [
+            {
+                "prophecy_id": candidate.prophecy_id,
+                "event_id": candidate.event_id,
+                "event_name": name,
+                "event_year": year_start,
+                "score": candidate.score,
+                "matched_keywords": candidate.matched_keywords,
+                "element_scores": candidate.element_scores,
+            }
+            for candidate, name, year_start in rows
+        ]
 
     def seed_core_prophecies(self) -> Dict[str, Any]:
         """
@@ -462,6 +636,7 @@ class ProphecyLibrary:
         """
         seeded = []
         skipped = []
+        created = []
 
         for prophecy_key, prophecy_data in self.CORE_PROPHECIES.items():
             # Check if prophecy already exists
@@ -484,8 +659,12 @@ class ProphecyLibrary:
 
             self.db.add(prophecy)
             seeded.append(prophecy_data["reference"])
+            created.append(prophecy)
 
         self.db.commit()
+        invalidate_prophetic_status(self.db)
+        if created:
+            self.refresh_candidates(prophecy_ids=[prophecy.id for prophecy in created])
 
         return {
             "total_prophecies": len(self.CORE_PROPHECIES),
@@ -0,0 +1,167 @@
+"""
+Prophetic Status: complete/partial/pending classification of every prophecy in SQL.
+
+One statement aggregates prophecy_fulfillments per prophecy with conditional
+counts per fulfillment type, left-joins the result to prophecy_texts and
+classifies each prophecy with a CASE expression:
+
+    pending   no fulfillments linked
+    partial   a pending fulfillment, or partial ones without a complete one
+    complete  a complete fulfillment and no pending one
+
+Prophecies whose fulfillments are only repeated, conditional or symbolic are
+counted in the total but in none of the three classes. The result is cached per
+database and recomputed when a fingerprint of prophecy_texts and
+prophecy_fulfillments changes, including writes from other processes.
+"""
+
+import copy
+import threading
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.prophecy import FulfillmentType, ProphecyFulfillment, ProphecyText
+
+
+def status_version(db: Session) -> Tuple[int, ...]:
+    """
+    Cheap fingerprint of prophecies and fulfillments: (row count, highest ID) of each.
+
+    Also sums the fulfillment type codes, so re-typing a fulfillment is noticed.
+    """
+    type_code = case(
+        *(
+            (ProphecyFulfillment.fulfillment_type == fulfillment_type, code)
+            for code, fulfillment_type in enumerate(FulfillmentType)
+        ),
+        else_=0,
+    )
+    row = db.execute(
+        select(
+            select(func.count(ProphecyText.id)).scalar_subquery(),
+            select(func.coalesce(func.max(ProphecyText.id), 0)).scalar_subquery(),
+            select(func.count(ProphecyFulfillment.id)).scalar_subquery(),
+            select(func.coalesce(func.max(ProphecyFulfillment.id), 0)).scalar_subquery(),
+            select(func.coalesce(func.sum(type_code), 0)).scalar_subquery(),
+        )
+    ).one()
+    return tuple(row)
+
+
+def compute_prophetic_status(db: Session) -> Dict[str, Any]:
+    """
+    Classify every prophecy by the fulfillments linked to it.
+
+    Returns:
+        Dictionary with total/complete/partial/pending counts and the pending and
+        partial prophecies
+    """
+    fulfillment_type = ProphecyFulfillment.fulfillment_type
+    counts = (
+        select(
+            ProphecyFulfillment.prophecy_id,
+            func.count().label("total"),
+            *[
+                func.sum(case((fulfillment_type == t, 1), else_=0)).label(t.value)
+                for t in FulfillmentType
+            ],
+        )
+        .group_by(ProphecyFulfillment.prophecy_id)
+        .subquery()
+    )
+
+    complete = counts.c[FulfillmentType.COMPLETE.value]
+    partial = counts.c[FulfillmentType.PARTIAL.value]
+    pending = counts.c[FulfillmentType.PENDING.value]
+    status = case(
+        (counts.c.total.is_(None), literal("pending")),
+        (or_(pending > 0, (partial > 0) & (complete == 0)), literal("partial")),
+        (complete > 0, literal("complete")),
+        else_=None,
+    ).label("status")
+
+    rows = (
+        db.query(
+            ProphecyText.id,
+            ProphecyText.reference,
+            ProphecyText.prophecy_type,
+            ProphecyText.year_declared,
+            ProphecyText.elements,
+            status,
+            counts.c.total,
+            *[counts.c[t.value] for t in FulfillmentType],
+        )
+        .outerjoin(counts, counts.c.prophecy_id == ProphecyText.id)
+        .order_by(ProphecyText.id)
+    )
+
+    summary: Dict[str, Any] = {
+        "total_prophecies": 0,
+        "complete": 0,
+        "partial": 0,
+        "pending": 0,
+        "pending_prophecies": [],
+        "partial_prophecies": [],
+    }
+    for row in rows:
+        summary["total_prophecies"] += 1
+        if row.status is None:
+            continue
+        summary[row.status] += 1
+
+        if row.status == "pending":
+            summary["pending_prophecies"].append(
+                {
+                    "id": row.id,
+                    "reference": row.reference,
+                    "prophecy_type": row.prophecy_type,
+                    "year_declared": row.year_declared,
+                    "elements": row.elements,
+                }
+            )
+        elif row.status == "partial":
+            summary["partial_prophecies"].append(
+                {
+                    "id": row.id,
+                    "reference": row.reference,
+                    "fulfillments": row.total,
+                    "types": [
+                        t.value for t in FulfillmentType for _ in range(row._mapping[t.value])
+                    ],
+                }
+            )
+
+    return summary
+
+
+# Process-wide cache: database URL -> (status_version, status summary)
+_cache: Dict[str, Tuple[Tuple[int, ...], Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def get_prophetic_status(db: Session) -> Dict[str, Any]:
+    """
+    Prophetic status summary, recomputed only when prophecies or fulfillments change.
+
+    Returns a copy, so callers may modify it without corrupting the cache.
+    """
+    key = str(db.get_bind().url)
+    version = status_version(db)
+    cached = _cache.get(key)
+
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _cache.get(key)
+            if cached is None or cached[0] != version:
+                cached = (version, compute_prophetic_status(db))
+                _cache[key] = cached
+
+    return copy.deepcopy(cached[1])
+
+
+def invalidate_prophetic_status(db: Session) -> None:
+    """Drop the cached summary for this database; it is recomputed on next use."""
+    with _lock:
+        _cache.pop(str(db.get_bind().url), None)
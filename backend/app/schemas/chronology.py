@@ -3,7 +3,7 @@ Pydantic schemas for chronology API requests and responses.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from app.models.chronology import ChronologyEra, EventType
@@ -49,3 +49,128 @@ class TimelineSummaryResponse(BaseModel):
     era_distribution: Dict[str, int]
     type_distribution: Dict[str, int]
     year_range: Dict[str, Optional[int]]
+
+
+class BulkRowError(BaseModel):
+    """A single rejected row in a bulk insert."""
+
+    index: int = Field(..., description="Position of the row in the request body")
+    error: str
+
+
+class BulkInsertResponse(BaseModel):
+    """Schema for bulk event insert results."""
+
+    inserted: int
+    failed: int
+    event_ids: List[int]
+    errors: List[BulkRowError]
+
+
+class ContemporaneityResponse(BaseModel):
+    """Schema for all-pairs contemporaneity results."""
+
+    window_years: int
+    total_events: int
+    total_pairs: int
+    event_ids: List[int] = Field(..., description="Events in chronological order (matrix rows)")
+    type_cooccurrence: Dict[str, Dict[str, int]] = Field(
+        ..., description="Pair counts between event types, e.g. religious x political"
+    )
+    indptr: Optional[List[int]] = Field(
+        None, description="CSR row pointer: partners of row i are indices[indptr[i]:indptr[i+1]]"
+    )
+    indices: Optional[List[int]] = Field(None, description="CSR column positions (all > row)")
+
+
+class DistanceMatrixRequest(BaseModel):
+    """Schema for pairwise temporal distance requests."""
+
+    event_ids: Optional[List[int]] = Field(
+        None, description="Row events; if omitted the filters select them"
+    )
+    to_event_ids: Optional[List[int]] = Field(
+        None, description="Column events; defaults to the row events"
+    )
+    year_start: Optional[int] = Field(None, description="Start year filter (negative for BC)")
+    year_end: Optional[int] = Field(None, description="End year filter (negative for BC)")
+    era: Optional[ChronologyEra] = None
+    event_type: Optional[EventType] = None
+    target_years: Optional[int] = Field(
+        None, description="Report pairs whose distance can equal this many years"
+    )
+    tolerance: int = Field(0, ge=0, description="Slack in years when matching target_years")
+
+
+class DistanceMatch(BaseModel):
+    """A pair of events whose distance interval contains the target."""
+
+    from_event_id: int
+    to_event_id: int
+    nominal: int
+    min: int
+    max: int
+
+
+class DistanceMatrixResponse(BaseModel):
+    """Schema for pairwise temporal distances (target minus origin, in years)."""
+
+    event_ids: List[int] = Field(..., description="Matrix rows (origin events)")
+    to_event_ids: List[int] = Field(..., description="Matrix columns (target events)")
+    missing_ids: List[int] = Field(..., description="Requested IDs that do not exist")
+    nominal: List[List[int]] = Field(..., description="Distances between nominal start years")
+    min: List[List[int]] = Field(..., description="Smallest distance allowed by uncertainty")
+    max: List[List[int]] = Field(..., description="Largest distance allowed by uncertainty")
+    target_matches: Optional[List[DistanceMatch]] = None
+
+
+class DensityBin(BaseModel):
+    """Event counts for one timeline bin."""
+
+    start: int
+    end: int
+    count: int
+    eras: Dict[str, int]
+    types: Dict[str, int]
+
+
+class DensityResponse(BaseModel):
+    """Schema for timeline density histograms."""
+
+    resolution: str = Field(..., description="year, decade, century or millennium")
+    bin_years: int
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    total_events: int
+    raw_events: bool = Field(
+        ..., description="Few enough events in range to fetch them individually instead"
+    )
+    bins: List[DensityBin] = Field(..., description="Non-empty bins in chronological order")
+
+
+class ClassificationBatch(BaseModel):
+    """The most recent background classification batch."""
+
+    events: int
+    duration_seconds: float
+    max_lag_seconds: float = Field(..., description="Time from commit to classification")
+
+
+class ClassificationStatus(BaseModel):
+    """Schema for the background classification worker's status."""
+
+    running: bool
+    queue_depth: int = Field(..., description="Events waiting to be classified")
+    prophecies_queued: int = Field(..., description="New prophecies waiting to be scored")
+    max_queue: int
+    lag_seconds: float = Field(..., description="Age of the oldest queued event")
+    enqueued: int
+    dropped: int = Field(..., description="Events not queued because the queue was full")
+    processed: int
+    batches: int
+    failed_batches: int
+    patterns_linked: int
+    prophecy_candidates: int
+    prophecies_scored: int
+    last_batch: Optional[ClassificationBatch] = None
+    last_error: Optional[str] = None
@@ -4,5 +4,6 @@ Forecasts future scenarios based on historical patterns and current indicators.
 """
 
 from .engine import SimulationEngine
+from .indicators import IndicatorSnapshot
 
-__all__ = ["SimulationEngine"]
+__all__ = ["SimulationEngine", "IndicatorSnapshot"]
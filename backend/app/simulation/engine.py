@@ -3,16 +3,43 @@ Simulation Engine - Core scenario modeling and forecasting logic.
 Projects future trajectories based on historical patterns and current indicators.
 """
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Iterator, Optional, Any, Tuple
 from datetime import datetime
+import secrets
 import statistics
+import uuid
 
-from app.models.simulation import WorldIndicator, SimulationScenario
-from app.models.chronology import ChronologyEvent, Pattern
+from app.chronology.analytics import ERAS
+from app.chronology.search import SearchIndex
+from app.chronology.snapshot import get_chronology_snapshot
+from app.models.simulation import SimulationScenario
+from app.models.chronology import Pattern
 from app.models.prophecy import ProphecyText, ProphecyFulfillment
 from app.patterns.library import PatternLibrary
+from app.patterns.recurrence import pattern_statistics
 from app.prophecy.library import ProphecyLibrary
+from app.simulation.indicators import IndicatorSnapshot
+from app.simulation.montecarlo import (
+    fit_intervals,
+    occurrence_intervals,
+    simulate_next_occurrences,
+    summarize,
+)
+from app.simulation.sweep import ScenarioSweep, evaluate_sweep, expand_grid
+
+
+def pattern_data(pattern: Pattern) -> Dict[str, Any]:
+    """The fields of a pattern that scenario evaluation reads, as a picklable dictionary."""
+    return {
+        "id": pattern.id,
+        "name": pattern.name,
+        "pattern_type": pattern.pattern_type,
+        "preconditions": pattern.preconditions or [],
+        "outcomes": pattern.outcomes or [],
+        "typical_duration_years": pattern.typical_duration_years,
+    }
 
 
 class SimulationEngine:
@@ -34,23 +61,23 @@ class SimulationEngine:
         self.prophecy_library = ProphecyLibrary(db)
 
     def assess_current_indicators(
-        self, indicator_category: Optional[str] = None
+        self,
+        indicator_category: Optional[str] = None,
+        snapshot: Optional[IndicatorSnapshot] = None,
     ) -> Dict[str, Any]:
         """
         Assess current world indicators and their implications.
 
         Args:
             indicator_category: Filter by category (political, economic, military, social, religious)
+            snapshot: Indicators to assess (default: loaded now)
 
         Returns:
             Dictionary with indicator analysis
         """
-        query = self.db.query(WorldIndicator)
-
-        if indicator_category:
-            query = query.filter(WorldIndicator.category == indicator_category)
-
-        indicators = query.order_by(WorldIndicator.timestamp.desc()).all()
+        if snapshot is None:
+            snapshot = IndicatorSnapshot.load(self.db)
+        indicators = snapshot.in_category(indicator_category or None)
 
         if not indicators:
             return {
@@ -63,15 +90,17 @@ class SimulationEngine:
         # Group by category
         by_category = {}
         for indicator in indicators:
-            category = indicator.category
+            category = indicator["category"]
             if category not in by_category:
                 by_category[category] = []
             by_category[category].append(
                 {
-                    "name": indicator.indicator_name,
-                    "value": indicator.value,
-                    "description": indicator.description,
-                    "timestamp": indicator.timestamp.isoformat() if indicator.timestamp else None,
+                    "name": indicator["name"],
+                    "value": indicator["value"],
+                    "description": indicator["description"],
+                    "timestamp": indicator["timestamp"].isoformat()
+                    if indicator["timestamp"]
+                    else None,
                 }
             )
 
@@ -79,17 +108,20 @@ class SimulationEngine:
             "total_indicators": len(indicators),
             "categories": {cat: len(inds) for cat, inds in by_category.items()},
             "by_category": by_category,
-            "latest_timestamp": indicators[0].timestamp.isoformat()
-            if indicators[0].timestamp
+            "latest_timestamp": indicators[0]["timestamp"].isoformat()
+            if indicators[0]["timestamp"]
             else None,
         }
 
-    def detect_pattern_preconditions(self, pattern_id: int) -> Dict[str, Any]:
+    def detect_pattern_preconditions(
+        self, pattern_id: int, snapshot: Optional[IndicatorSnapshot] = None
+    ) -> Dict[str, Any]:
         """
         Check if current indicators match pattern preconditions.
 
         Args:
             pattern_id: Pattern ID to check
+            snapshot: Indicators to match against (default: loaded now)
 
         Returns:
             Dictionary with precondition matching analysis
@@ -98,41 +130,38 @@ class SimulationEngine:
         if not pattern:
             return {"error": "Pattern not found"}
 
-        # Get current indicators
-        indicators = self.db.query(WorldIndicator).order_by(WorldIndicator.timestamp.desc()).all()
+        if snapshot is None:
+            snapshot = IndicatorSnapshot.load(self.db)
+        return self._match_preconditions(pattern_data(pattern), snapshot)
 
-        if not indicators:
+    @classmethod
+    def _match_preconditions(
+        cls, pattern: Dict[str, Any], snapshot: IndicatorSnapshot
+    ) -> Dict[str, Any]:
+        """Match a pattern's preconditions (see pattern_data) against an indicator snapshot."""
+        pattern_id = pattern["id"]
+
+        if not len(snapshot):
             return {
                 "pattern_id": pattern_id,
-                "pattern_name": pattern.name,
+                "pattern_name": pattern["name"],
                 "match_score": 0.0,
                 "matched_preconditions": [],
-                "missing_preconditions": pattern.preconditions or [],
+                "missing_preconditions": pattern["preconditions"],
                 "message": "No current indicators available for analysis",
             }
 
-        # Extract keywords from indicators
-        indicator_keywords = set()
-        for ind in indicators:
-            if ind.indicator_name:
-                indicator_keywords.update(ind.indicator_name.lower().split())
-            if ind.description:
-                indicator_keywords.update(ind.description.lower().split())
-            if ind.extra_data and isinstance(ind.extra_data, dict):
-                for key, val in ind.extra_data.items():
-                    if isinstance(val, str):
-                        indicator_keywords.update(val.lower().split())
-
-        # Match preconditions
-        preconditions = pattern.preconditions or []
+        # Match preconditions against the snapshot's indicator terms
+        preconditions = pattern["preconditions"]
         matched = []
         missing = []
+        evidence = {}
 
         for precondition in preconditions:
-            precondition_lower = precondition.lower()
-            # Simple keyword matching
-            if any(kw in precondition_lower for kw in indicator_keywords):
+            precondition_match = snapshot.match(precondition)
+            if precondition_match["matched"]:
                 matched.append(precondition)
+                evidence[precondition] = precondition_match["evidence"]
             else:
                 missing.append(precondition)
 
@@ -140,14 +169,15 @@ class SimulationEngine:
 
         return {
             "pattern_id": pattern_id,
-            "pattern_name": pattern.name,
-            "pattern_type": pattern.pattern_type,
+            "pattern_name": pattern["name"],
+            "pattern_type": pattern["pattern_type"],
             "total_preconditions": len(preconditions),
             "matched_preconditions": matched,
             "missing_preconditions": missing,
+            "evidence": evidence,
             "match_score": match_score,
-            "risk_level": self._calculate_risk_level(match_score),
-            "typical_duration_years": pattern.typical_duration_years,
+            "risk_level": cls._calculate_risk_level(match_score),
+            "typical_duration_years": pattern["typical_duration_years"],
         }
 
     def find_historical_analogs(self, current_conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -166,28 +196,34 @@ class SimulationEngine:
         if not keywords and not categories:
             return []
 
-        # Search for events matching keywords
-        events = self.db.query(ChronologyEvent).all()
-        analogs = []
+        # Rank events by how many keywords they match, then by search score
+        hits = SearchIndex(self.db).search(keywords, prefix=True)
+        hits.sort(key=lambda hit: (-len(hit["matched_terms"]), -hit["score"]))
+        hits = hits[:10]
 
-        for event in events:
-            search_text = f"{event.name} {event.description or ''}".lower()
-            matched_keywords = [kw for kw in keywords if kw.lower() in search_text]
+        # Event fields come from the mapped snapshot rather than ORM rows
+        snapshot = get_chronology_snapshot(self.db)
+        positions = snapshot.positions_of([hit["event_id"] for hit in hits])
+        analogs = []
 
-            if matched_keywords:
-                similarity = len(matched_keywords) / len(keywords) if keywords else 0.0
+        for hit in hits:
+            position = positions.get(hit["event_id"])
+            if position is None:
+                continue
+            matched_keywords = hit["matched_terms"]
+            similarity = len(matched_keywords) / len(keywords) if keywords else 0.0
 
-                analogs.append(
-                    {
-                        "event_id": event.id,
-                        "name": event.name,
-                        "year_start": event.year_start,
-                        "era": event.era.value if event.era else None,
-                        "description": event.description,
-                        "similarity_score": similarity,
-                        "matched_keywords": matched_keywords,
-                    }
-                )
+            analogs.append(
+                {
+                    "event_id": hit["event_id"],
+                    "name": snapshot.name(position),
+                    "year_start": int(snapshot.columns.year_start[position]),
+                    "era": ERAS[snapshot.columns.era_codes[position]].value,
+                    "description": snapshot.description(position),
+                    "similarity_score": similarity,
+                    "matched_keywords": matched_keywords,
+                }
+            )
 
         # Sort by similarity descending
         analogs.sort(key=lambda a: a["similarity_score"], reverse=True)
@@ -211,8 +247,8 @@ class SimulationEngine:
         if not pattern:
             return {"error": "Pattern not found"}
 
-        # Analyze historical instances
-        analysis = self.pattern_library.analyze_pattern_recurrence(pattern_id)
+        # Historical recurrence statistics (cached for all patterns)
+        analysis = pattern_statistics(self.db, pattern_id)
 
         if analysis["total_instances"] == 0:
             return {
@@ -223,7 +259,7 @@ class SimulationEngine:
             }
 
         # Calculate projection
-        avg_interval = analysis.get("average_interval_years", pattern.typical_duration_years or 100)
+        avg_interval = analysis["average_interval_years"] or pattern.typical_duration_years or 100
         last_occurrence = analysis.get("most_recent_occurrence")
 
         if last_occurrence:
@@ -265,6 +301,63 @@ class SimulationEngine:
                 "confidence": 0.0,
             }
 
+    def simulate_pattern_trajectory(
+        self,
+        pattern_id: int,
+        current_year: int = 2026,
+        distribution: str = "empirical",
+        samples: int = 100000,
+        horizon_years: int = 100,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Project the next occurrence of a pattern by Monte Carlo simulation.
+
+        Args:
+            pattern_id: Pattern ID to project
+            current_year: Starting year for projection
+            distribution: Interval distribution (empirical, lognormal or gamma)
+            samples: Number of simulated next occurrences
+            horizon_years: Years covered by the cumulative probability curve
+            seed: Random seed (default: a fresh one, returned for reproduction)
+
+        Returns:
+            Dictionary with the fitted distribution, percentiles of the next
+            occurrence year, cumulative probability per future year and a
+            convergence diagnostic
+        """
+        pattern = self.pattern_library.get_pattern_by_id(pattern_id)
+        if not pattern:
+            return {"error": "Pattern not found"}
+
+        intervals, last_occurrence = occurrence_intervals(self.db, pattern_id)
+        parameters = fit_intervals(intervals, distribution)
+        if parameters is None:
+            return {
+                "pattern_id": pattern_id,
+                "pattern_name": pattern.name,
+                "projection": "Insufficient historical data for projection",
+                "confidence": 0.0,
+            }
+
+        if seed is None:
+            seed = secrets.randbits(32)
+        chunks = simulate_next_occurrences(
+            distribution, parameters, intervals, last_occurrence, current_year, samples, seed
+        )
+
+        return {
+            "pattern_id": pattern_id,
+            "pattern_name": pattern.name,
+            "pattern_type": pattern.pattern_type,
+            "distribution": distribution,
+            "parameters": parameters,
+            "observed_intervals": len(intervals),
+            "last_occurrence": last_occurrence,
+            "seed": seed,
+            **summarize(chunks, current_year, horizon_years),
+        }
+
     def create_scenario(
         self,
         name: str,
@@ -272,6 +365,7 @@ class SimulationEngine:
         indicator_ids: Optional[List[int]] = None,
         pattern_ids: Optional[List[int]] = None,
         assumptions: Optional[Dict[str, Any]] = None,
+        snapshot: Optional[IndicatorSnapshot] = None,
     ) -> SimulationScenario:
         """
         Create a new simulation scenario.
@@ -282,23 +376,162 @@ class SimulationEngine:
             indicator_ids: List of indicator IDs to include
             pattern_ids: List of pattern IDs to consider
             assumptions: Additional assumptions
+            snapshot: Indicators to draw on (default: loaded now if needed)
 
         Returns:
             Created SimulationScenario instance
         """
+        if snapshot is None and (indicator_ids or pattern_ids):
+            snapshot = IndicatorSnapshot.load(self.db)
+
+        # Patterns are loaded with one query
+        patterns: Dict[int, Dict[str, Any]] = {}
+        if pattern_ids:
+            patterns = {
+                pattern.id: pattern_data(pattern)
+                for pattern in self.db.query(Pattern).filter(Pattern.id.in_(pattern_ids))
+            }
+
+        scenario = SimulationScenario(
+            name=name,
+            description=description,
+            assumptions=assumptions or {},
+            created_at=datetime.utcnow(),
+            **self.evaluate_scenario(snapshot, patterns, indicator_ids, pattern_ids),
+        )
+
+        self.db.add(scenario)
+        self.db.commit()
+        self.db.refresh(scenario)
+
+        return scenario
+
+    def sweep_scenarios(
+        self, name: str, description: str, grid: Dict[str, Optional[List[Any]]]
+    ) -> ScenarioSweep:
+        """
+        Create one scenario per combination of a parameter grid.
+
+        The grid is validated and the indicators and patterns are read (two
+        queries) before this returns; the returned iterator then evaluates the
+        scenarios (in worker processes for large sweeps), bulk-inserts each chunk
+        as it completes and yields the inserted scenarios in completion order.
+        The sweep is committed once the last scenario has been yielded; if it
+        fails or is closed early, it is rolled back and none are kept.
+
+        Args:
+            name: Name prefix for the scenarios
+            description: Description shared by the scenarios
+            grid: indicator_ids, pattern_ids and assumptions alternatives (see
+                  simulation.sweep.expand_grid)
+
+        Returns:
+            ScenarioSweep iterating over scenario dictionaries; parameters holds
+            the sweep ID, the combination's index and its indicator and pattern IDs
+
+        Raises:
+            ValueError: If the grid is invalid or too large
+        """
+        combinations = expand_grid(grid)
+        snapshot = IndicatorSnapshot.load(self.db)
+
+        pattern_ids = {
+            pattern_id
+            for combination in combinations
+            for pattern_id in combination["pattern_ids"] or []
+        }
+        patterns: Dict[int, Dict[str, Any]] = {}
+        if pattern_ids:
+            patterns = {
+                pattern.id: pattern_data(pattern)
+                for pattern in self.db.query(Pattern).filter(Pattern.id.in_(pattern_ids))
+            }
+
+        sweep_id = uuid.uuid4().hex
+        return ScenarioSweep(
+            sweep_id,
+            len(combinations),
+            self._run_sweep(sweep_id, name, description, combinations, snapshot, patterns),
+        )
+
+    def _run_sweep(
+        self,
+        sweep_id: str,
+        name: str,
+        description: str,
+        combinations: List[Dict[str, Any]],
+        snapshot: IndicatorSnapshot,
+        patterns: Dict[int, Dict[str, Any]],
+    ) -> Iterator[Dict[str, Any]]:
+        table = SimulationScenario.__table__
+        statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+
+        try:
+            for chunk in evaluate_sweep(sweep_id, snapshot, patterns, combinations):
+                created_at = datetime.utcnow()
+                rows = []
+                for index, evaluation in chunk:
+                    combination = combinations[index]
+                    rows.append(
+                        {
+                            "name": f"{name} [{index + 1}/{len(combinations)}]",
+                            "description": description,
+                            "assumptions": combination["assumptions"] or {},
+                            "created_at": created_at,
+                            "parameters": {
+                                "sweep_id": sweep_id,
+                                "index": index,
+                                "indicator_ids": combination["indicator_ids"],
+                                "pattern_ids": combination["pattern_ids"],
+                            },
+                            **evaluation,
+                        }
+                    )
+
+                ids = self.db.execute(statement, rows).scalars().all()
+                for scenario_id, row in zip(ids, rows):
+                    yield {"id": scenario_id, **row}
+
+            self.db.commit()
+        except BaseException:
+            # Includes GeneratorExit when the consumer stops early
+            self.db.rollback()
+            raise
+
+    @classmethod
+    def evaluate_scenario(
+        cls,
+        snapshot: Optional[IndicatorSnapshot],
+        patterns: Dict[int, Dict[str, Any]],
+        indicator_ids: Optional[List[int]] = None,
+        pattern_ids: Optional[List[int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a scenario from already-loaded data, without a session.
+
+        Args:
+            snapshot: Indicators (may be None if no indicators or patterns are given)
+            patterns: pattern_data dictionaries by ID; IDs missing here are skipped
+            indicator_ids: List of indicator IDs to include
+            pattern_ids: List of pattern IDs to consider
+
+        Returns:
+            Dictionary with input_indicators, matched_patterns, trajectory and
+            confidence_score
+        """
         # Gather input indicators
         input_indicators = []
         if indicator_ids:
             for ind_id in indicator_ids:
-                indicator = self.db.query(WorldIndicator).filter(WorldIndicator.id == ind_id).first()
+                indicator = snapshot.by_id.get(ind_id)
                 if indicator:
                     input_indicators.append(
                         {
-                            "id": indicator.id,
-                            "name": indicator.indicator_name,
-                            "category": indicator.category,
-                            "value": indicator.value,
-                            "description": indicator.description,
+                            "id": indicator["id"],
+                            "name": indicator["name"],
+                            "category": indicator["category"],
+                            "value": indicator["value"],
+                            "description": indicator["description"],
                         }
                     )
 
@@ -306,33 +539,24 @@ class SimulationEngine:
         matched_patterns = []
         if pattern_ids:
             for pat_id in pattern_ids:
-                precondition_match = self.detect_pattern_preconditions(pat_id)
+                if pat_id not in patterns:
+                    continue
+                precondition_match = cls._match_preconditions(patterns[pat_id], snapshot)
                 if precondition_match.get("match_score", 0) > 0:
                     matched_patterns.append(precondition_match)
 
         # Generate trajectory
-        trajectory = self._generate_scenario_trajectory(matched_patterns)
+        trajectory = cls._generate_scenario_trajectory(matched_patterns, patterns)
 
         # Calculate confidence
-        confidence = self._calculate_scenario_confidence(matched_patterns, input_indicators)
+        confidence = cls._calculate_scenario_confidence(matched_patterns, input_indicators)
 
-        # Create scenario
-        scenario = SimulationScenario(
-            name=name,
-            description=description,
-            input_indicators=input_indicators,
-            assumptions=assumptions or {},
-            matched_patterns=matched_patterns,
-            trajectory=trajectory,
-            confidence_score=confidence,
-            created_at=datetime.utcnow(),
-        )
-
-        self.db.add(scenario)
-        self.db.commit()
-        self.db.refresh(scenario)
-
-        return scenario
+        return {
+            "input_indicators": input_indicators,
+            "matched_patterns": matched_patterns,
+            "trajectory": trajectory,
+            "confidence_score": confidence,
+        }
 
     def get_all_scenarios(self) -> List[SimulationScenario]:
         """Get all simulation scenarios."""
@@ -351,72 +575,35 @@ class SimulationEngine:
         Returns:
             Dictionary with prophetic analysis
         """
-        prophecies = self.prophecy_library.get_all_prophecies()
-
-        pending_count = 0
-        partial_count = 0
-        complete_count = 0
-
-        pending_prophecies = []
-        partial_prophecies = []
-
-        for prophecy in prophecies:
-            fulfillments = self.prophecy_library.get_fulfillments(prophecy.id)
-
-            if not fulfillments:
-                pending_count += 1
-                pending_prophecies.append(
-                    {
-                        "id": prophecy.id,
-                        "reference": prophecy.reference,
-                        "prophecy_type": prophecy.prophecy_type,
-                        "year_declared": prophecy.year_declared,
-                        "elements": prophecy.elements,
-                    }
-                )
-            else:
-                from app.models.prophecy import FulfillmentType
-
-                has_complete = any(f.fulfillment_type == FulfillmentType.COMPLETE for f in fulfillments)
-                has_partial = any(f.fulfillment_type == FulfillmentType.PARTIAL for f in fulfillments)
-                has_pending = any(f.fulfillment_type == FulfillmentType.PENDING for f in fulfillments)
-
-                if has_pending or (has_partial and not has_complete):
-                    partial_count += 1
-                    partial_prophecies.append(
-                        {
-                            "id": prophecy.id,
-                            "reference": prophecy.reference,
-                            "fulfillments": len(fulfillments),
-                            "types": [f.fulfillment_type.value for f in fulfillments],
-                        }
-                    )
-                elif has_complete:
-                    complete_count += 1
+        status = self.prophecy_library.prophetic_status()
 
         return {
-            "total_prophecies": len(prophecies),
-            "complete": complete_count,
-            "partial": partial_count,
-            "pending": pending_count,
-            "pending_prophecies": pending_prophecies,
-            "partial_prophecies": partial_prophecies,
+            **status,
             "eschatological_outlook": self._assess_eschatological_status(
-                pending_prophecies, partial_prophecies
+                status["pending_prophecies"], status["partial_prophecies"]
             ),
         }
 
-    def calculate_civilization_risk_score(self) -> Dict[str, Any]:
+    def calculate_civilization_risk_score(
+        self, snapshot: Optional[IndicatorSnapshot] = None
+    ) -> Dict[str, Any]:
         """
         Calculate overall civilization risk score based on pattern preconditions.
 
+        Every pattern is matched against one indicator snapshot, so the
+        assessment runs two queries however many patterns there are.
+
+        Args:
+            snapshot: Indicators to assess against (default: loaded now)
+
         Returns:
             Dictionary with risk assessment
         """
         patterns = self.pattern_library.get_all_patterns()
-        indicators = self.db.query(WorldIndicator).all()
+        if snapshot is None:
+            snapshot = IndicatorSnapshot.load(self.db)
 
-        if not indicators:
+        if not len(snapshot):
             return {
                 "overall_risk_score": 0.0,
                 "risk_level": self.RISK_LOW,
@@ -426,7 +613,7 @@ class SimulationEngine:
         pattern_risks = []
 
         for pattern in patterns:
-            precondition_match = self.detect_pattern_preconditions(pattern.id)
+            precondition_match = self._match_preconditions(pattern_data(pattern), snapshot)
             match_score = precondition_match.get("match_score", 0.0)
 
             if match_score > 0:
@@ -478,16 +665,17 @@ class SimulationEngine:
 
     # Private helper methods
 
-    def _calculate_risk_level(self, match_score: float) -> str:
+    @classmethod
+    def _calculate_risk_level(cls, match_score: float) -> str:
         """Convert match score to risk level."""
         if match_score >= 0.8:
-            return self.RISK_CRITICAL
+            return cls.RISK_CRITICAL
         elif match_score >= 0.6:
-            return self.RISK_HIGH
+            return cls.RISK_HIGH
         elif match_score >= 0.3:
-            return self.RISK_MODERATE
+            return cls.RISK_MODERATE
         else:
-            return self.RISK_LOW
+            return cls.RISK_LOW
 
     def _generate_trajectory_phases(
         self, pattern: Pattern, years_until: Optional[int]
@@ -532,8 +720,11 @@ class SimulationEngine:
 
         return phases
 
-    def _generate_scenario_trajectory(self, matched_patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate trajectory based on matched patterns."""
+    @staticmethod
+    def _generate_scenario_trajectory(
+        matched_patterns: List[Dict[str, Any]], patterns: Dict[int, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Generate trajectory based on matched patterns (already loaded, by ID)."""
         if not matched_patterns:
             return {"message": "No patterns matched - trajectory uncertain"}
 
@@ -541,9 +732,9 @@ class SimulationEngine:
         all_outcomes = []
         for pattern_match in matched_patterns:
             pattern_id = pattern_match.get("pattern_id")
-            pattern = self.pattern_library.get_pattern_by_id(pattern_id)
-            if pattern and pattern.outcomes:
-                all_outcomes.extend(pattern.outcomes)
+            pattern = patterns.get(pattern_id)
+            if pattern and pattern["outcomes"]:
+                all_outcomes.extend(pattern["outcomes"])
 
         # Create timeline
         timeline = [
@@ -563,8 +754,9 @@ class SimulationEngine:
 
         return {"timeline": timeline, "projected_outcomes": list(set(all_outcomes))}
 
+    @staticmethod
     def _calculate_scenario_confidence(
-        self, matched_patterns: List[Dict[str, Any]], input_indicators: List[Dict[str, Any]]
+        matched_patterns: List[Dict[str, Any]], input_indicators: List[Dict[str, Any]]
     ) -> float:
         """Calculate confidence score for scenario."""
         if not matched_patterns:
@@ -0,0 +1,148 @@
+"""
+Indicator Snapshot: world indicators loaded once per computation.
+
+A snapshot reads every WorldIndicator in one query (newest first) and derives
+what the simulation engine needs from it: indicators grouped by category, the
+latest value of each indicator, and an inverted index of indicator terms.
+
+Pattern preconditions ("moral_relativism") and indicator text are reduced to
+the same stemmed, synonym-folded terms (patterns.text.canonical_terms). A
+precondition's coverage is the largest share of its terms that occur together
+in one indicator; preconditions of up to FULL_COVERAGE_MAX_TERMS terms need all
+of them, longer ones at least PRECONDITION_MIN_COVERAGE. Matching is a set
+intersection, and the matched terms and the indicators containing them explain
+each match. Matches are memoised, so patterns sharing preconditions are only
+matched once.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.models.simulation import WorldIndicator
+from app.patterns.text import canonical_terms
+
+# Share of a precondition's terms that must occur together in one indicator
+PRECONDITION_MIN_COVERAGE = 0.5
+
+# Preconditions with at most this many terms must be covered completely
+FULL_COVERAGE_MAX_TERMS = 2
+
+# Indicators cited per matched term
+EVIDENCE_PER_TERM = 5
+
+
+def indicator_terms(indicator: Dict[str, Any]) -> Set[str]:
+    """Terms of an indicator's name, description and string extra_data values."""
+    texts = [indicator["name"] or "", indicator["description"] or ""]
+    if indicator["extra_data"] and isinstance(indicator["extra_data"], dict):
+        texts.extend(val for val in indicator["extra_data"].values() if isinstance(val, str))
+    return set(canonical_terms(" ".join(texts)))
+
+
+class IndicatorSnapshot:
+    """Read-only view of the world indicators at one point in time."""
+
+    def __init__(self, indicators: List[Dict[str, Any]]):
+        """
+        Build the snapshot.
+
+        Args:
+            indicators: Indicator dictionaries, newest first
+        """
+        self.indicators = indicators
+        self.by_id = {ind["id"]: ind for ind in indicators}
+
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for ind in indicators:
+            self.by_category.setdefault(ind["category"], []).append(ind)
+
+        # Newest value per indicator name
+        self.latest_values: Dict[str, Optional[float]] = {}
+        for ind in indicators:
+            self.latest_values.setdefault(ind["name"], ind["value"])
+
+        # term -> IDs of the indicators containing it, newest first
+        self.postings: Dict[str, List[int]] = {}
+        for ind in indicators:
+            for term in indicator_terms(ind):
+                self.postings.setdefault(term, []).append(ind["id"])
+
+        self._matches: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, db: Session) -> "IndicatorSnapshot":
+        """Read every indicator with one query."""
+        rows = db.query(
+            WorldIndicator.id,
+            WorldIndicator.indicator_name,
+            WorldIndicator.category,
+            WorldIndicator.value,
+            WorldIndicator.description,
+            WorldIndicator.timestamp,
+            WorldIndicator.extra_data,
+        ).order_by(WorldIndicator.timestamp.desc(), WorldIndicator.id.desc())
+        return cls(
+            [
+                {
+                    "id": row.id,
+                    "name": row.indicator_name,
+                    "category": row.category,
+                    "value": row.value,
+                    "description": row.description,
+                    "timestamp": row.timestamp,
+                    "extra_data": row.extra_data,
+                }
+                for row in rows
+            ]
+        )
+
+    def __len__(self) -> int:
+        return len(self.indicators)
+
+    @property
+    def latest_timestamp(self) -> Optional[datetime]:
+        return self.indicators[0]["timestamp"] if self.indicators else None
+
+    def in_category(self, category: Optional[str]) -> List[Dict[str, Any]]:
+        """Indicators of one category (all if None), newest first."""
+        if category is None:
+            return self.indicators
+        return self.by_category.get(category, [])
+
+    def match(self, precondition: str) -> Dict[str, Any]:
+        """
+        Match a precondition against the indicator terms (memoised).
+
+        Returns:
+            Dictionary with the precondition's terms, whether it matched, its
+            coverage (in the best single indicator) and evidence: matched
+            term -> names of the newest indicators containing it
+        """
+        result = self._matches.get(precondition)
+        if result is None:
+            terms = set(canonical_terms(precondition))
+            found = terms.intersection(self.postings)
+
+            # Terms of the precondition per indicator containing any of them
+            hits: Dict[int, int] = {}
+            for term in found:
+                for indicator_id in self.postings[term]:
+                    hits[indicator_id] = hits.get(indicator_id, 0) + 1
+            coverage = max(hits.values(), default=0) / len(terms) if terms else 0.0
+            required = 1.0 if len(terms) <= FULL_COVERAGE_MAX_TERMS else PRECONDITION_MIN_COVERAGE
+
+            result = self._matches[precondition] = {
+                "terms": sorted(terms),
+                "matched": bool(found) and coverage >= required,
+                "coverage": coverage,
+                "evidence": {
+                    term: [
+                        self.by_id[indicator_id]["name"]
+                        for indicator_id in self.postings[term][:EVIDENCE_PER_TERM]
+                    ]
+                    for term in sorted(found)
+                },
+            }
+        return result
@@ -0,0 +1,224 @@
+"""
+Monte Carlo trajectories: sampled next occurrences of a pattern.
+
+The intervals between a pattern's successive occurrences (distinct years of its
+linked events) are fitted with one of three distributions:
+
+    empirical  bootstrap resampling of the observed intervals
+    lognormal  maximum likelihood (mean and deviation of log intervals)
+    gamma      maximum likelihood, shape from Minka's closed-form approximation
+
+Each sample treats the pattern as a renewal process: intervals are drawn from
+the last occurrence onwards until one lands after the current year, which is
+that sample's next occurrence. When the last occurrence lies many mean
+intervals in the past that walk would take thousands of rounds, and by the
+renewal theorem the process has long since forgotten where it started; the
+time from the current year to the next occurrence is then drawn directly from
+the equilibrium (forward-recurrence) distribution, U x L with L a length-biased
+interval and U uniform on (0, 1). Samples are drawn in fixed-size chunks, each
+with its own child of one SeedSequence, so a seed reproduces the same ensemble
+whether the chunks run in this process or across the shared simulation pool; the spread of
+the chunk medians doubles as the convergence diagnostic.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.chronology import ChronologyEvent, EventPattern
+from app.simulation.pool import get_simulation_pool
+
+DISTRIBUTIONS = ("empirical", "lognormal", "gamma")
+
+# Samples per independently seeded chunk (and per convergence batch)
+CHUNK_SIZE = 10000
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Gap since the last occurrence, in mean intervals, from which next occurrences
+# are drawn from the equilibrium distribution instead of walking the renewals
+EQUILIBRIUM_GAP_INTERVALS = 20
+
+# Standard error (years) of the median below which an ensemble counts as converged
+CONVERGENCE_TOLERANCE_YEARS = 1.0
+
+
+def occurrence_intervals(db: Session, pattern_id: int) -> Tuple[np.ndarray, Optional[int]]:
+    """
+    Years between a pattern's successive occurrences.
+
+    Returns:
+        (positive intervals in chronological order, last occurrence year or None)
+    """
+    years = np.unique(
+        np.array(
+            db.query(ChronologyEvent.year_start)
+            .join(EventPattern, EventPattern.event_id == ChronologyEvent.id)
+            .filter(EventPattern.pattern_id == pattern_id)
+            .all(),
+            dtype=np.float64,
+        )
+    )
+    if not len(years):
+        return years, None
+    return np.diff(years), int(years[-1])
+
+
+def fit_intervals(intervals: np.ndarray, distribution: str) -> Optional[Dict[str, float]]:
+    """
+    Fit an interval distribution.
+
+    Returns:
+        Distribution parameters, or None if there are too few intervals (one for
+        the empirical distribution, two distinct ones for the parametric fits)
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+    if distribution == "empirical":
+        return {} if len(intervals) else None
+
+    logs = np.log(intervals)
+    if len(intervals) < 2 or np.ptp(logs) == 0:
+        return None
+    if distribution == "lognormal":
+        return {"mu": float(logs.mean()), "sigma": float(logs.std())}
+
+    # Gamma: s = ln(mean) - mean(ln x) > 0 determines the shape
+    mean = float(intervals.mean())
+    s = math.log(mean) - float(logs.mean())
+    shape = (3 - s + math.sqrt((s - 3) ** 2 + 24 * s)) / (12 * s)
+    return {"shape": shape, "scale": mean / shape}
+
+
+def _draw(
+    rng: np.random.Generator,
+    distribution: str,
+    parameters: Dict[str, float],
+    intervals: np.ndarray,
+    size: int,
+) -> np.ndarray:
+    if distribution == "empirical":
+        return rng.choice(intervals, size)
+    if distribution == "lognormal":
+        return rng.lognormal(parameters["mu"], parameters["sigma"], size)
+    return rng.gamma(parameters["shape"], parameters["scale"], size)
+
+
+def _mean_interval(
+    distribution: str, parameters: Dict[str, float], intervals: np.ndarray
+) -> float:
+    if distribution == "empirical":
+        return float(intervals.mean())
+    if distribution == "lognormal":
+        return math.exp(parameters["mu"] + parameters["sigma"] ** 2 / 2)
+    return parameters["shape"] * parameters["scale"]
+
+
+def _draw_length_biased(
+    rng: np.random.Generator,
+    distribution: str,
+    parameters: Dict[str, float],
+    intervals: np.ndarray,
+    size: int,
+) -> np.ndarray:
+    """Intervals weighted by their length (the interval that straddles a random time)."""
+    if distribution == "empirical":
+        return rng.choice(intervals, size, p=intervals / intervals.sum())
+    if distribution == "lognormal":
+        sigma = parameters["sigma"]
+        return rng.lognormal(parameters["mu"] + sigma**2, sigma, size)
+    return rng.gamma(parameters["shape"] + 1, parameters["scale"], size)
+
+
+def _simulate_chunk(
+    args: Tuple[str, Dict[str, float], np.ndarray, int, int, int, np.random.SeedSequence],
+) -> np.ndarray:
+    """Next-occurrence years for one chunk (module-level so process pools can run it)."""
+    distribution, parameters, intervals, last, current_year, size, seed = args
+    rng = np.random.default_rng(seed)
+    if current_year - last > EQUILIBRIUM_GAP_INTERVALS * _mean_interval(
+        distribution, parameters, intervals
+    ):
+        return current_year + (1 - rng.random(size)) * _draw_length_biased(
+            rng, distribution, parameters, intervals, size
+        )
+
+    years = last + _draw(rng, distribution, parameters, intervals, size)
+    pending = np.flatnonzero(years <= current_year)
+    while len(pending):
+        years[pending] += _draw(rng, distribution, parameters, intervals, len(pending))
+        pending = pending[years[pending] <= current_year]
+    return years
+
+
+def simulate_next_occurrences(
+    distribution: str,
+    parameters: Dict[str, float],
+    intervals: np.ndarray,
+    last_occurrence: int,
+    current_year: int,
+    samples: int,
+    seed: int,
+) -> List[np.ndarray]:
+    """
+    Sample next-occurrence years.
+
+    Ensembles of at least settings.MONTE_CARLO_POOL_MIN_SAMPLES are spread over
+    the shared simulation pool when it has been started; the result only
+    depends on the seed.
+
+    Returns:
+        One array of sampled years per chunk
+    """
+    sizes = [CHUNK_SIZE] * (samples // CHUNK_SIZE)
+    if samples % CHUNK_SIZE:
+        sizes.append(samples % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        (distribution, parameters, intervals, last_occurrence, current_year, size, child)
+        for size, child in zip(sizes, seeds)
+    ]
+
+    pool = get_simulation_pool()
+    if pool is None or samples < settings.MONTE_CARLO_POOL_MIN_SAMPLES or len(tasks) < 2:
+        return [_simulate_chunk(task) for task in tasks]
+    return list(pool.map(_simulate_chunk, tasks))
+
+
+def summarize(
+    chunks: List[np.ndarray], current_year: int, horizon_years: int
+) -> Dict[str, Any]:
+    """
+    Percentiles, cumulative probability per future year and convergence of an ensemble.
+    """
+    years = np.sort(np.concatenate(chunks))
+    horizon = np.arange(current_year + 1, current_year + horizon_years + 1)
+    cumulative = np.searchsorted(years, horizon, side="right") / len(years)
+
+    medians = np.array([np.median(chunk) for chunk in chunks])
+    standard_error = (
+        float(medians.std(ddof=1) / math.sqrt(len(medians))) if len(medians) > 1 else None
+    )
+
+    return {
+        "samples": len(years),
+        "mean_next_occurrence": float(years.mean()),
+        "percentiles": {
+            f"p{p}": float(value)
+            for p, value in zip(PERCENTILES, np.percentile(years, PERCENTILES))
+        },
+        "cumulative_probability": [
+            {"year": int(year), "probability": float(probability)}
+            for year, probability in zip(horizon, cumulative)
+        ],
+        "convergence": {
+            "batches": len(chunks),
+            "batch_medians": [float(median) for median in medians],
+            "median_standard_error": standard_error,
+            "converged": standard_error is not None
+            and standard_error <= CONVERGENCE_TOLERANCE_YEARS,
+        },
+    }
@@ -0,0 +1,46 @@
+"""
+Simulation Pool: one process pool shared by the simulation endpoints.
+
+The pool is created once, in the application lifespan, with the spawn start
+method, so its workers begin from a fresh interpreter instead of forking a
+server that holds database connections and runs the classification thread.
+Work handed to it must be picklable plain data. Without a started pool
+(scripts, tests) callers run their work in-process.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_simulation_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared pool, or None if it has not been started."""
+    return _pool
+
+
+def start_simulation_pool(
+    max_workers: int = settings.SIMULATION_POOL_WORKERS,
+) -> Optional[ProcessPoolExecutor]:
+    """Start the shared pool (once) and return it; None if fewer than two workers are set."""
+    global _pool
+    with _lock:
+        if _pool is None and max_workers >= 2:
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def stop_simulation_pool() -> None:
+    """Shut the shared pool down, cancelling work that has not started."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
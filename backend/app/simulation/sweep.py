@@ -0,0 +1,176 @@
+"""
+Scenario Sweeps: batches of what-if scenarios expanded from a parameter grid.
+
+A grid lists alternative indicator sets, pattern sets and assumption sets; a
+sweep is every combination of them. Each scenario is evaluated by
+SimulationEngine.evaluate_scenario against one read-only indicator snapshot and
+the sweep's patterns, loaded up front, so evaluation needs no database access.
+Large sweeps are split into chunks over the shared simulation pool (see
+app.simulation.pool); each task carries the sweep's indicators and pattern
+dictionaries as plain data, and a worker rebuilds the snapshot once per sweep.
+Chunks are handed back as they complete, in whatever order that is. A sweep's scenarios are stored in one transaction, so a
+failed sweep leaves none of them behind.
+"""
+
+import itertools
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.simulation.indicators import IndicatorSnapshot
+from app.simulation.pool import get_simulation_pool
+
+# Grid keys, in expansion order, and the value used when a key has no alternatives
+GRID_DEFAULTS = {"indicator_ids": None, "pattern_ids": None, "assumptions": {}}
+
+# Scenarios per task sent to a worker process
+SWEEP_CHUNK_SIZE = 25
+
+Combination = Dict[str, Any]
+
+
+class ScenarioSweep:
+    """Iterator over a sweep's stored scenarios that tracks the sweep's progress."""
+
+    def __init__(self, sweep_id: str, total: int, scenarios: Iterator[Dict[str, Any]]):
+        self.sweep_id = sweep_id
+        self.total = total
+        self.completed = 0
+        self._scenarios = scenarios
+
+    def __iter__(self) -> "ScenarioSweep":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        scenario = next(self._scenarios)
+        self.completed += 1
+        return scenario
+
+    def close(self) -> None:
+        """Stop the sweep; nothing is stored unless it already finished."""
+        self._scenarios.close()
+
+    def status(self) -> Dict[str, Any]:
+        return {"sweep_id": self.sweep_id, "completed": self.completed, "total": self.total}
+
+
+def expand_grid(grid: Dict[str, Optional[List[Any]]]) -> List[Combination]:
+    """
+    Every combination of the grid's alternatives.
+
+    Args:
+        grid: indicator_ids (list of ID lists), pattern_ids (list of ID lists) and
+              assumptions (list of dictionaries); missing or empty keys add no
+              alternatives
+
+    Returns:
+        {"indicator_ids", "pattern_ids", "assumptions"} dictionaries
+
+    Raises:
+        ValueError: For unknown keys or more than settings.SCENARIO_SWEEP_MAX_SCENARIOS
+                    combinations
+    """
+    unknown = set(grid) - set(GRID_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown grid keys: {', '.join(sorted(unknown))}")
+
+    alternatives = [grid.get(key) or [default] for key, default in GRID_DEFAULTS.items()]
+    total = 1
+    for values in alternatives:
+        total *= len(values)
+    if total > settings.SCENARIO_SWEEP_MAX_SCENARIOS:
+        raise ValueError(
+            f"Grid expands to {total} scenarios "
+            f"(maximum {settings.SCENARIO_SWEEP_MAX_SCENARIOS})"
+        )
+
+    return [dict(zip(GRID_DEFAULTS, values)) for values in itertools.product(*alternatives)]
+
+
+# Worker process state: the snapshot of the sweep it last evaluated
+_worker: Dict[str, Any] = {}
+
+
+def _evaluate_chunk(
+    sweep_id: str,
+    indicators: List[Dict[str, Any]],
+    patterns: Dict[int, Dict[str, Any]],
+    chunk: List[Tuple[int, Combination]],
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Evaluate (index, combination) pairs in a worker process."""
+    # Imported here: the engine imports this module
+    from app.simulation.engine import SimulationEngine
+
+    if _worker.get("sweep_id") != sweep_id:
+        _worker.update(sweep_id=sweep_id, snapshot=IndicatorSnapshot(indicators))
+    return _evaluate_local(SimulationEngine, _worker["snapshot"], patterns, chunk)
+
+
+def _evaluate_local(
+    engine: Any,
+    snapshot: IndicatorSnapshot,
+    patterns: Dict[int, Dict[str, Any]],
+    chunk: List[Tuple[int, Combination]],
+) -> List[Tuple[int, Dict[str, Any]]]:
+    return [
+        (
+            index,
+            engine.evaluate_scenario(
+                snapshot, patterns, combination["indicator_ids"], combination["pattern_ids"]
+            ),
+        )
+        for index, combination in chunk
+    ]
+
+
+def evaluate_sweep(
+    sweep_id: str,
+    snapshot: IndicatorSnapshot,
+    patterns: Dict[int, Dict[str, Any]],
+    combinations: List[Combination],
+) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """
+    Evaluate every combination, yielding chunks of (index, evaluation) as they complete.
+
+    Sweeps of at least settings.SCENARIO_SWEEP_POOL_MIN_SCENARIOS run on the
+    shared simulation pool when it has been started; others run in this
+    process. Closing the iterator early cancels chunks that have not started.
+
+    Args:
+        sweep_id: Identifies the sweep to the worker processes
+        snapshot: Indicators the scenarios are evaluated against
+        patterns: pattern_data dictionaries by ID
+        combinations: Output of expand_grid
+    """
+    # Imported here: the engine imports this module
+    from app.simulation.engine import SimulationEngine
+
+    indexed = list(enumerate(combinations))
+    chunks = [
+        indexed[start : start + SWEEP_CHUNK_SIZE]
+        for start in range(0, len(indexed), SWEEP_CHUNK_SIZE)
+    ]
+
+    pool = get_simulation_pool()
+    if (
+        pool is None
+        or len(combinations) < settings.SCENARIO_SWEEP_POOL_MIN_SCENARIOS
+        or len(chunks) < 2
+    ):
+        for chunk in chunks:
+            yield _evaluate_local(SimulationEngine, snapshot, patterns, chunk)
+        return
+
+    pending = {
+        pool.submit(_evaluate_chunk, sweep_id, snapshot.indicators, patterns, chunk)
+        for chunk in chunks
+    }
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        # The pool is shared, so only this sweep's queued chunks are dropped
+        for future in pending:
+            future.cancel()
@@ -99,3 +99,110 @@ def test_get_events_by_era(test_db):
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
+
+
+def test_get_events_cursor_pagination(test_db):
+    """Test paging through events with the X-Next-Cursor header."""
+    from app.chronology.engine import ChronologyEngine
+    from app.models.chronology import ChronologyEra, EventType
+
+    db = TestingSessionLocal()
+    for year in (-1000, -990, -980):
+        ChronologyEngine(db).add_event(
+            name=f"Event {year}",
+            year_start=year,
+            era=ChronologyEra.UNITED_MONARCHY,
+            event_type=EventType.POLITICAL,
+        )
+    db.close()
+
+    response = client.get("/api/v1/chronology/events?limit=2")
+    assert response.status_code == 200
+    assert [e["year_start"] for e in response.json()] == [-1000, -990]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/api/v1/chronology/events?limit=2&cursor={cursor}")
+    assert [e["year_start"] for e in response.json()] == [-980]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/api/v1/chronology/events?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_stream_events(test_db):
+    """Test streaming the timeline as NDJSON and CSV."""
+    import json
+
+    from app.chronology.engine import ChronologyEngine
+    from app.models.chronology import ChronologyEra, EventType
+
+    db = TestingSessionLocal()
+    for year in (-586, -605, -539):
+        ChronologyEngine(db).add_event(
+            name=f"Event {year}",
+            year_start=year,
+            era=ChronologyEra.EXILE,
+            event_type=EventType.MILITARY,
+        )
+    db.close()
+
+    response = client.get("/api/v1/chronology/events/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["year_start"] for r in rows] == [-605, -586, -539]
+
+    response = client.get("/api/v1/chronology/events/stream?format=csv&year_start=-600")
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("name,")
+    assert len(lines) == 3
+
+
+def test_create_events_bulk_ndjson(test_db):
+    """Test bulk event ingestion from an NDJSON body."""
+    body = "\n".join(
+        [
+            '{"name": "Fall of Samaria", "year_start": -721, "era": "divided_kingdom", "event_type": "military"}',
+            "not json",
+            '{"name": "Hezekiah", "year_start": -726, "era": "divided_kingdom", "event_type": "sideways"}',
+            '{"name": "Fall of Nineveh", "year_start": -612, "era": "divided_kingdom", "event_type": "military"}',
+        ]
+    )
+
+    response = client.post(
+        "/api/v1/chronology/events/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 2
+    assert data["failed"] == 2
+    assert [e["index"] for e in data["errors"]] == [1, 2]
+
+    response = client.get("/api/v1/chronology/events?year_start=-800&year_end=-600")
+    assert [e["name"] for e in response.json()] == ["Fall of Samaria", "Fall of Nineveh"]
+
+
+def test_sweep_scenarios_stream(test_db):
+    """A scenario sweep streams one stored scenario per grid combination, then its status."""
+    import json
+
+    response = client.post(
+        "/api/v1/simulation/scenarios/sweep",
+        json={
+            "name": "What-if",
+            "description": "Assumption sweep",
+            "grid": {"assumptions": [{"growth": 0.01}, {"growth": 0.03}, {"growth": 0.05}]},
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    *scenarios, status = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(s["parameters"]["index"] for s in scenarios) == [0, 1, 2]
+    assert {s["parameters"]["sweep_id"] for s in scenarios} == {status["sweep_id"]}
+    assert status == {"sweep_id": status["sweep_id"], "completed": 3, "total": 3}
+
+    response = client.get("/api/v1/simulation/scenarios")
+    assert sorted(s["id"] for s in response.json()) == sorted(s["id"] for s in scenarios)
@@ -8,7 +8,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.database import Base
 from app.chronology.engine import ChronologyEngine
-from app.models.chronology import ChronologyEra, EventType
+from app.models.chronology import ChronologyEra, ChronologyEvent, EventType
 
 TEST_DATABASE_URL = "sqlite:///./test_chronology.db"
 engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -111,3 +111,489 @@ def test_find_contemporaneous_events(db_session):
     assert "Nearby Event 1" in names
     assert "Nearby Event 2" in names
     assert "Far Event" not in names
+
+
+def test_interval_tree_matches_brute_force():
+    """Interval tree overlap queries agree with a linear scan."""
+    import random
+
+    from app.chronology.index import IntervalTree
+
+    rng = random.Random(7)
+    intervals = []
+    for i in range(1000):
+        start = rng.randint(-4004, 2026)
+        intervals.append((start, start + rng.choice([0, 0, 1, 10, 200]), i))
+    tree = IntervalTree(intervals)
+
+    for _ in range(200):
+        a = rng.randint(-4100, 2100)
+        b = a + rng.randint(0, 300)
+        expected = sorted(i for s, e, i in intervals if s <= b and e >= a)
+        assert sorted(tree.overlap(a, b)) == expected
+
+    assert sorted(tree.stab(intervals[0][0])) == sorted(
+        i for s, e, i in intervals if s <= intervals[0][0] <= e
+    )
+    assert IntervalTree([]).overlap(0, 10) == []
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+def test_range_queries_with_uncertainty(db_session, use_index):
+    """Range and year queries honour spans and uncertainty envelopes on both paths."""
+    engine_instance = ChronologyEngine(db_session, use_index=use_index)
+
+    engine_instance.add_event(
+        name="Long Reign", year_start=-970, year_end=-930,
+        era=ChronologyEra.UNITED_MONARCHY, event_type=EventType.POLITICAL,
+    )
+    engine_instance.add_event(
+        name="Uncertain Event", year_start=-880, year_start_min=-910, year_start_max=-870,
+        era=ChronologyEra.DIVIDED_KINGDOM, event_type=EventType.RELIGIOUS,
+    )
+    engine_instance.add_event(
+        name="Point Event", year_start=-700,
+        era=ChronologyEra.DIVIDED_KINGDOM, event_type=EventType.MILITARY,
+    )
+
+    names = [e.name for e in engine_instance.get_events_in_range(-920, -900)]
+    assert names == ["Uncertain Event"]
+
+    names = [e.name for e in engine_instance.get_events_in_range(-920, -900, include_uncertain=False)]
+    assert names == []
+
+    assert [e.name for e in engine_instance.get_event_by_year(-950)] == ["Long Reign"]
+    assert [e.name for e in engine_instance.get_event_by_year(-705, tolerance=5)] == ["Point Event"]
+    assert engine_instance.get_event_by_year(-600) == []
+
+
+def test_get_events_page_keyset(db_session):
+    """Keyset pages cover every matching event exactly once, in order."""
+    engine_instance = ChronologyEngine(db_session)
+
+    for i, year in enumerate([-900, -1000, -900, -800, -700]):
+        engine_instance.add_event(
+            name=f"Event {i}",
+            year_start=year,
+            era=ChronologyEra.DIVIDED_KINGDOM,
+            event_type=EventType.MILITARY if i % 2 else EventType.POLITICAL,
+        )
+
+    seen = []
+    after = None
+    while True:
+        page = engine_instance.get_events_page(after=after, limit=2)
+        if not page:
+            break
+        seen.extend(page)
+        after = (page[-1].year_start, page[-1].id)
+
+    assert [e.year_start for e in seen] == [-1000, -900, -900, -800, -700]
+    assert len({e.id for e in seen}) == 5
+
+    political = engine_instance.get_events_page(
+        year_start=-950, year_end=-750, event_type=EventType.POLITICAL
+    )
+    assert [e.name for e in political] == ["Event 0", "Event 2"]
+
+    open_ended = engine_instance.get_events_page(year_start=-750)
+    assert [e.year_start for e in open_ended] == [-700]
+
+
+def test_add_events_bulk(db_session):
+    """Bulk insert writes valid rows and reports invalid ones by index."""
+    engine_instance = ChronologyEngine(db_session)
+
+    records = [
+        {"name": "Decree of Cyrus", "year_start": -536, "era": "post_exile", "event_type": "political"},
+        {"name": "Missing Year", "era": "post_exile", "event_type": "political"},
+        {
+            "name": "Temple Rebuilt",
+            "year_start": -515,
+            "era": "post_exile",
+            "event_type": "religious",
+            "extra_data": {"pattern": "exile_restoration"},
+        },
+    ]
+
+    result = engine_instance.add_events_bulk(records, batch_size=2)
+
+    assert result["inserted"] == 2
+    assert result["failed"] == 1
+    assert result["errors"][0]["index"] == 1
+    assert "year_start" in result["errors"][0]["error"]
+    assert len(result["event_ids"]) == 2
+
+    events = engine_instance.get_events_in_range(-540, -510)
+    assert [e.name for e in events] == ["Decree of Cyrus", "Temple Rebuilt"]
+    assert events[1].extra_data == {"pattern": "exile_restoration"}
+
+
+def test_timeline_summary_buckets(db_session):
+    """Summaries from century buckets match a direct count, including partial edges."""
+    from app.models.chronology import ChronologyEvent, TimelineBucket
+
+    engine_instance = ChronologyEngine(db_session)
+    years = [-1012, -1005, -1000, -999, -931, -722, -701, -700, -650, -586, -539]
+    for i, year in enumerate(years):
+        engine_instance.add_event(
+            name=f"Event {year}",
+            year_start=year,
+            era=ChronologyEra.DIVIDED_KINGDOM if year > -931 else ChronologyEra.UNITED_MONARCHY,
+            event_type=EventType.MILITARY if i % 2 else EventType.RELIGIOUS,
+        )
+    engine_instance.add_events_bulk(
+        [{"name": "Bulk", "year_start": -705, "era": "divided_kingdom", "event_type": "social"}]
+    )
+    years.append(-705)
+
+    buckets = db_session.query(TimelineBucket).all()
+    assert sum(bucket.event_count for bucket in buckets) == len(years)
+    assert min(bucket.min_year for bucket in buckets) == -1012
+    assert max(bucket.max_year for bucket in buckets) == -539
+
+    for start, end in [(None, None), (-1000, -700), (-1010, -590), (-720, -702), (None, -701), (-650, None)]:
+        summary = engine_instance.get_timeline_summary(start, end)
+        expected = [y for y in years if (start is None or y >= start) and (end is None or y <= end)]
+        assert summary["total_events"] == len(expected)
+        assert sum(summary["type_distribution"].values()) == len(expected)
+        if start is None:
+            assert summary["year_range"]["start"] == min(expected)
+
+    # An event swapped behind the engine's back keeps the total but not the highest ID
+    assert engine_instance.timeline_buckets_current()
+    db_session.query(ChronologyEvent).filter(ChronologyEvent.year_start == -539).delete()
+    db_session.add(
+        ChronologyEvent(
+            name="Out of band", year_start=-600, era=ChronologyEra.EXILE, event_type=EventType.POLITICAL
+        )
+    )
+    db_session.commit()
+    assert not engine_instance.timeline_buckets_current()
+
+    # Stale buckets are bypassed by reads, not rebuilt by them
+    bucket_rows = db_session.query(TimelineBucket).count()
+    summary = engine_instance.get_timeline_summary()
+    assert summary["era_distribution"]["exile"] == 1
+    assert summary["total_events"] == len(years)
+    assert summary["year_range"]["end"] == -586
+    assert db_session.query(TimelineBucket).count() == bucket_rows
+
+    engine_instance.rebuild_timeline_buckets()
+    assert engine_instance.timeline_buckets_current()
+    assert engine_instance.get_timeline_summary(-650, -550)["era_distribution"] == {
+        "divided_kingdom": 2,
+        "exile": 1,
+    }
+
+
+def test_contemporaneity_matrix_matches_brute_force(db_session):
+    """Sweep-line pairs and type counts agree with an all-pairs comparison."""
+    import random
+
+    rng = random.Random(3)
+    engine_instance = ChronologyEngine(db_session)
+    types = [EventType.POLITICAL, EventType.RELIGIOUS, EventType.MILITARY]
+    engine_instance.add_events_bulk(
+        [
+            {
+                "name": f"Event {i}",
+                "year_start": rng.randint(-1000, -800),
+                "era": "divided_kingdom",
+                "event_type": rng.choice(types).value,
+            }
+            for i in range(120)
+        ]
+    )
+
+    result = engine_instance.contemporaneity_matrix(window_years=7)
+    ids = result["event_ids"]
+    pairs = {
+        (ids[i], ids[j])
+        for i in range(len(ids))
+        for j in result["indices"][result["indptr"][i] : result["indptr"][i + 1]]
+    }
+
+    events = {e.id: e for e in engine_instance.get_events_in_range(-1000, -800)}
+    expected = {
+        (a, b)
+        for a in ids
+        for b in ids
+        if ids.index(a) < ids.index(b) and abs(events[a].year_start - events[b].year_start) <= 7
+    }
+    assert pairs == expected
+    assert result["total_pairs"] == len(expected)
+
+    religious_political = sum(
+        1
+        for a, b in expected
+        if {events[a].event_type, events[b].event_type} == {EventType.RELIGIOUS, EventType.POLITICAL}
+    )
+    assert result["type_cooccurrence"]["religious"]["political"] == religious_political
+    assert result["type_cooccurrence"]["political"]["religious"] == religious_political
+
+    with pytest.raises(ValueError):
+        engine_instance.contemporaneity_matrix(window_years=500, max_pairs=10)
+
+
+def test_temporal_distance_matrix(db_session):
+    """Distance matrices carry uncertainty intervals and flag target distances."""
+    engine_instance = ChronologyEngine(db_session)
+    result = engine_instance.add_events_bulk(
+        [
+            {
+                "name": "Decree of Artaxerxes",
+                "year_start": -457,
+                "year_start_min": -458,
+                "year_start_max": -444,
+                "era": "post_exile",
+                "event_type": "political",
+            },
+            {
+                "name": "Baptism of Jesus",
+                "year_start": 27,
+                "year_start_min": 26,
+                "year_start_max": 29,
+                "era": "new_testament",
+                "event_type": "religious",
+            },
+            {
+                "name": "Fall of Jerusalem",
+                "year_start": 70,
+                "era": "early_church",
+                "event_type": "military",
+            },
+        ]
+    )
+    decree, baptism, fall = result["event_ids"]
+
+    matrix = engine_instance.temporal_distance_matrix(
+        event_ids=[decree],
+        to_event_ids=[fall, baptism, 9999],
+        target_years=483,
+    )
+
+    assert matrix["to_event_ids"] == [fall, baptism]
+    assert matrix["missing_ids"] == [9999]
+    assert matrix["nominal"] == [[527, 484]]
+    assert matrix["min"] == [[514, 470]]
+    assert matrix["max"] == [[528, 487]]
+    assert [(m["from_event_id"], m["to_event_id"]) for m in matrix["target_matches"]] == [
+        (decree, baptism)
+    ]
+
+    square = engine_instance.temporal_distance_matrix(year_start=-500, year_end=100)
+    assert square["event_ids"] == [decree, baptism, fall]
+    assert square["nominal"][2][0] == -527
+    assert engine_instance.calculate_temporal_distance(decree, fall) == 527
+
+    with pytest.raises(ValueError):
+        engine_instance.temporal_distance_matrix(max_events=2)
+
+
+def test_chronology_snapshot(db_session, tmp_path):
+    """Snapshots are memory-mapped, scanned without SQL and replaced on new data."""
+    from app.chronology.analytics import ERAS
+    from app.chronology.index import database_identity
+    from app.chronology.snapshot import POINTER_FILE, get_chronology_snapshot
+
+    engine_instance = ChronologyEngine(db_session)
+    engine_instance.add_events_bulk(
+        [
+            {
+                "name": "Fall of Samaria",
+                "description": "Assyria deports the northern kingdom",
+                "year_start": -722,
+                "era": "divided_kingdom",
+                "event_type": "military",
+            },
+            {
+                "name": "Fall of Jerusalem",
+                "description": "Babylon destroys the Temple",
+                "year_start": -586,
+                "era": "exile",
+                "event_type": "military",
+            },
+            {
+                "name": "Decree of Cyrus",
+                "year_start": -538,
+                "era": "post_exile",
+                "event_type": "political",
+            },
+        ]
+    )
+
+    snapshot = get_chronology_snapshot(db_session, tmp_path)
+    directory = tmp_path / database_identity(db_session)
+    assert len(snapshot) == 3
+    assert snapshot.path.parent == directory
+    assert (directory / POINTER_FILE).read_text() == snapshot.path.name
+    assert snapshot.columns.year_start.tolist() == [-722, -586, -538]
+    assert [snapshot.name(i) for i in range(3)] == [
+        "Fall of Samaria",
+        "Fall of Jerusalem",
+        "Decree of Cyrus",
+    ]
+    assert snapshot.description(1) == "Babylon destroys the Temple"
+    assert snapshot.description(2) is None
+    ids = snapshot.columns.ids.tolist()
+    assert snapshot.positions_of([ids[2], ids[0], 10**6]) == {ids[2]: 2, ids[0]: 0}
+    assert get_chronology_snapshot(db_session, tmp_path) is snapshot
+
+    engine_instance.add_event(
+        name="Edict of Milan",
+        year_start=313,
+        era=ChronologyEra.ROMAN_EMPIRE,
+        event_type=EventType.RELIGIOUS,
+    )
+    refreshed = get_chronology_snapshot(db_session, tmp_path)
+    assert len(refreshed) == 4
+    assert ERAS[refreshed.columns.era_codes[3]] == ChronologyEra.ROMAN_EMPIRE
+    assert refreshed.name(3) == "Edict of Milan"
+    assert not snapshot.path.exists()
+    assert [p.name for p in directory.iterdir() if p.is_dir()] == [refreshed.path.name]
+
+    # Deleting an event lowers the count: the pointer, not the version order, decides
+    db_session.query(ChronologyEvent).filter(ChronologyEvent.name == "Decree of Cyrus").delete()
+    db_session.commit()
+    smaller = get_chronology_snapshot(db_session, tmp_path)
+    assert len(smaller) == 3
+    assert [p.name for p in directory.iterdir() if p.is_dir()] == [smaller.path.name]
+
+
+def test_timeline_density(db_session, tmp_path, monkeypatch):
+    """Density bins at each resolution agree with direct counts."""
+    import random
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "CHRONOLOGY_SNAPSHOT_DIR", str(tmp_path))
+    rng = random.Random(5)
+    engine_instance = ChronologyEngine(db_session)
+    years = [rng.randint(-2500, 100) for _ in range(300)]
+    engine_instance.add_events_bulk(
+        [
+            {
+                "name": f"Event {i}",
+                "year_start": year,
+                "era": "divided_kingdom",
+                "event_type": "military" if i % 3 else "religious",
+            }
+            for i, year in enumerate(years)
+        ]
+    )
+
+    for resolution, width in [("year", 1), ("decade", 10), ("century", 100), ("millennium", 1000)]:
+        density = engine_instance.get_density(-1234, -345, resolution)
+        assert density["bin_years"] == width
+        for b in density["bins"]:
+            assert b["start"] % width == 0
+            assert b["count"] == sum(1 for y in years if b["start"] <= y <= b["end"])
+            assert sum(b["types"].values()) == b["count"]
+        assert density["total_events"] == sum(
+            1 for y in years if -1234 - (-1234 % width) <= y <= -345 - (-345 % width) + width - 1
+        )
+
+    assert engine_instance.get_density(max_bins=50)["resolution"] == "century"
+    assert engine_instance.get_density(-600, -580)["resolution"] == "year"
+    assert engine_instance.get_density(-600, -580)["raw_events"]
+    with pytest.raises(ValueError):
+        engine_instance.get_density(resolution="week")
+
+
+def test_search_index(db_session):
+    """Ranked search with phrases, prefixes and match_all over the inverted index."""
+    from app.chronology.search import SearchIndex, _tsquery_text, parse_query
+
+    engine_instance = ChronologyEngine(db_session)
+    result = engine_instance.add_events_bulk(
+        [
+            {
+                "name": "Fall of Jerusalem",
+                "description": "Babylon destroys the Temple",
+                "biblical_source": "2 Kings 25",
+                "year_start": -586,
+                "era": "exile",
+                "event_type": "military",
+            },
+            {
+                "name": "Return from Babylon",
+                "description": "Exiles return to Jerusalem after the fall of Babylon",
+                "year_start": -538,
+                "era": "post_exile",
+                "event_type": "political",
+            },
+            {
+                "name": "Assyrian conquest of Samaria",
+                "description": "The northern kingdom falls",
+                "year_start": -722,
+                "era": "divided_kingdom",
+                "event_type": "military",
+            },
+        ]
+    )
+    jerusalem, babylon, samaria = result["event_ids"]
+    search = SearchIndex(db_session)
+    assert search.backend == "memory"
+
+    # Name matches outrank description matches
+    hits = search.search("babylon")
+    assert [hit["event_id"] for hit in hits] == [babylon, jerusalem]
+
+    assert [e.id for e in search.search_events('"fall of jerusalem"')] == [jerusalem]
+    assert [e.id for e in search.search_events('"fall of babylon"')] == [babylon]
+    assert [e.id for e in search.search_events("assyr*")] == [samaria]
+    assert search.search("assyr") == []
+    assert [e.id for e in search.search_events("temple return", match_all=True)] == []
+    both = search.search_events("jerusalem babylon", match_all=True)
+    assert {e.id for e in both} == {jerusalem, babylon}
+
+    hits = search.search(["kings", "northern kingdom", "conquest"], prefix=True)
+    assert {hit["event_id"]: hit["matched_terms"] for hit in hits} == {
+        jerusalem: ["kings"],
+        samaria: ["northern kingdom", "conquest"],
+    }
+
+    # search() and bm25() weight a term by the same inverse document frequency
+    from app.chronology.search import FIELD_WEIGHTS, get_inverted_index
+
+    index = get_inverted_index(db_session)
+    term = parse_query("kings")[0]
+    score = {hit["event_id"]: hit["score"] for hit in hits}[jerusalem]
+    assert score == pytest.approx(index.idf(term, index.match(term)) * FIELD_WEIGHTS[1])
+
+    assert _tsquery_text(parse_query('"fall of jerusalem"')[0]) == "'fall' <2> 'jerusalem'"
+    assert _tsquery_text(parse_query("assyr*")[0]) == "'assyr':*"
+
+    # PostgreSQL queries go through the declared (deferred) search_vector column
+    from sqlalchemy.dialects import postgresql
+
+    from app.models.chronology import ChronologyEvent
+
+    sql = str(
+        db_session.query(ChronologyEvent.search_vector.op("@@")("x")).statement.compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert "chronology_events.search_vector @@" in sql
+    assert "search_vector" not in str(db_session.query(ChronologyEvent).statement)
+
+    # New events extend the shared index instead of rebuilding it
+    from app.chronology.search import InvertedIndex
+
+    before = get_inverted_index(db_session)
+    cyrus = engine_instance.add_event(
+        name="Cyrus takes Babylon",
+        year_start=-539,
+        era=ChronologyEra.EXILE,
+        event_type=EventType.MILITARY,
+    )
+    after = get_inverted_index(db_session)
+    assert after is not before and after.total == before.total + 1
+    assert cyrus.id not in before.postings["babylon"]
+    rebuilt = InvertedIndex.build(db_session)
+    assert after.postings == rebuilt.postings
+    assert after.vocabulary == rebuilt.vocabulary
+    assert after.lengths == rebuilt.lengths and after.total_length == rebuilt.total_length
+    assert cyrus.id not in before.lengths
+    assert [hit["event_id"] for hit in search.search("babylon", limit=2)] == [babylon, cyrus.id]
@@ -0,0 +1,355 @@
+"""
+Tests for pattern library functionality.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.chronology.classifier import ClassificationWorker
+from app.chronology.engine import ChronologyEngine
+from app.chronology.index import database_identity
+from app.models.chronology import ChronologyEra, EventType
+from app.patterns.library import PatternLibrary
+from app.patterns.similarity import SimilarityIndex, get_similarity_index
+from app.prophecy.library import ProphecyLibrary
+
+TEST_DATABASE_URL = "sqlite:///./test_patterns.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db_session():
+    """Create test database session."""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def library(db_session):
+    """Pattern library seeded with the core patterns."""
+    library = PatternLibrary(db_session)
+    library.seed_core_patterns()
+    return library
+
+
+def test_detect_pattern_in_event(db_session, library):
+    """Keywords match on word boundaries, with underscores read as spaces."""
+    chronology = ChronologyEngine(db_session)
+    exile = chronology.add_event(
+        name="Babylonian exile of Judah",
+        year_start=-586,
+        era=ChronologyEra.EXILE,
+        event_type=EventType.MILITARY,
+        description="Displacement and loss of land after military defeat; foreign domination",
+        extra_data={"preconditions": ["covenant_unfaithfulness"]},
+    )
+    # "exiled" must not match the "exile" outcome
+    unrelated = chronology.add_event(
+        name="Poet exiled",
+        year_start=1300,
+        era=ChronologyEra.MEDIEVAL,
+        event_type=EventType.SOCIAL,
+    )
+
+    detected = library.detect_pattern_in_event(exile.id)
+    exile_restoration = library.get_pattern_by_name("Exile → Restoration")
+    top = detected[0]
+    assert top["pattern_id"] == exile_restoration.id
+    # 3 indicators in the text (+3 each) and 1 precondition in extra_data (+2);
+    # "military_defeat" is also a precondition, so it only counts in extra_data
+    assert top["matched_indicators"] == 11
+    assert top["confidence_score"] == 1.0
+    assert top["matched_keywords"] == [
+        "covenant_unfaithfulness",
+        "displacement",
+        "foreign_domination",
+        "loss_of_land",
+    ]
+    assert library.detect_pattern_in_event(unrelated.id) == []
+
+    batch = library.detect_patterns_batch()
+    assert batch["events_scanned"] == 2
+    assert batch["results"] == [{"event_id": exile.id, "detected_patterns": detected}]
+    assert batch["pattern_counts"][exile_restoration.id] == 1
+
+
+def test_pattern_matcher_rebuilt_on_change(db_session, library):
+    """Editing pattern keywords takes effect on the next detection."""
+    event = ChronologyEngine(db_session).add_event(
+        name="Great famine",
+        year_start=-1700,
+        era=ChronologyEra.PATRIARCHS,
+        event_type=EventType.NATURAL,
+    )
+    assert library.detect_pattern_in_event(event.id) == []
+
+    pattern = library.get_pattern_by_name("Pride → Humbling/Fall")
+    pattern.indicators = list(pattern.indicators) + ["famine"]
+    db_session.commit()
+
+    detected = library.detect_pattern_in_event(event.id)
+    assert [d["pattern_id"] for d in detected] == [pattern.id]
+
+
+def test_bulk_link(db_session, library):
+    """Bulk links upsert in one transaction and report what changed."""
+    chronology = ChronologyEngine(db_session)
+    events = chronology.add_events_bulk(
+        [
+            {
+                "name": f"Event {i}",
+                "year_start": -700 + i,
+                "era": "divided_kingdom",
+                "event_type": "political",
+                "extra_data": {"pattern": key},
+            }
+            for i, key in enumerate(["moral_decay_judgment", "pride_humbling", "unknown", None])
+        ]
+    )["event_ids"]
+    moral, pride = (
+        library.get_pattern_by_name(library.CORE_PATTERNS[key]["name"]).id
+        for key in ("moral_decay_judgment", "pride_fall")
+    )
+
+    assert library.relink_chronology() == {
+        "inserted": 2,
+        "updated": 0,
+        "unchanged": 0,
+        "skipped": 0,
+        "candidates": 2,
+    }
+    # Re-running is a no-op
+    assert library.relink_chronology()["unchanged"] == 2
+
+    summary = library.bulk_link(
+        [
+            {"event_id": events[0], "pattern_id": moral, "strength": 9},
+            {"event_id": events[1], "pattern_id": pride, "strength": 3},
+            {"event_id": events[2], "pattern_id": pride, "strength": 4},
+            {"event_id": 9999, "pattern_id": pride, "strength": 4},
+        ],
+        on_conflict="max_strength",
+    )
+    assert summary == {"inserted": 1, "updated": 1, "unchanged": 1, "skipped": 1}
+
+    strengths = {
+        (i["event_id"], pattern_id): i["strength"]
+        for pattern_id in (moral, pride)
+        for i in library.find_pattern_instances(pattern_id)
+    }
+    assert strengths == {
+        (events[0], moral): 9,
+        (events[1], pride): 7,
+        (events[2], pride): 4,
+    }
+
+    assert library.relink_chronology(strength=5, on_conflict="ignore")["unchanged"] == 2
+    with pytest.raises(ValueError):
+        library.bulk_link([], on_conflict="replace")
+
+
+def test_recurrence_statistics(db_session, library):
+    """Window-function statistics match a direct computation and track new links."""
+    import random
+    import statistics
+
+    rng = random.Random(11)
+    events = ChronologyEngine(db_session).add_events_bulk(
+        [
+            {
+                "name": f"Event {i}",
+                "year_start": rng.randint(-2000, 2000),
+                "era": rng.choice(["exile", "medieval", "modern"]),
+                "event_type": "political",
+            }
+            for i in range(60)
+        ]
+    )["event_ids"]
+    patterns = [p.id for p in library.get_all_patterns()][:3]
+    links = {
+        (event_id, pattern_id)
+        for event_id in events
+        for pattern_id in patterns
+        if rng.random() < 0.4
+    }
+    library.bulk_link(
+        {"event_id": event_id, "pattern_id": pattern_id, "strength": 5}
+        for event_id, pattern_id in links
+    )
+
+    result = library.recurrence_statistics()
+    for pattern_id in patterns:
+        instances = library.find_pattern_instances(pattern_id)
+        years = [i["year_start"] for i in instances]
+        intervals = [b - a for a, b in zip(years, years[1:])]
+        stats = result[pattern_id]
+
+        assert stats["total_instances"] == len(instances)
+        assert stats["first_occurrence"] == years[0]
+        assert stats["most_recent_occurrence"] == years[-1]
+        assert stats["average_interval_years"] == pytest.approx(statistics.mean(intervals))
+        assert stats["median_interval_years"] == pytest.approx(statistics.median(intervals))
+        assert stats["stddev_interval_years"] == pytest.approx(statistics.stdev(intervals))
+        assert sum(stats["era_distribution"].values()) == len(instances)
+
+    # A new link is reflected without explicit invalidation
+    unlinked = next(e for e in events if (e, patterns[0]) not in links)
+    library.bulk_link([{"event_id": unlinked, "pattern_id": patterns[0], "strength": 5}])
+    assert (
+        library.recurrence_statistics()[patterns[0]]["total_instances"]
+        == result[patterns[0]]["total_instances"] + 1
+    )
+    assert library.analyze_pattern_recurrence(9999)["total_instances"] == 0
+
+    # Callers get copies; changing one leaves the cache intact
+    analysis = library.analyze_pattern_recurrence(patterns[0])
+    analysis["era_distribution"].clear()
+    library.recurrence_statistics()[patterns[1]]["era_distribution"].clear()
+    assert library.analyze_pattern_recurrence(patterns[0])["era_distribution"]
+    assert library.recurrence_statistics()[patterns[1]]["era_distribution"]
+
+
+def test_pattern_similarity(db_session, library, tmp_path, monkeypatch):
+    """Stemmed TF-IDF similarity, with the term matrix persisted and extended incrementally."""
+    monkeypatch.setattr(settings, "PATTERN_SIMILARITY_PATH", str(tmp_path / "tfidf.npz"))
+    chronology = ChronologyEngine(db_session)
+    oppression = chronology.add_event(
+        name="Samaria's rulers oppressed the poor",
+        year_start=-760,
+        era=ChronologyEra.DIVIDED_KINGDOM,
+        event_type=EventType.SOCIAL,
+        description="Amos condemns idolatries and corruption before the exile",
+    )
+    chronology.add_event(
+        name="Harvest festival",
+        year_start=-700,
+        era=ChronologyEra.DIVIDED_KINGDOM,
+        event_type=EventType.RELIGIOUS,
+    )
+
+    moral_decay = library.get_pattern_by_name("Moral Decay → Divine Judgment")
+    results = library.pattern_similarity([moral_decay.id], limit=5, min_score=0.05)
+    assert [e["event_id"] for e in results[0]["events"]] == [oppression.id]
+    assert 0 < results[0]["events"][0]["score"] <= 1
+
+    first = get_similarity_index(db_session)
+    assert (tmp_path / "tfidf.npz").exists()
+
+    # A new event is appended to the stored rows instead of rebuilding them
+    humbled = chronology.add_event(
+        name="Nebuchadnezzar humbled after boasting",
+        year_start=-570,
+        era=ChronologyEra.EXILE,
+        event_type=EventType.POLITICAL,
+        extra_data={"note": "madness follows self deification"},
+    )
+    second = get_similarity_index(db_session)
+    assert second is not first
+    assert second.event_ids.tolist() == [*first.event_ids.tolist(), humbled.id]
+    assert second.indices[: len(first.indices)].tolist() == first.indices.tolist()
+
+    pride = library.get_pattern_by_name("Pride → Humbling/Fall")
+    results = library.pattern_similarity([pride.id], min_score=0.05)
+    assert results[0]["events"][0]["event_id"] == humbled.id
+
+    # A fresh process picks up the persisted matrix, but only for the same database
+    database = database_identity(db_session)
+    loaded = SimilarityIndex.load(tmp_path / "tfidf.npz", database)
+    assert loaded.version == second.version
+    assert loaded.vocabulary == second.vocabulary
+    assert SimilarityIndex.load(tmp_path / "tfidf.npz", "other-database") is None
+
+
+def test_pattern_sequences(db_session, library):
+    """Ordered pairs and triples are counted within the window, with lift."""
+    pride = library.get_pattern_by_name("Pride → Humbling/Fall").id
+    unity = library.get_pattern_by_name("Unity → Fragmentation").id
+    exile = library.get_pattern_by_name("Exile → Restoration").id
+
+    # Pride, then fragmentation 20 years later, then exile 10 years after that, three times
+    links = []
+    chronology = ChronologyEngine(db_session)
+    for start in (-900, -500, 100):
+        for offset, pattern_id in ((0, pride), (20, unity), (30, exile)):
+            event = chronology.add_event(
+                name=f"Event {start + offset}",
+                year_start=start + offset,
+                era=ChronologyEra.DIVIDED_KINGDOM,
+                event_type=EventType.POLITICAL,
+            )
+            links.append({"event_id": event.id, "pattern_id": pattern_id, "strength": 5})
+    library.bulk_link(links)
+
+    result = library.pattern_sequences(window_years=50, min_count=2)
+    assert result["total_instances"] == 9
+    pairs = {tuple(p["pattern_ids"]): p for p in result["pairs"]}
+    assert set(pairs) == {(pride, unity), (pride, exile), (unity, exile)}
+    assert pairs[(pride, unity)]["count"] == 3
+    assert pairs[(pride, unity)]["confidence"] == 1.0
+    # Unity follows 3 of 9 instances, but every pride instance
+    assert pairs[(pride, unity)]["lift"] == pytest.approx(3.0)
+    assert pairs[(pride, unity)]["pattern_names"][0] == "Pride → Humbling/Fall"
+    assert [t["pattern_ids"] for t in result["triples"]] == [[pride, unity, exile]]
+
+    # Sequences longer than the window are not counted
+    assert library.pattern_sequences(window_years=25)["triples"] == []
+    assert library.pattern_sequences(window_years=5)["pairs"] == []
+
+
+def test_classification_worker(db_session, library):
+    """Committed events are classified in the background; the queue is bounded."""
+    ProphecyLibrary(db_session).seed_core_prophecies()
+    worker = ClassificationWorker(TestingSessionLocal, batch_wait=0.05)
+    worker.start()
+    try:
+        chronology = ChronologyEngine(db_session)
+        exile = chronology.add_event(
+            name="Babylonian exile of Judah",
+            year_start=-586,
+            era=ChronologyEra.EXILE,
+            event_type=EventType.MILITARY,
+            description="Displacement and loss of land under Nebuchadnezzar; foreign domination",
+        )
+        bulk = chronology.add_events_bulk(
+            [
+                {
+                    "name": "Cyrus of Persia takes Babylon",
+                    "year_start": -539,
+                    "era": "exile",
+                    "event_type": "military",
+                },
+                {"name": "Quiet year", "year_start": -538, "era": "exile", "event_type": "social"},
+            ]
+        )["event_ids"]
+        assert worker.wait_idle()
+    finally:
+        worker.stop()
+
+    status = worker.status()
+    assert not status["running"]
+    assert status["processed"] == 3
+    assert status["queue_depth"] == 0
+    assert status["failed_batches"] == 0
+
+    exile_restoration = library.get_pattern_by_name("Exile → Restoration")
+    linked = {(i["event_id"]) for i in library.find_pattern_instances(exile_restoration.id)}
+    assert linked == {exile.id}
+    candidates = ProphecyLibrary(db_session).get_candidates()
+    assert {c["event_id"] for c in candidates} == {exile.id, bulk[0]}
+    assert status["prophecy_candidates"] == len(candidates)
+
+    # Stopped workers no longer receive events; a full queue drops the overflow
+    chronology.add_event(
+        name="Later event", year_start=-500, era=ChronologyEra.EXILE, event_type=EventType.SOCIAL
+    )
+    assert worker.status()["enqueued"] == 3
+    small = ClassificationWorker(TestingSessionLocal, max_queue=2)
+    assert small.enqueue([1, 2, 3]) == 2
+    assert small.status()["dropped"] == 1
@@ -0,0 +1,332 @@
+"""
+Tests for prophecy library functionality.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.chronology.classifier import start_classification_worker, stop_classification_worker
+from app.chronology.engine import ChronologyEngine
+from app.models.chronology import ChronologyEvent
+from app.prophecy.candidates import _candidate_upsert, score_candidates
+from app.prophecy.library import ProphecyLibrary
+
+TEST_DATABASE_URL = "sqlite:///./test_prophecy.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db_session():
+    """Create test database session."""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def library(db_session):
+    """Prophecy library seeded with the core prophecies."""
+    library = ProphecyLibrary(db_session)
+    library.seed_core_prophecies()
+    return library
+
+
+def test_detect_fulfillment_candidates(db_session, library):
+    """Candidates come from the search index, best first, bounded by limit."""
+    events = ChronologyEngine(db_session).add_events_bulk(
+        [
+            {
+                "name": "Cyrus of Persia conquers Babylon",
+                "description": "The Medes and Persians take the city",
+                "year_start": -539,
+                "era": "exile",
+                "event_type": "military",
+            },
+            {
+                "name": "Alexander conquers Persia",
+                "year_start": -331,
+                "era": "intertestamental",
+                "event_type": "military",
+            },
+            {
+                "name": "Harvest festival",
+                "year_start": -500,
+                "era": "post_exile",
+                "event_type": "religious",
+            },
+        ]
+    )["event_ids"]
+    cyrus, alexander, _ = events
+    daniel_2 = library.get_prophecy_by_reference("Daniel 2:31-45")
+
+    candidates = library.detect_fulfillment_candidates(daniel_2.id, confidence_threshold=0.05)
+    assert [c["event"].id for c in candidates] == [cyrus, alexander]
+    assert sorted(candidates[0]["matched_keywords"]) == ["babylon", "cyrus", "medes", "persia"]
+    assert candidates[0]["confidence"] > candidates[1]["confidence"]
+    assert candidates[0]["score"] == pytest.approx(sum(candidates[0]["element_scores"].values()))
+    ranked = library.rank_fulfillment_candidates(daniel_2.id)
+    assert [(c["event"].id, c["element_scores"]) for c in ranked] == [
+        (c["event"].id, c["element_scores"]) for c in candidates
+    ]
+
+    top = library.detect_fulfillment_candidates(daniel_2.id, confidence_threshold=0.05, limit=1)
+    assert [c["event"].id for c in top] == [cyrus]
+    assert library.detect_fulfillment_candidates(daniel_2.id, confidence_threshold=0.5) == []
+
+
+def test_rank_fulfillment_candidates(db_session, library):
+    """BM25 scores each element, normalises for length and sums into the prophecy score."""
+    events = ChronologyEngine(db_session).add_events_bulk(
+        [
+            {
+                "name": "Cyrus of Persia conquers Babylon",
+                "year_start": -539,
+                "era": "exile",
+                "event_type": "military",
+            },
+            {
+                "name": "Rome annexes Judea",
+                "year_start": -63,
+                "era": "intertestamental",
+                "event_type": "political",
+            },
+            {
+                "name": "Pompey's campaign in Rome's eastern provinces",
+                "description": " ".join(["Legions march through the provinces"] * 20),
+                "year_start": -64,
+                "era": "intertestamental",
+                "event_type": "military",
+            },
+            {
+                "name": "Harvest festival",
+                "year_start": -500,
+                "era": "post_exile",
+                "event_type": "religious",
+            },
+        ]
+    )["event_ids"]
+    cyrus, judea, pompey, _ = events
+    daniel_2 = library.get_prophecy_by_reference("Daniel 2:31-45")
+
+    candidates = library.rank_fulfillment_candidates(daniel_2.id)
+    assert [c["event"].id for c in candidates] == [cyrus, judea, pompey]
+
+    top = candidates[0]
+    assert set(top["element_scores"]) == {"head_gold", "chest_silver"}
+    assert top["score"] == pytest.approx(sum(top["element_scores"].values()))
+    assert top["matched_keywords"] == ["babylon", "cyrus", "persia"]
+
+    # Same match, but the long document's score is damped
+    assert set(candidates[1]["element_scores"]) == {"legs_iron"}
+    assert candidates[1]["score"] > candidates[2]["score"]
+
+    assert [c["event"].id for c in library.rank_fulfillment_candidates(daniel_2.id, limit=1)] == [
+        cyrus
+    ]
+
+
+def test_fulfillment_timelines_constant_queries(db_session, library):
+    """All timelines load with a fixed number of statements, however many fulfillments."""
+    from sqlalchemy import event
+
+    from app.models.prophecy import FulfillmentType
+
+    event_ids = ChronologyEngine(db_session).add_events_bulk(
+        [
+            {"name": f"Event {i}", "year_start": -600 + i, "era": "exile", "event_type": "military"}
+            for i in range(5)
+        ]
+    )["event_ids"]
+    events = {e.id: e for e in db_session.query(ChronologyEvent)}
+    prophecies = library.get_all_prophecies()
+    for i, prophecy in enumerate(prophecies[:3]):
+        for event_id in event_ids[i:]:
+            library.link_fulfillment(
+                prophecy, events[event_id], FulfillmentType.PARTIAL, 0.5, "test"
+            )
+    db_session.expire_all()
+
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        timelines = library.analyze_fulfillment_timelines()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 3
+    assert len(timelines) == len(prophecies)
+    by_id = {t["prophecy_id"]: t for t in timelines}
+    for prophecy in prophecies:
+        assert by_id[prophecy.id] == library.analyze_fulfillment_timeline(prophecy.id)
+    assert by_id[prophecies[0].id]["total_fulfillments"] == 5
+    assert by_id[prophecies[0].id]["timeline"][0]["year_start"] == -600
+
+
+def test_prophetic_status(db_session, library):
+    """SQL classification matches the per-prophecy rules and is cached until the data changes."""
+    from sqlalchemy import event
+
+    from app.models.prophecy import FulfillmentType, ProphecyFulfillment
+
+    chronology_event = ChronologyEngine(db_session).add_events_bulk(
+        [{"name": "Event", "year_start": -500, "era": "exile", "event_type": "military"}]
+    )["event_ids"][0]
+    target = db_session.get(ChronologyEvent, chronology_event)
+    daniel, isaiah, jeremiah, ezekiel = library.get_all_prophecies()[:4]
+    for prophecy, types in (
+        (daniel, [FulfillmentType.COMPLETE, FulfillmentType.PARTIAL]),
+        (isaiah, [FulfillmentType.PARTIAL, FulfillmentType.PARTIAL]),
+        (jeremiah, [FulfillmentType.COMPLETE, FulfillmentType.PENDING]),
+        (ezekiel, [FulfillmentType.SYMBOLIC]),
+    ):
+        for fulfillment_type in types:
+            library.link_fulfillment(prophecy, target, fulfillment_type, 0.5, "test")
+
+    status = library.prophetic_status()
+    total = len(library.get_all_prophecies())
+    assert status["total_prophecies"] == total
+    assert status["complete"] == 1
+    assert status["partial"] == 2
+    assert status["pending"] == total - 4
+    partial = {p["id"]: p for p in status["partial_prophecies"]}
+    assert set(partial) == {isaiah.id, jeremiah.id}
+    assert partial[isaiah.id]["types"] == ["partial", "partial"]
+    assert partial[jeremiah.id]["fulfillments"] == 2
+
+    # Served from cache after one fingerprint query
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        cached = library.prophetic_status()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 1
+    assert cached == status and cached is not status
+
+    # Callers get copies; changing one leaves the cache intact
+    cached["partial_prophecies"].clear()
+    assert len(library.prophetic_status()["partial_prophecies"]) == 2
+
+    # Linking a fulfillment invalidates it
+    pending = library.get_prophecy_by_id(status["pending_prophecies"][0]["id"])
+    library.link_fulfillment(pending, target, FulfillmentType.COMPLETE, 0.9, "test")
+    assert library.prophetic_status()["complete"] == 2
+
+    # Writes that bypass the library (other workers, seed scripts) are picked up too
+    db_session.add(
+        ProphecyFulfillment(
+            prophecy_id=isaiah.id,
+            event_id=target.id,
+            fulfillment_type=FulfillmentType.COMPLETE,
+            explanation="direct insert",
+        )
+    )
+    db_session.commit()
+    assert library.prophetic_status()["complete"] == 3
+
+
+def test_stored_candidates(db_session, library):
+    """Stored candidates match live detection and refresh per prophecy or event."""
+    chronology = ChronologyEngine(db_session)
+    cyrus, alexander = chronology.add_events_bulk(
+        [
+            {
+                "name": "Cyrus of Persia conquers Babylon",
+                "description": "The Medes and Persians take the city",
+                "year_start": -539,
+                "era": "exile",
+                "event_type": "military",
+            },
+            {
+                "name": "Alexander conquers Persia",
+                "year_start": -331,
+                "era": "intertestamental",
+                "event_type": "military",
+            },
+        ]
+    )["event_ids"]
+    daniel_2 = library.get_prophecy_by_reference("Daniel 2:31-45")
+
+    assert library.refresh_candidates()["inserted"] > 0
+    stored = library.get_candidates(daniel_2.id)
+    live = library.rank_fulfillment_candidates(daniel_2.id)
+    assert [(c["event_id"], c["score"], c["element_scores"]) for c in stored] == [
+        (c["event"].id, pytest.approx(c["score"]), c["element_scores"]) for c in live
+    ]
+    assert stored[0]["event_id"] == cyrus
+    assert set(stored[0]["element_scores"]) == {"head_gold", "chest_silver"}
+    assert stored[0]["score"] == pytest.approx(sum(stored[0]["element_scores"].values()))
+    assert set(stored[1]["element_scores"]) == {"chest_silver", "belly_bronze"}
+
+    # Scoped refreshes only replace the affected rows
+    total = len(library.get_candidates(limit=1000))
+    result = library.refresh_candidates(event_ids=[alexander])
+    assert result["deleted"] == result["inserted"]
+    assert len(library.get_candidates(limit=1000)) == total
+    # Event-scoped scores use the statistics of the whole index
+    rescored = library.get_candidates(daniel_2.id)
+    assert rescored[1]["score"] == pytest.approx(stored[1]["score"])
+    assert library.get_candidates(min_score=stored[0]["score"] + 1e-6) == []
+    assert [c["event_id"] for c in library.get_candidates(daniel_2.id, limit=1, offset=1)] == [
+        alexander
+    ]
+
+    # Overlapping refreshes upsert the same (prophecy, event) rows
+    rows = score_candidates(db_session, prophecy_ids=[daniel_2.id])
+    db_session.execute(_candidate_upsert(db_session), rows)
+    db_session.commit()
+    assert len(library.get_candidates(limit=1000)) == total
+
+
+def test_create_prophecy_scores_candidates(db_session, library):
+    """New prophecies are scored by the classification worker, or inline without one."""
+    chronology = ChronologyEngine(db_session)
+    (event_id,) = chronology.add_events_bulk(
+        [
+            {
+                "name": "Fall of Nineveh",
+                "year_start": -612,
+                "era": "divided_kingdom",
+                "event_type": "military",
+            }
+        ]
+    )["event_ids"]
+
+    inline = library.create_prophecy(
+        {
+            "reference": "Nahum 3:7",
+            "text": "Nineveh is laid waste",
+            "elements": [{"id": "nineveh_falls", "keywords": ["nineveh"]}],
+        }
+    )
+    assert [c["event_id"] for c in library.get_candidates(inline.id)] == [event_id]
+
+    worker = start_classification_worker(TestingSessionLocal)
+    try:
+        queued = library.create_prophecy(
+            {
+                "reference": "Zephaniah 2:13",
+                "text": "He will make Nineveh a desolation",
+                "elements": [{"id": "nineveh_desolate", "keywords": ["nineveh"]}],
+            }
+        )
+        assert worker.wait_idle()
+    finally:
+        stop_classification_worker()
+
+    assert worker.status()["prophecies_scored"] == 1
+    db_session.expire_all()
+    assert [c["event_id"] for c in library.get_candidates(queued.id)] == [event_id]
@@ -0,0 +1,326 @@
+"""
+Tests for simulation engine functionality.
+"""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.chronology.engine import ChronologyEngine
+from app.models.simulation import SimulationScenario, WorldIndicator
+from app.patterns.library import PatternLibrary
+from app.patterns.text import canonical_terms
+from app.simulation.engine import SimulationEngine
+from app.simulation.indicators import IndicatorSnapshot
+from app.simulation.montecarlo import simulate_next_occurrences
+from app.simulation.pool import start_simulation_pool, stop_simulation_pool
+
+TEST_DATABASE_URL = "sqlite:///./test_simulation.db"
+engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db_session():
+    """Create test database session."""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def simulation(db_session):
+    """Simulation engine over the core patterns and a few indicators."""
+    PatternLibrary(db_session).seed_core_patterns()
+    db_session.add_all(
+        [
+            WorldIndicator(
+                indicator_name="Injustice index",
+                category="social",
+                value=0.7,
+                description="Courts favour the powerful",
+            ),
+            WorldIndicator(
+                indicator_name="Economic prosperity",
+                category="economic",
+                value=3.1,
+                extra_data={"note": "hostility abroad"},
+            ),
+        ]
+    )
+    db_session.commit()
+    return SimulationEngine(db_session)
+
+
+def test_risk_score_constant_queries(db_session, simulation):
+    """A risk assessment runs two queries whatever the number of patterns."""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        risk = simulation.calculate_civilization_risk_score()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 2
+    assert risk["total_patterns_assessed"] == len(PatternLibrary.CORE_PATTERNS)
+
+    # A caller's snapshot is used even when it is empty
+    statements.clear()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        empty = simulation.calculate_civilization_risk_score(IndicatorSnapshot([]))
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert len(statements) == 1
+    assert empty["overall_risk_score"] == 0.0
+
+    # Same matches as checking each pattern on its own
+    snapshot = IndicatorSnapshot.load(db_session)
+    for top in risk["top_risks"]:
+        single = simulation.detect_pattern_preconditions(top["pattern_id"], snapshot)
+        assert single["match_score"] == top["match_score"]
+        assert single["matched_preconditions"] == top["matched_preconditions"]
+
+
+def test_indicator_snapshot(db_session, simulation):
+    """The snapshot groups indicators by category and keeps the latest values."""
+    snapshot = IndicatorSnapshot.load(db_session)
+    assert len(snapshot) == 2
+    assert snapshot.latest_values == {"Injustice index": 0.7, "Economic prosperity": 3.1}
+    assert [ind["name"] for ind in snapshot.in_category("social")] == ["Injustice index"]
+    assert snapshot.postings["hostility"] == [2]
+
+    assessment = simulation.assess_current_indicators("economic", snapshot=snapshot)
+    assert assessment["total_indicators"] == 1
+    assert assessment["categories"] == {"economic": 1}
+
+
+def test_precondition_matching():
+    """Preconditions match indicator terms after stemming and synonyms, with evidence."""
+    snapshot = IndicatorSnapshot(
+        [
+            {
+                "id": 2,
+                "name": "Regime cracks down",
+                "category": "political",
+                "value": None,
+                "description": "Government repression of churches",
+                "timestamp": None,
+                "extra_data": None,
+            },
+            {
+                "id": 1,
+                "name": "A",
+                "category": "social",
+                "value": None,
+                "description": "a",
+                "timestamp": None,
+                "extra_data": {"note": "moral"},
+            },
+        ]
+    )
+
+    state_hostility = snapshot.match("state_hostility")
+    assert state_hostility["matched"] and state_hostility["coverage"] == 1.0
+    assert state_hostility["evidence"] == {
+        "hostility": ["Regime cracks down"],
+        "state": ["Regime cracks down"],
+    }
+
+    # Two-term preconditions need both terms; one common word is not enough
+    assert not snapshot.match("religious_distinctiveness")["matched"]
+    moral_relativism = snapshot.match("moral_relativism")
+    assert not moral_relativism["matched"] and moral_relativism["evidence"] == {"moral": ["A"]}
+    assert not snapshot.match("military_success")["matched"]
+    assert snapshot.match("state_hostility") is state_hostility
+
+
+def test_precondition_terms_co_occur():
+    """Longer preconditions need their terms together in one indicator."""
+
+    def indicator(indicator_id, description):
+        return {
+            "id": indicator_id,
+            "name": description,
+            "category": "social",
+            "value": None,
+            "description": description,
+            "timestamp": None,
+            "extra_data": None,
+        }
+
+    snapshot = IndicatorSnapshot(
+        [indicator(1, "Armed forces mobilised"), indicator(2, "Official statement")]
+    )
+    # Words sharing a stem with a synonym are not folded into its group
+    assert canonical_terms("statement arms armies") == ["stat", "arm", "military"]
+    assert not snapshot.match("state_military")["matched"]
+
+    snapshot = IndicatorSnapshot(
+        [indicator(1, "Economic collapse"), indicator(2, "Moral decline of elites")]
+    )
+    assert snapshot.match("moral_economic_decline")["coverage"] == pytest.approx(2 / 3)
+    assert snapshot.match("moral_economic_decline")["matched"]
+    # Two of three terms, but in different indicators
+    assert not snapshot.match("economic_moral_injustice")["matched"]
+
+
+def test_monte_carlo_trajectory(db_session, simulation, monkeypatch):
+    """Seeded ensembles are reproducible, in-process or pooled, and bracket the next year."""
+    years = [1800, 1830, 1870, 1895, 1930, 1960, 1990, 2020]
+    event_ids = ChronologyEngine(db_session).add_events_bulk(
+        [
+            {"name": f"Crisis {year}", "year_start": year, "era": "modern", "event_type": "political"}
+            for year in years
+        ]
+    )["event_ids"]
+    pattern = PatternLibrary(db_session).get_pattern_by_name("Pride → Humbling/Fall")
+    PatternLibrary(db_session).bulk_link(
+        [{"event_id": event_id, "pattern_id": pattern.id, "strength": 5} for event_id in event_ids]
+    )
+
+    for distribution in ("empirical", "lognormal", "gamma"):
+        projection = simulation.simulate_pattern_trajectory(
+            pattern.id, 2026, distribution, samples=50000, seed=7
+        )
+        assert projection["observed_intervals"] == len(years) - 1
+        assert projection["samples"] == 50000
+        percentiles = projection["percentiles"]
+        assert 2026 < percentiles["p5"] < percentiles["p50"] < percentiles["p95"]
+        curve = [point["probability"] for point in projection["cumulative_probability"]]
+        assert len(curve) == 100 and curve == sorted(curve) and curve[-1] > 0.9
+        assert projection["convergence"]["batches"] == 5
+        assert projection["convergence"]["converged"]
+
+    serial = simulation.simulate_pattern_trajectory(pattern.id, samples=30000, seed=11)
+    monkeypatch.setattr(settings, "MONTE_CARLO_POOL_MIN_SAMPLES", 1)
+    start_simulation_pool(2)
+    try:
+        pooled = simulation.simulate_pattern_trajectory(pattern.id, samples=30000, seed=11)
+    finally:
+        stop_simulation_pool()
+    assert pooled["percentiles"] == serial["percentiles"]
+    assert pooled["convergence"] == serial["convergence"]
+
+    unlinked = PatternLibrary(db_session).get_pattern_by_name("Exile → Restoration")
+    assert "projection" in simulation.simulate_pattern_trajectory(unlinked.id, seed=1)
+
+
+def test_monte_carlo_long_gap():
+    """Short intervals after an ancient last occurrence are sampled at equilibrium."""
+    chunks = simulate_next_occurrences(
+        "empirical", {}, np.array([1.0, 2.0, 3.0, 4.0, 5.0]), -985, 2026, 100000, seed=3
+    )
+    residual = np.concatenate(chunks) - 2026
+    assert residual.min() > 0 and residual.max() <= 5
+    # Mean forward-recurrence time E[L^2] / (2 E[L])
+    assert residual.mean() == pytest.approx(55 / 30, abs=0.02)
+
+    # Walking the renewals from a shorter gap converges to the same distribution
+    gamma = {"shape": 2.0, "scale": 1.5}
+    for last in (1976, -985):
+        chunks = simulate_next_occurrences("gamma", gamma, np.array([]), last, 2026, 100000, seed=5)
+        assert (np.concatenate(chunks) - 2026).mean() == pytest.approx(2.25, abs=0.03)
+
+
+def test_scenario_sweep(db_session, simulation, monkeypatch):
+    """Sweeps store every combination once, in-process or pooled, like create_scenario."""
+    patterns = [p.id for p in PatternLibrary(db_session).get_all_patterns()]
+    grid = {
+        "indicator_ids": [[1], [1, 2]],
+        "pattern_ids": [patterns[:2], patterns[2:]],
+        "assumptions": [{"growth": 0.01}, {"growth": 0.03}],
+    }
+
+    serial = list(simulation.sweep_scenarios("Sweep", "serial", grid))
+    assert sorted(s["parameters"]["index"] for s in serial) == list(range(8))
+
+    monkeypatch.setattr(settings, "SCENARIO_SWEEP_POOL_MIN_SCENARIOS", 1)
+    monkeypatch.setattr("app.simulation.sweep.SWEEP_CHUNK_SIZE", 3)
+    start_simulation_pool(2)
+    try:
+        pooled = list(simulation.sweep_scenarios("Sweep", "pooled", grid))
+    finally:
+        stop_simulation_pool()
+
+    def by_index(scenarios):
+        return {s["parameters"]["index"]: s for s in scenarios}
+
+    serial, pooled = by_index(serial), by_index(pooled)
+    for index, scenario in serial.items():
+        assert pooled[index]["matched_patterns"] == scenario["matched_patterns"]
+        assert pooled[index]["confidence_score"] == scenario["confidence_score"]
+
+    single = simulation.create_scenario(
+        "Single", "direct", [1, 2], patterns[2:], {"growth": 0.03}
+    )
+    assert serial[7]["matched_patterns"] == single.matched_patterns
+    assert serial[7]["confidence_score"] == single.confidence_score
+    assert db_session.query(SimulationScenario).count() == 17
+
+    # A failing chunk rolls back the whole sweep
+    monkeypatch.setattr(settings, "SCENARIO_SWEEP_POOL_MIN_SCENARIOS", 1000)
+    sweep = simulation.sweep_scenarios("Sweep", "failing", grid)
+    calls = []
+    evaluate_scenario = SimulationEngine.evaluate_scenario
+
+    def evaluate(*args):
+        calls.append(args)
+        if len(calls) > 4:
+            raise RuntimeError("worker failed")
+        return evaluate_scenario(*args)
+
+    monkeypatch.setattr(SimulationEngine, "evaluate_scenario", staticmethod(evaluate))
+    with pytest.raises(RuntimeError):
+        list(sweep)
+    assert sweep.status() == {"sweep_id": sweep.sweep_id, "completed": 3, "total": 8}
+    assert db_session.query(SimulationScenario).count() == 17
+
+    monkeypatch.setattr(settings, "SCENARIO_SWEEP_MAX_SCENARIOS", 4)
+    with pytest.raises(ValueError):
+        simulation.sweep_scenarios("Sweep", "too big", grid)
+
+
+def test_historical_analogs(db_session, simulation, tmp_path, monkeypatch):
+    """Analogs are ranked by matched keywords and read from the chronology snapshot."""
+    monkeypatch.setattr(settings, "CHRONOLOGY_SNAPSHOT_DIR", str(tmp_path))
+    ChronologyEngine(db_session).add_events_bulk(
+        [
+            {
+                "name": "Fall of Jerusalem",
+                "description": "Babylon destroys the Temple and deports Judah into exile",
+                "year_start": -586,
+                "era": "exile",
+                "event_type": "military",
+            },
+            {
+                "name": "Return from exile",
+                "year_start": -538,
+                "era": "post_exile",
+                "event_type": "political",
+            },
+            {
+                "name": "Edict of Milan",
+                "year_start": 313,
+                "era": "roman_empire",
+                "event_type": "religious",
+            },
+        ]
+    )
+
+    analogs = simulation.find_historical_analogs({"keywords": ["exile", "temple"]})
+    assert [a["name"] for a in analogs] == ["Fall of Jerusalem", "Return from exile"]
+    assert analogs[0]["similarity_score"] == 1.0
+    assert analogs[0]["year_start"] == -586 and analogs[0]["era"] == "exile"
+    assert analogs[0]["description"].startswith("Babylon")
+    assert analogs[1]["description"] is None
+    assert simulation.find_historical_analogs({}) == []
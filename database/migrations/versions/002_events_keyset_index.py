@@ -0,0 +1,25 @@
+"""
+Composite (year_start, id) index for keyset pagination of chronology events.
+
+Revision ID: 002_events_keyset_index
+Revises: 001_initial_schema
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002_events_keyset_index'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_chronology_events_year_start_id', 'chronology_events', ['year_start', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chronology_events_year_start_id', table_name='chronology_events')
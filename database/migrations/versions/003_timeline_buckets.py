@@ -0,0 +1,51 @@
+"""
+Century-bucketed timeline statistics.
+
+Revision ID: 003_timeline_buckets
+Revises: 002_events_keyset_index
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003_timeline_buckets'
+down_revision = '002_events_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Enums already exist from 001_initial_schema
+    chronology_era_enum = postgresql.ENUM(name='chronologyera', create_type=False)
+    event_type_enum = postgresql.ENUM(name='eventtype', create_type=False)
+
+    op.create_table(
+        'timeline_buckets',
+        sa.Column('century_start', sa.Integer(), nullable=False),
+        sa.Column('era', chronology_era_enum, nullable=False),
+        sa.Column('event_type', event_type_enum, nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('min_year', sa.Integer(), nullable=False),
+        sa.Column('max_year', sa.Integer(), nullable=False),
+        sa.Column('max_event_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('century_start', 'era', 'event_type')
+    )
+
+    # Populate from existing events
+    op.execute(
+        """
+        INSERT INTO timeline_buckets
+            (century_start, era, event_type, event_count, min_year, max_year, max_event_id)
+        SELECT year_start - ((year_start % 100) + 100) % 100,
+               era, event_type, count(*), min(year_start), max(year_start), max(id)
+        FROM chronology_events
+        GROUP BY 1, era, event_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('timeline_buckets')
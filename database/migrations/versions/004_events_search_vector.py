@@ -0,0 +1,42 @@
+"""
+Weighted full-text search vector over chronology events, with a GIN index.
+
+Name is weighted A, biblical source B and description C, matching the field
+weights of the in-process search index used on other databases.
+
+Revision ID: 004_events_search_vector
+Revises: 003_timeline_buckets
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004_events_search_vector'
+down_revision = '003_timeline_buckets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE chronology_events ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(biblical_source, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+        """
+    )
+    op.create_index(
+        'ix_chronology_events_search_vector',
+        'chronology_events',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chronology_events_search_vector', table_name='chronology_events')
+    op.drop_column('chronology_events', 'search_vector')
@@ -0,0 +1,46 @@
+"""
+Precomputed prophecy x event fulfillment candidates.
+
+Rows are filled by the candidate refresh job (POST /prophecies/candidates/refresh)
+and kept up to date as events and prophecies are added.
+
+Revision ID: 005_prophecy_candidates
+Revises: 004_events_search_vector
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_prophecy_candidates'
+down_revision = '004_events_search_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'prophecy_candidates',
+        sa.Column('prophecy_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('matched_keywords', sa.JSON(), nullable=False),
+        sa.Column('element_scores', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['prophecy_id'], ['prophecy_texts.id']),
+        sa.ForeignKeyConstraint(['event_id'], ['chronology_events.id']),
+        sa.PrimaryKeyConstraint('prophecy_id', 'event_id')
+    )
+    op.create_index(
+        'ix_prophecy_candidates_event_id', 'prophecy_candidates', ['event_id']
+    )
+    op.create_index(
+        'ix_prophecy_candidates_prophecy_score', 'prophecy_candidates', ['prophecy_id', 'score']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_prophecy_candidates_prophecy_score', table_name='prophecy_candidates')
+    op.drop_index('ix_prophecy_candidates_event_id', table_name='prophecy_candidates')
+    op.drop_table('prophecy_candidates')